@@ -16,9 +16,30 @@ class AWSResourcesConfig(PluginConfig):
     base_url = "netbox-aws-resources-plugin"
     author = __author__
     author_email = __email__
-    default_settings = {"api_version": "2.0"}  # Or the appropriate API version for your Netbox version
+    default_settings = {
+        "api_version": "2.0",  # Or the appropriate API version for your Netbox version
+        # Maximum number of objects coalesced into one event by events.batched_events()
+        "event_batch_size": 500,
+        # Minutes between scheduled reconciliation runs (0 disables scheduling)
+        "reconciliation_interval": 60,
+        # Seconds after which a reconciliation shard's lease expires if its job never finishes
+        "reconciliation_lease_timeout": 3600,
+        # Record query counts and timings for plugin views and API endpoints (see instrumentation.py)
+        "query_instrumentation": True,
+        # Return the query count and DB time in X-Query-Count/Server-Timing response headers
+        "query_debug_header": False,
+        # Flag requests which run the same statement this many times as a likely N+1
+        "n_plus_one_threshold": 10,
+        # Seconds the change feed holds back new changes, so transactions still in flight don't commit behind a cursor
+        "change_feed_settle_seconds": 10,
+    }
+    middleware = ["netbox_aws_resources_plugin.instrumentation.QueryMetricsMiddleware"]
     # Explicitly define the app_name for the API URLs
     api_app_name = "netbox_aws_resources_plugin-api"
 
+    def ready(self):
+        super().ready()
+        from . import jobs, signals  # noqa: F401
+
 
 config = AWSResourcesConfig
@@ -0,0 +1,52 @@
+from netbox.api.pagination import OptionalLimitOffsetPagination
+from netbox.config import get_config
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination on the primary key. Each page is fetched with `WHERE id > <last id> LIMIT n` on the
+    primary key index, so page 10,000 costs the same as page 1 and rows inserted mid-crawl never shift the pages
+    already seen.
+    """
+
+    ordering = ("id",)
+    page_size_query_param = "limit"
+
+    def get_page_size(self, request):
+        config = get_config()
+        page_size = super().get_page_size(request) or config.PAGINATE_COUNT
+        if config.MAX_PAGE_SIZE:
+            return min(page_size, config.MAX_PAGE_SIZE)
+        return page_size
+
+    def get_ordering(self, request, queryset, view):
+        # Always key on the primary key, even if ?ordering= was given; any other ordering would need a matching
+        # unique index to stay cheap for deep pages.
+        return self.ordering
+
+
+class OptionalKeysetPagination(OptionalLimitOffsetPagination):
+    """
+    NetBox's standard limit/offset pagination, switching to keyset pagination when the client opts in with
+    `?pagination=cursor` (or by following a `cursor` link from a previous page).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.keyset = None
+
+    @staticmethod
+    def wants_keyset(request):
+        return "cursor" in request.query_params or request.query_params.get("pagination") == "cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.wants_keyset(request):
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
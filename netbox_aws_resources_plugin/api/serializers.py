@@ -9,6 +9,7 @@ from rest_framework import serializers
 from tenancy.api.serializers import TenantSerializer  # Assuming you might use this for tenant
 
 from ..models import AWSVPC, AWSAccount, AWSSubnet, AWSLoadBalancer, AWSTargetGroup
+from ..summaries import get_vpc_summary
 
 # Load AZ data from JSON file
 file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "az_data.json")
@@ -61,6 +62,7 @@ class AWSAccountSerializer(NetBoxModelSerializer):
             "custom_fields",
             "created",
             "last_updated",
+            "last_seen",
         )
         brief_fields = ("id", "url", "display", "account_id", "name")
 
@@ -81,6 +83,9 @@ class AWSVPCSerializer(NetBoxModelSerializer):
     aws_account = NestedAWSAccountSerializer(read_only=True)
     cidr_block = NetBoxNestedPrefixSerializer(read_only=True)
     availability_zones = serializers.SerializerMethodField()
+    summary = serializers.SerializerMethodField(
+        help_text="Counts and hourly cost of the VPC's resources. Only included when retrieving a single VPC."
+    )
 
     class Meta:
         model = AWSVPC
@@ -96,10 +101,12 @@ class AWSVPCSerializer(NetBoxModelSerializer):
             "availability_zones",
             "state",
             "is_default",
+            "summary",
             "tags",
             "custom_fields",
             "created",
             "last_updated",
+            "last_seen",
         )
         brief_fields = ("id", "url", "display", "vpc_id", "name", "region")
 
@@ -107,6 +114,18 @@ class AWSVPCSerializer(NetBoxModelSerializer):
         region_name = obj.region
         return AZ_DATA.get(region_name, [])
 
+    def get_fields(self):
+        fields = super().get_fields()
+        # The summary is only included when retrieving a single VPC; computing it for every VPC in a list would cost
+        # five queries per row on a cold cache.
+        if self.parent is not None:
+            fields.pop("summary", None)
+        return fields
+
+    def get_summary(self, obj):
+        summary = get_vpc_summary(obj)
+        return {**summary, "hourly_cost": str(summary["hourly_cost"])}
+
 
 # Serializers for AWSSubnet
 
@@ -141,6 +160,7 @@ class AWSSubnetSerializer(NetBoxModelSerializer):
             "custom_fields",
             "created",
             "last_updated",
+            "last_seen",
         )
         brief_fields = ("id", "url", "display", "subnet_id", "name", "availability_zone")
 
@@ -184,6 +204,7 @@ class AWSLoadBalancerSerializer(NetBoxModelSerializer):
             "custom_fields",
             "created",
             "last_updated",
+            "last_seen",
         )
         brief_fields = ("id", "url", "display", "name", "arn", "region", "type")
 
@@ -234,5 +255,6 @@ class AWSTargetGroupSerializer(NetBoxModelSerializer):
             "custom_fields",
             "created",
             "last_updated",
+            "last_seen",
         )
         brief_fields = ("id", "url", "display", "name", "arn", "region", "protocol", "port", "target_type")
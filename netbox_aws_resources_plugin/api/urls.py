@@ -1,3 +1,4 @@
+from django.urls import path
 from netbox.api.routers import NetBoxRouter
 
 from . import views
@@ -11,4 +12,29 @@ router.register("aws-subnets", views.AWSSubnetViewSet)
 router.register("aws-load-balancers", views.AWSLoadBalancerViewSet)
 router.register("aws-target-groups", views.AWSTargetGroupViewSet)
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path("export/", views.AWSInventoryExportView.as_view(), name="inventory-export"),
+    path("topology/", views.AWSTopologyView.as_view(), name="topology"),
+    path("changes/", views.AWSChangeFeedView.as_view(), name="change-feed"),
+    path("jobs/", views.AWSBackgroundJobsView.as_view(), name="background-jobs"),
+    path("audit/", views.AWSIntegrityAuditView.as_view(), name="integrity-audit"),
+    path("ip-lookup/", views.AWSIPLookupView.as_view(), name="ip-lookup"),
+    path("aws-target-groups/<int:pk>/targets/", views.AWSTargetsView.as_view(), name="awstargetgroup-targets"),
+    path(
+        "aws-target-groups/<int:pk>/targets/register/",
+        views.AWSTargetRegistrationView.as_view(operation="register"),
+        name="awstargetgroup-register-targets",
+    ),
+    path(
+        "aws-target-groups/<int:pk>/targets/deregister/",
+        views.AWSTargetRegistrationView.as_view(operation="deregister"),
+        name="awstargetgroup-deregister-targets",
+    ),
+    path("target-routes/", views.AWSTargetRoutesView.as_view(), name="target-routes"),
+    path("traffic-paths/", views.AWSTrafficPathView.as_view(), name="traffic-paths"),
+    path("rightsizing/", views.AWSRightsizingView.as_view(), name="rightsizing"),
+    path("decommission/", views.AWSDecommissionView.as_view(), name="decommission"),
+    path("seen/", views.AWSSeenView.as_view(), name="seen"),
+    path("sweep/", views.AWSSweepView.as_view(), name="sweep"),
+    path("vm-linkage/", views.AWSVMLinkageView.as_view(), name="vm-linkage"),
+]
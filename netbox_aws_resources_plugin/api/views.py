@@ -1,7 +1,37 @@
+from datetime import timedelta
+
+from core.models import ObjectChange
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from netbox.api.authentication import IsAuthenticatedOrLoginNotRequired
+from netbox.api.pagination import OptionalLimitOffsetPagination
 from netbox.api.viewsets import NetBoxModelViewSet
+from netbox.plugins import get_plugin_config
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.fields import BooleanField
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from virtualization.models import Cluster
 
-from .. import filtersets
-from ..models import AWSVPC, AWSAccount, AWSSubnet, AWSLoadBalancer, AWSTargetGroup
+from .. import (
+    audit,
+    changefeed,
+    decommission,
+    exporters,
+    filtersets,
+    ip_lookup,
+    jobs,
+    rightsizing,
+    staleness,
+    targets,
+    topology,
+    traffic,
+    vm_linkage,
+)
+from .pagination import OptionalKeysetPagination
+from ..models import AWSVPC, AWSAccount, AWSEC2Instance, AWSSubnet, AWSLoadBalancer, AWSTargetGroup
 
 # The serializers.py is one level up from the 'api' directory
 from .serializers import (
@@ -13,7 +43,14 @@ from .serializers import (
 )
 
 
-class AWSAccountViewSet(NetBoxModelViewSet):
+class AWSResourcesViewSet(NetBoxModelViewSet):
+    """Base viewset for the plugin's models."""
+
+    # Offset pagination by default; ?pagination=cursor switches to keyset pagination for deep crawls
+    pagination_class = OptionalKeysetPagination
+
+
+class AWSAccountViewSet(AWSResourcesViewSet):
     queryset = AWSAccount.objects.prefetch_related("tags")
     serializer_class = AWSAccountSerializer
     # If you have a specific filterset for the API, use it here, otherwise NetBoxModelViewSet provides some defaults
@@ -21,19 +58,19 @@ class AWSAccountViewSet(NetBoxModelViewSet):
     filterset_class = filtersets.AWSAccountFilterSet
 
 
-class AWSVPCViewSet(NetBoxModelViewSet):
+class AWSVPCViewSet(AWSResourcesViewSet):
     queryset = AWSVPC.objects.prefetch_related("tags", "aws_account", "cidr_block")
     serializer_class = AWSVPCSerializer
     filterset_class = filtersets.AWSVPCFilterSet
 
 
-class AWSSubnetViewSet(NetBoxModelViewSet):
+class AWSSubnetViewSet(AWSResourcesViewSet):
     queryset = AWSSubnet.objects.prefetch_related("tags", "aws_vpc", "cidr_block")
     serializer_class = AWSSubnetSerializer
     filterset_class = filtersets.AWSSubnetFilterSet
 
 
-class AWSLoadBalancerViewSet(NetBoxModelViewSet):
+class AWSLoadBalancerViewSet(AWSResourcesViewSet):
     queryset = AWSLoadBalancer.objects.prefetch_related(
         "tags", "aws_account", "vpc", "subnets"
     )
@@ -41,9 +78,663 @@ class AWSLoadBalancerViewSet(NetBoxModelViewSet):
     filterset_class = filtersets.AWSLoadBalancerFilterSet
 
 
-class AWSTargetGroupViewSet(NetBoxModelViewSet):
+class AWSTargetGroupViewSet(AWSResourcesViewSet):
     queryset = AWSTargetGroup.objects.prefetch_related(
         "tags", "aws_account", "vpc", "load_balancers"
     )
     serializer_class = AWSTargetGroupSerializer
     filterset_class = filtersets.AWSTargetGroupFilterSet
+
+
+class AWSInventoryExportView(APIView):
+    """
+    Stream the AWS inventory as NDJSON (all models, one object per line) or CSV (a single model).
+
+    Query parameters:
+      export_format: "ndjson" (default) or "csv" ("format" is reserved by DRF for choosing a renderer)
+      model: model name(s) to export, e.g. "awsvpc". May be repeated; defaults to every model for NDJSON.
+      chunk_size: number of rows fetched per database round trip
+    """
+
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get(self, request):
+        export_format = request.query_params.get("export_format", exporters.EXPORT_FORMAT_NDJSON)
+        if export_format not in exporters.EXPORT_FORMATS:
+            raise ValidationError({"export_format": f"Must be one of: {', '.join(exporters.EXPORT_FORMATS)}"})
+        try:
+            chunk_size = int(request.query_params.get("chunk_size", exporters.DEFAULT_CHUNK_SIZE))
+        except ValueError:
+            raise ValidationError({"chunk_size": "Must be an integer."})
+        chunk_size = max(1, min(chunk_size, 10000))
+
+        model_names = request.query_params.getlist("model")
+        if model_names:
+            export_models = []
+            for name in model_names:
+                model = exporters.get_export_model(name)
+                if model is None:
+                    raise ValidationError({"model": f"Unknown model: {name}"})
+                export_models.append(model)
+        else:
+            export_models = list(exporters.EXPORT_MODELS)
+
+        querysets = []
+        for model in export_models:
+            if not request.user.has_perm(f"{model._meta.app_label}.view_{model._meta.model_name}"):
+                raise PermissionDenied(f"You do not have permission to view {model._meta.verbose_name_plural}.")
+            querysets.append((model, model.objects.restrict(request.user, "view")))
+
+        if export_format == exporters.EXPORT_FORMAT_CSV:
+            if len(querysets) != 1:
+                raise ValidationError({"model": "CSV exports require exactly one model."})
+            model, queryset = querysets[0]
+            response = StreamingHttpResponse(
+                exporters.iter_csv(model, queryset, chunk_size=chunk_size), content_type="text/csv"
+            )
+            filename = f"{model._meta.model_name}.csv"
+        else:
+            response = StreamingHttpResponse(
+                exporters.iter_ndjson(querysets, chunk_size=chunk_size), content_type="application/x-ndjson"
+            )
+            filename = "aws-inventory.ndjson"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class AWSTopologyView(APIView):
+    """
+    Return the node/edge topology graph for an AWS account, VPC or region.
+
+    Exactly one of the following query parameters is required:
+      aws_account_id: AWS Account (NetBox ID)
+      vpc_id: AWS VPC (NetBox ID)
+      region: AWS region code, e.g. "us-east-1"
+    """
+
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get(self, request):
+        params = {key: request.query_params.get(key) for key in ("aws_account_id", "vpc_id", "region")}
+        params = {key: value for key, value in params.items() if value}
+        if len(params) != 1:
+            raise ValidationError("Specify exactly one of aws_account_id, vpc_id or region.")
+
+        if "region" not in params:
+            key, value = next(iter(params.items()))
+            if not value.isdigit():
+                raise ValidationError({key: "Must be an integer."})
+
+        if "aws_account_id" in params:
+            queryset = AWSAccount.objects.restrict(request.user, "view")
+            graph = topology.get_account_topology(get_object_or_404(queryset, pk=params["aws_account_id"]))
+        elif "vpc_id" in params:
+            queryset = AWSVPC.objects.restrict(request.user, "view")
+            graph = topology.get_vpc_topology(get_object_or_404(queryset, pk=params["vpc_id"]))
+        else:
+            graph = topology.get_region_topology(params["region"])
+
+        return Response(topology.restrict_topology(graph, request.user))
+
+
+class AWSChangeFeedView(APIView):
+    """
+    Return created, updated and deleted plugin objects in change order, for incremental synchronisation.
+
+    Query parameters:
+      cursor: return changes after this sequence number (the "cursor" value of the previous response)
+      since: return changes made after this ISO 8601 timestamp (e.g. a last_updated watermark)
+      model: restrict to these model names, e.g. "awsec2instance". May be repeated.
+      limit: maximum number of changes to return (default 1000)
+
+    Poll with the returned cursor until "has_more" is false. Deleted objects appear as tombstones with
+    "deleted": true and their last known state in "data". Changes are only returned once they are
+    `change_feed_settle_seconds` old, so that transactions still in flight don't commit behind the cursor.
+    """
+
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get(self, request):
+        cursor = request.query_params.get("cursor")
+        if cursor is not None:
+            if not cursor.isdigit():
+                raise ValidationError({"cursor": "Must be an integer."})
+            cursor = int(cursor)
+
+        since = request.query_params.get("since")
+        if since is not None:
+            since = parse_datetime(since)
+            if since is None:
+                raise ValidationError({"since": "Must be an ISO 8601 timestamp."})
+
+        try:
+            limit = int(request.query_params.get("limit", changefeed.DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+        limit = max(1, min(limit, changefeed.MAX_LIMIT))
+
+        model_names = request.query_params.getlist("model") or [m._meta.model_name for m in exporters.EXPORT_MODELS]
+        models = []
+        for name in model_names:
+            model = exporters.get_export_model(name)
+            if model is None:
+                raise ValidationError({"model": f"Unknown model: {name}"})
+            # Only include models the user may view, since changes carry full object snapshots
+            if request.user.has_perm(f"{model._meta.app_label}.view_{model._meta.model_name}"):
+                models.append(model)
+        if not models:
+            raise PermissionDenied("You do not have permission to view any of the requested models.")
+
+        settle_seconds = get_plugin_config("netbox_aws_resources_plugin", "change_feed_settle_seconds")
+        changes, next_cursor, has_more = changefeed.get_changes(
+            changefeed.get_feed_content_types(models),
+            queryset=ObjectChange.objects.restrict(request.user, "view"),
+            cursor=cursor,
+            since=since,
+            until=timezone.now() - timedelta(seconds=settle_seconds),
+            limit=limit,
+        )
+        return Response({"cursor": next_cursor, "has_more": has_more, "results": changes})
+
+
+class AWSBackgroundJobsView(APIView):
+    """
+    List the plugin's background jobs and the state of the queue they run on (GET), or start one (POST).
+
+    POST body: {"job": "<key>", "chunk_size": <optional int>}. Returns 202 with the ID and URL of the queued job;
+    poll the core jobs endpoint for its status and progress. The job only processes the objects the user may act on.
+    """
+
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get(self, request):
+        if not request.user.has_perm("core.view_job"):
+            raise PermissionDenied()
+        return Response(
+            {
+                "jobs": [
+                    {"key": key, "name": job_class.name, "description": job_class.__doc__}
+                    for key, job_class in jobs.JOB_CLASSES.items()
+                ],
+                "queue": jobs.get_queue_status(),
+            }
+        )
+
+    def post(self, request):
+        job_class = jobs.JOB_CLASSES.get(request.data.get("job"))
+        if job_class is None:
+            raise ValidationError({"job": f"Must be one of: {', '.join(jobs.JOB_CLASSES)}"})
+        if not request.user.has_perms(job_class.permissions):
+            raise PermissionDenied()
+
+        kwargs = {}
+        if request.data.get("chunk_size") is not None:
+            try:
+                kwargs["chunk_size"] = max(1, int(request.data["chunk_size"]))
+            except (TypeError, ValueError):
+                raise ValidationError({"chunk_size": "Must be an integer."})
+
+        job = job_class.enqueue(user=request.user, **kwargs)
+        return Response(
+            {
+                "id": job.pk,
+                "name": job.name,
+                "status": job.status,
+                "url": request.build_absolute_uri(job.get_absolute_url()),
+            },
+            status=202,
+        )
+
+
+class AWSVMLinkageView(APIView):
+    """
+    Queue a job linking EC2/RDS instances to VirtualMachines (POST). Returns 202 with the ID and URL of the job;
+    the counts of matched, created and updated objects are recorded in the job's data. Only instances and VMs the
+    user may change are linked or updated.
+
+    POST body:
+      models: model names to link, "awsec2instance" and/or "awsrdsinstance" (default both)
+      match: "name" (default), "tag" or "custom-field"
+      custom_field: the VM custom field holding the instance ID, when matching on a custom field
+      create_missing: create VMs for instances with no match (default false); requires "cluster"
+      cluster: ID of the cluster to create VMs in; only with create_missing
+      sync_specs: update linked VMs' vCPU count and memory from the instance catalog (default true)
+      dry_run: count what would be linked and created without writing anything (default false)
+    """
+
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def post(self, request):
+        if not request.user.has_perms(jobs.LinkVMsJob.permissions):
+            raise PermissionDenied()
+
+        valid_models = [model._meta.model_name for model in vm_linkage.INSTANCE_MODELS]
+        model_names = request.data.get("models") or valid_models
+        if not isinstance(model_names, list) or any(name not in valid_models for name in model_names):
+            raise ValidationError({"models": f"Must be a list of: {', '.join(valid_models)}"})
+
+        strategy = request.data.get("match", vm_linkage.MATCH_NAME)
+        if strategy not in vm_linkage.MATCH_STRATEGIES:
+            raise ValidationError({"match": f"Must be one of: {', '.join(vm_linkage.MATCH_STRATEGIES)}"})
+        custom_field = request.data.get("custom_field")
+        if strategy == vm_linkage.MATCH_CUSTOM_FIELD and not custom_field:
+            raise ValidationError({"custom_field": "Required when matching on a custom field."})
+
+        create_missing = _parse_bool(request, "create_missing")
+        cluster_id = _parse_id(request, "cluster")
+        if create_missing:
+            if cluster_id is None:
+                raise ValidationError({"cluster": "Required when creating missing virtual machines."})
+            get_object_or_404(Cluster.objects.restrict(request.user, "view"), pk=cluster_id)
+        elif cluster_id is not None:
+            raise ValidationError({"cluster": "Only used when creating missing virtual machines."})
+
+        job = jobs.LinkVMsJob.enqueue(
+            user=request.user,
+            model_names=model_names,
+            strategy=strategy,
+            custom_field=custom_field,
+            create_missing=create_missing,
+            cluster_id=cluster_id,
+            sync_specs=_parse_bool(request, "sync_specs", default=True),
+            dry_run=_parse_bool(request, "dry_run"),
+        )
+        return Response(
+            {
+                "id": job.pk,
+                "name": job.name,
+                "status": job.status,
+                "url": request.build_absolute_uri(job.get_absolute_url()),
+            },
+            status=202,
+        )
+
+
+def _parse_bool(request, key, default=False, data=None):
+    """Parse a boolean from the request body, or from `data` (e.g. the query parameters), strictly."""
+    value = (request.data if data is None else data).get(key, default)
+    try:
+        return BooleanField().to_internal_value(value)
+    except ValidationError:
+        raise ValidationError({key: "Must be true or false."})
+
+
+def _parse_id(request, key):
+    value = request.data.get(key)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).isdigit():
+        raise ValidationError({key: "Must be an integer."})
+    return int(value)
+
+
+class AWSDecommissionView(APIView):
+    """
+    Queue a job deleting an AWS account or VPC and everything in it, children first (POST). Returns 202 with the ID
+    and URL of the job; the number of objects of each model to delete is recorded in the job's data.
+
+    POST body:
+      aws_account_id or vpc_id: the account or VPC to decommission (exactly one)
+      release_prefixes: also delete the Prefixes used as the VPCs' and subnets' CIDR blocks (default false)
+      dry_run: only count what would be deleted (default false)
+    """
+
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def post(self, request):
+        params = {key: _parse_id(request, key) for key in ("aws_account_id", "vpc_id")}
+        params = {key: value for key, value in params.items() if value is not None}
+        if len(params) != 1:
+            raise ValidationError("Specify exactly one of aws_account_id or vpc_id.")
+        model = AWSAccount if "aws_account_id" in params else AWSVPC
+        root = get_object_or_404(model.objects.restrict(request.user, "delete"), pk=next(iter(params.values())))
+
+        release_prefixes = _parse_bool(request, "release_prefixes")
+        if not request.user.has_perms(decommission.get_required_permissions(release_prefixes)):
+            raise PermissionDenied()
+        undeletable = decommission.get_undeletable(decommission.get_subtree(root), request.user, release_prefixes)
+        if undeletable:
+            counts = ", ".join(f"{count} {name}" for name, count in undeletable.items())
+            raise PermissionDenied(f"You do not have permission to delete {counts} in {root}.")
+
+        job = jobs.DecommissionJob.enqueue(
+            user=request.user,
+            model_name=model._meta.model_name,
+            pk=root.pk,
+            dry_run=_parse_bool(request, "dry_run"),
+            release_prefixes=release_prefixes,
+        )
+        return Response(
+            {
+                "id": job.pk,
+                "name": job.name,
+                "status": job.status,
+                "url": request.build_absolute_uri(job.get_absolute_url()),
+            },
+            status=202,
+        )
+
+
+def _parse_timestamp(request, key, default=None):
+    value = request.data.get(key)
+    if value is None:
+        return default
+    timestamp = parse_datetime(value) if isinstance(value, str) else None
+    if timestamp is None:
+        raise ValidationError({key: "Must be an ISO 8601 timestamp."})
+    return timestamp
+
+
+class AWSSeenView(APIView):
+    """
+    Stamp the resources a sync found in AWS as seen (POST), by their AWS identifiers, with one UPDATE per model.
+    Only objects the user may change are stamped. Returns the number of objects stamped per model.
+
+    POST body:
+      <model name>: AWS identifiers of objects found, e.g. {"awsvpc": ["vpc-0123abcd"], "awsec2instance": [...]}
+      seen: ISO 8601 timestamp to stamp them with (default now); typically when the sync started
+    """
+
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def post(self, request):
+        if not isinstance(request.data, dict):
+            raise ValidationError("Must be an object of AWS identifiers by model name.")
+        seen = _parse_timestamp(request, "seen", timezone.now())
+        keys = {name: value for name, value in request.data.items() if name != "seen"}
+        unknown = set(keys) - set(staleness.MODELS_BY_NAME)
+        if unknown:
+            raise ValidationError(f"Unknown models: {', '.join(sorted(unknown))}")
+        for name, value in keys.items():
+            if not isinstance(value, list):
+                raise ValidationError({name: "Must be a list of AWS identifiers."})
+        if not request.user.has_perms([f"netbox_aws_resources_plugin.change_{name}" for name in keys]):
+            raise PermissionDenied()
+
+        return Response(
+            {
+                name: staleness.mark_seen_by_key(staleness.MODELS_BY_NAME[name], value, seen, user=request.user)
+                for name, value in keys.items()
+            }
+        )
+
+
+class AWSSweepView(APIView):
+    """
+    Queue a job tagging as stale, or deleting, the resources which no sync has seen since a cutoff (POST). Returns
+    202 with the ID and URL of the job; the number of objects found and marked or deleted per model is recorded in
+    the job's data.
+
+    POST body:
+      before: ISO 8601 timestamp; objects last seen before it are swept (required)
+      action: "mark" (default) to tag them, or "delete"
+      dry_run: only count what would be swept (default false)
+    """
+
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def post(self, request):
+        before = _parse_timestamp(request, "before")
+        if before is None:
+            raise ValidationError({"before": "This field is required."})
+        action = request.data.get("action", staleness.SWEEP_MARK)
+        if action not in staleness.SWEEP_ACTIONS:
+            raise ValidationError({"action": f"Must be one of: {', '.join(staleness.SWEEP_ACTIONS)}"})
+        if not request.user.has_perms(staleness.get_required_permissions(action)):
+            raise PermissionDenied()
+
+        job = jobs.SweepStaleJob.enqueue(
+            user=request.user, before=before, action=action, dry_run=_parse_bool(request, "dry_run")
+        )
+        return Response(
+            {
+                "id": job.pk,
+                "name": job.name,
+                "status": job.status,
+                "url": request.build_absolute_uri(job.get_absolute_url()),
+            },
+            status=202,
+        )
+
+
+class AWSIPLookupView(APIView):
+    """
+    Find the subnets, VPCs and accounts whose CIDR blocks contain each of one or more IP addresses, and the EC2/RDS
+    instances whose linked virtual machine has the address assigned. Only objects the user may view are returned.
+
+    GET: one or more `ip` query parameters. POST: {"ips": [...]}, for larger batches (up to 10,000 addresses).
+    """
+
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get(self, request):
+        return self.lookup(request, request.query_params.getlist("ip"))
+
+    def post(self, request):
+        ips = request.data.get("ips")
+        if not isinstance(ips, list):
+            raise ValidationError({"ips": "Must be a list of IP addresses."})
+        return self.lookup(request, ips)
+
+    def lookup(self, request, values):
+        if not request.user.has_perm("netbox_aws_resources_plugin.view_awssubnet"):
+            raise PermissionDenied()
+        if not values:
+            raise ValidationError("Specify at least one IP address.")
+        if len(values) > ip_lookup.MAX_LOOKUP_IPS:
+            raise ValidationError(f"At most {ip_lookup.MAX_LOOKUP_IPS} IP addresses can be looked up at once.")
+        addresses, invalid = ip_lookup.parse_ips(values)
+        if invalid:
+            raise ValidationError({"ips": f"Invalid IP addresses: {', '.join(map(str, invalid[:10]))}"})
+
+        results = ip_lookup.lookup_ips(addresses, request.user)
+        for result in results:
+            objects = [*result["instances"], *(obj for match in result["matches"] for obj in match.values() if obj)]
+            for obj in objects:
+                obj["url"] = request.build_absolute_uri(obj["url"])
+        return Response({"results": results})
+
+
+def _absolute_urls(request, objects):
+    for obj in objects:
+        if obj:
+            obj["url"] = request.build_absolute_uri(obj["url"])
+
+
+class AWSTargetsView(APIView):
+    """
+    List the targets registered with a target group (GET), paginated with `limit` and `offset`. Instance targets whose
+    instance the user may not view are left out.
+    """
+
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get(self, request, pk):
+        target_group = get_object_or_404(AWSTargetGroup.objects.restrict(request.user, "view"), pk=pk)
+        paginator = OptionalLimitOffsetPagination()
+        rows = paginator.paginate_queryset(targets.get_target_rows(target_group, request.user), request, self)
+        results = targets.describe_targets(rows)
+        _absolute_urls(request, (target["instance"] for target in results))
+        return paginator.get_paginated_response(results)
+
+
+class AWSTargetRegistrationView(APIView):
+    """
+    Register targets with, or deregister them from, a target group (POST). Only the difference from the current
+    membership is written. Returns the number of targets changed and unchanged.
+
+    POST body:
+      targets: up to 10,000 targets, each {"instance": <ID>} or {"instance_id": "i-..."} (for target groups of type
+        instance) or {"ip": "10.0.0.5"} (type ip), with a "port" (default: the port of the target group's service)
+      replace: when registering, also deregister every target not listed (default false), except instance targets
+        whose instance the user may not view
+    """
+
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+    # "register" or "deregister"
+    operation = "register"
+
+    def post(self, request, pk):
+        target_group = get_object_or_404(AWSTargetGroup.objects.restrict(request.user, "change"), pk=pk)
+        specs = request.data.get("targets")
+        if not isinstance(specs, list):
+            raise ValidationError({"targets": "Must be a list of targets."})
+        if len(specs) > targets.MAX_TARGETS:
+            raise ValidationError({"targets": f"At most {targets.MAX_TARGETS} targets can be changed at once."})
+        keys, errors = targets.parse_targets(target_group, specs, request.user)
+        if errors:
+            raise ValidationError({"targets": errors[:10]})
+
+        if self.operation == "deregister":
+            return Response(targets.deregister_targets(target_group, keys))
+        replace = _parse_bool(request, "replace")
+        return Response(targets.register_targets(target_group, keys, replace=replace, user=request.user))
+
+
+class AWSTargetRoutesView(APIView):
+    """
+    Find the target groups an EC2 instance or IP address is registered with, and the load balancers routing to them.
+
+    Query parameters: one of `instance` (an EC2 instance ID in NetBox), `instance_id` (an AWS instance ID) or `ip`.
+    """
+
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get(self, request):
+        if not request.user.has_perms(
+            ["netbox_aws_resources_plugin.view_awstargetgroup", "netbox_aws_resources_plugin.view_awsloadbalancer"]
+        ):
+            raise PermissionDenied()
+        params = {key: request.query_params.get(key) for key in ("instance", "instance_id", "ip")}
+        params = {key: value for key, value in params.items() if value}
+        if len(params) != 1:
+            raise ValidationError("Specify exactly one of instance, instance_id or ip.")
+
+        instances = AWSEC2Instance.objects.restrict(request.user, "view")
+        if "instance" in params:
+            if not params["instance"].isdigit():
+                raise ValidationError({"instance": "Must be an integer."})
+            routes = targets.get_routes(instance=get_object_or_404(instances, pk=params["instance"]), user=request.user)
+        elif "instance_id" in params:
+            instance = get_object_or_404(instances, instance_id=params["instance_id"])
+            routes = targets.get_routes(instance=instance, user=request.user)
+        else:
+            addresses, invalid = ip_lookup.parse_ips([params["ip"]])
+            if invalid:
+                raise ValidationError({"ip": "Invalid IP address."})
+            routes = targets.get_routes(ip_address=addresses[0], user=request.user)
+
+        for route in routes:
+            _absolute_urls(request, [route["target_group"], *route["load_balancers"]])
+        return Response({"results": routes})
+
+
+class AWSTrafficPathView(APIView):
+    """
+    Resolve load balancer DNS names or ARNs to their traffic paths: each load balancer with its VPC, the target
+    groups it routes to, and their targets with each target's subnet and VPC. Only objects the user may view are
+    included; a name which matches no visible load balancer resolves to null.
+
+    GET: one or more `name` query parameters. POST: {"names": [...]}, for larger batches (up to 1,000 names).
+    """
+
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get(self, request):
+        return self.resolve(request, request.query_params.getlist("name"))
+
+    def post(self, request):
+        names = request.data.get("names")
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            raise ValidationError({"names": "Must be a list of DNS names or ARNs."})
+        return self.resolve(request, names)
+
+    def resolve(self, request, names):
+        if not request.user.has_perm("netbox_aws_resources_plugin.view_awsloadbalancer"):
+            raise PermissionDenied()
+        if not names:
+            raise ValidationError("Specify at least one DNS name or ARN.")
+        if len(names) > traffic.MAX_PATHS:
+            raise ValidationError(f"At most {traffic.MAX_PATHS} names can be resolved at once.")
+
+        results = traffic.resolve_paths(names, request.user)
+        for result in results:
+            path = result["load_balancer"]
+            if path is None:
+                continue
+            objects = [path, path["vpc"], path["vpc"] and path["vpc"]["aws_account"]]
+            for group in path["target_groups"]:
+                objects.append(group)
+                for target in group["targets"]:
+                    vpc = target["vpc"]
+                    objects += [target["instance"], target["subnet"], vpc, vpc and vpc["aws_account"]]
+            _absolute_urls(request, objects)
+        return Response({"results": results})
+
+
+class AWSRightsizingView(APIView):
+    """
+    Report the potential savings from moving instances to the cheapest catalog type with at least as many vCPUs and
+    as much memory, per account. Only objects the user may view are included.
+
+    Query parameters:
+      aws_account_id: also list this account's instances which could be rightsized (NetBox ID)
+      same_family: only recommend types of the instance's own family, e.g. m5 (default false)
+      limit: the number of instances listed (default 1000; 0 lists them all)
+    """
+
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get(self, request):
+        if not request.user.has_perm("netbox_aws_resources_plugin.view_awsaccount"):
+            raise PermissionDenied()
+        aws_account = None
+        if account_id := request.query_params.get("aws_account_id"):
+            if not account_id.isdigit():
+                raise ValidationError({"aws_account_id": "Must be an integer."})
+            aws_account = get_object_or_404(AWSAccount.objects.restrict(request.user, "view"), pk=account_id)
+        try:
+            limit = int(request.query_params.get("limit", rightsizing.DEFAULT_INSTANCE_LIMIT))
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+        if limit < 0:
+            raise ValidationError({"limit": "Must be zero or more."})
+        same_family = _parse_bool(request, "same_family", data=request.query_params)
+
+        report = rightsizing.get_report(request.user, same_family, aws_account, limit=limit or None)
+        objects = [row["aws_account"] for row in report["accounts"]]
+        objects += [row["instance"] for row in report.get("instances", [])]
+        _absolute_urls(request, objects)
+        return Response(report)
+
+
+class AWSIntegrityAuditView(APIView):
+    """
+    Run the integrity audit and return every inconsistency found, grouped by check.
+
+    Query parameters: `check` (may be repeated) to run only some checks, and `limit` for the number of issues listed
+    per check (default 1000; 0 lists them all). Every issue is counted regardless of the limit.
+    """
+
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get(self, request):
+        if not request.user.has_perms(audit.REQUIRED_PERMISSIONS):
+            raise PermissionDenied()
+
+        keys = request.query_params.getlist("check")
+        unknown = set(keys) - set(audit.get_check_keys())
+        if unknown:
+            raise ValidationError({"check": f"Unknown checks: {', '.join(sorted(unknown))}"})
+        try:
+            limit = int(request.query_params.get("limit", audit.DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+        if limit < 0:
+            raise ValidationError({"limit": "Must be zero or more."})
+
+        report = audit.run_audit(keys=keys, limit=limit or None, user=request.user)
+        for check in report["checks"]:
+            for issue in check["issues"]:
+                issue["url"] = request.build_absolute_uri(issue["url"])
+        return Response(report)
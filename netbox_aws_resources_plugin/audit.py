@@ -0,0 +1,175 @@
+"""
+Inventory integrity audit.
+
+Each check finds one kind of inconsistency across the whole inventory with a single JOIN-based query, instead of
+loading objects and calling clean() on them one at a time:
+
+  - instances (EC2/RDS) whose subnet is in a different VPC;
+  - load balancer subnets outside the load balancer's VPC;
+  - target groups attached to load balancers in a different VPC;
+  - load balancers, target groups and instances whose region or account differs from their VPC's;
+  - subnets whose CIDR block isn't inside their VPC's CIDR block.
+
+run_audit() runs the checks and returns a report; it is shown by the audit view and API endpoint, limited to the
+objects the user may view, and printed by the audit_aws_inventory command.
+"""
+
+import time
+
+from django.db.models import CharField, F
+from django.db.models.functions import Cast
+from django.urls import reverse
+
+from .models import VPC_REGION_MODELS, AWSEC2Instance, AWSLoadBalancer, AWSRDSInstance, AWSSubnet, AWSTargetGroup
+
+# Issues listed per check in a report; every issue is still counted
+DEFAULT_LIMIT = 1000
+
+# Keys present in every issue; the rest are details specific to the check
+ISSUE_KEYS = ("object_id", "name", "url")
+
+# The report lists objects of every model, so viewing it requires permission to view them all
+REQUIRED_PERMISSIONS = tuple(
+    f"netbox_aws_resources_plugin.view_{model._meta.model_name}" for model in (AWSSubnet, *VPC_REGION_MODELS)
+)
+
+
+def _label(model):
+    return model._meta.verbose_name_plural
+
+
+def instance_subnet_checks():
+    for model in (AWSEC2Instance, AWSRDSInstance):
+        yield (
+            f"{model._meta.model_name}-subnet-vpc",
+            f"{_label(model)} in a subnet of another VPC",
+            model,
+            model.objects.filter(subnet__isnull=False)
+            .exclude(subnet__aws_vpc_id=F("vpc_id"))
+            .values(
+                "name",
+                object_id=F("pk"),
+                vpc_name=F("vpc__name"),
+                subnet_name=F("subnet__name"),
+                subnet_vpc_name=F("subnet__aws_vpc__name"),
+            ),
+        )
+
+
+def load_balancer_subnet_checks():
+    through = AWSLoadBalancer.subnets.through
+    yield (
+        "awsloadbalancer-subnet-vpc",
+        f"{_label(AWSLoadBalancer)} with subnets outside their VPC",
+        AWSLoadBalancer,
+        through.objects.exclude(awssubnet__aws_vpc_id=F("awsloadbalancer__vpc_id")).values(
+            object_id=F("awsloadbalancer_id"),
+            name=F("awsloadbalancer__name"),
+            vpc_name=F("awsloadbalancer__vpc__name"),
+            subnet_name=F("awssubnet__name"),
+            subnet_vpc_name=F("awssubnet__aws_vpc__name"),
+        ),
+    )
+
+
+def target_group_load_balancer_checks():
+    through = AWSTargetGroup.load_balancers.through
+    yield (
+        "awstargetgroup-load-balancer-vpc",
+        f"{_label(AWSTargetGroup)} attached to load balancers in another VPC",
+        AWSTargetGroup,
+        through.objects.exclude(awsloadbalancer__vpc_id=F("awstargetgroup__vpc_id")).values(
+            object_id=F("awstargetgroup_id"),
+            name=F("awstargetgroup__name"),
+            vpc_name=F("awstargetgroup__vpc__name"),
+            load_balancer_name=F("awsloadbalancer__name"),
+            load_balancer_vpc_name=F("awsloadbalancer__vpc__name"),
+        ),
+    )
+
+
+def vpc_consistency_checks():
+    for model in VPC_REGION_MODELS:
+        yield (
+            f"{model._meta.model_name}-region",
+            f"{_label(model)} in a different region from their VPC",
+            model,
+            model.objects.exclude(region=F("vpc__region")).values(
+                "name", "region", object_id=F("pk"), vpc_name=F("vpc__name"), vpc_region=F("vpc__region")
+            ),
+        )
+        yield (
+            f"{model._meta.model_name}-account",
+            f"{_label(model)} in a different account from their VPC",
+            model,
+            model.objects.exclude(aws_account_id=F("vpc__aws_account_id")).values(
+                "name",
+                object_id=F("pk"),
+                account_name=F("aws_account__name"),
+                vpc_name=F("vpc__name"),
+                vpc_account_name=F("vpc__aws_account__name"),
+            ),
+        )
+
+
+def subnet_cidr_checks():
+    outside = AWSSubnet.objects.exclude(cidr_block__prefix__net_contained_or_equal=F("aws_vpc__cidr_block__prefix"))
+    yield (
+        "awssubnet-cidr",
+        f"{_label(AWSSubnet)} whose CIDR block isn't inside their VPC's",
+        AWSSubnet,
+        outside.values(
+            "name",
+            object_id=F("pk"),
+            cidr=Cast("cidr_block__prefix", CharField()),
+            vpc_name=F("aws_vpc__name"),
+            vpc_cidr=Cast("aws_vpc__cidr_block__prefix", CharField()),
+        ),
+    )
+
+
+CHECK_GROUPS = (
+    instance_subnet_checks,
+    load_balancer_subnet_checks,
+    target_group_load_balancer_checks,
+    vpc_consistency_checks,
+    subnet_cidr_checks,
+)
+
+
+def get_checks():
+    """Return (key, title, model, queryset of issue values) for every check."""
+    return [check for group in CHECK_GROUPS for check in group()]
+
+
+def get_check_keys():
+    return [key for key, *_ in get_checks()]
+
+
+def run_audit(keys=None, limit=DEFAULT_LIMIT, user=None):
+    """
+    Run the checks (all, or those with the given keys) and return a report, limited to the objects `user` may view
+    if given. Each check runs a count and, if it found anything, fetches up to `limit` issues (all of them if `limit`
+    is None).
+    """
+    started = time.monotonic()
+    results = []
+    for key, title, model, queryset in get_checks():
+        if keys and key not in keys:
+            continue
+        if user is not None:
+            queryset = queryset.filter(object_id__in=model.objects.restrict(user, "view").values("pk"))
+        count = queryset.count()
+        issues = []
+        if count:
+            queryset = queryset.order_by("object_id")
+            issues = list(queryset if limit is None else queryset[:limit])
+        url_name = f"plugins:netbox_aws_resources_plugin:{model._meta.model_name}"
+        for issue in issues:
+            issue["url"] = reverse(url_name, kwargs={"pk": issue["object_id"]})
+        results.append({"key": key, "title": title, "model": model._meta.model_name, "count": count, "issues": issues})
+    return {
+        "checks": results,
+        "total": sum(result["count"] for result in results),
+        "duration": round(time.monotonic() - started, 3),
+    }
@@ -0,0 +1,133 @@
+"""
+Batched bulk editing for EC2 and RDS instances.
+
+NetBox's BulkEditView saves each selected object in turn: full_clean() checks every foreign key with a query, save()
+plans enrichment from the instance catalog and may save the linked VM, and signal handlers write the change log and
+invalidate cached data. bulk_edit_instances() makes the same edits a batch at a time:
+
+  - only the fields the form changed are assigned, validated and written, with one UPDATE per batch;
+  - enrichment (cost and linked VM specs) runs only if the instance type/class changed, planned once per batch;
+  - tags are added and removed with one query each per batch;
+  - each changed object still gets its change log entry and event, and the affected cache scopes are invalidated.
+"""
+
+from core.choices import ObjectChangeActionChoices
+from core.events import OBJECT_UPDATED
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from extras.models import TaggedItem
+
+from .caching import bump_versions_on_commit
+from .changelog import log_changes, prepare_update
+from .enrichment import plan_enrichment
+from .events import enqueue_events
+from .regions import set_region_from_vpc
+from .signals import get_invalidated_scopes
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def get_validation_exclude(model, fields):
+    """
+    Return the fields full_clean() should skip when only `fields` are being changed. Unchanged values were validated
+    when they were saved, and changed relations were validated by the form, so only changed plain fields are checked;
+    this avoids a query per object for every foreign key.
+    """
+    validated = {name for name in fields if not model._meta.get_field(name).is_relation}
+    return [field.name for field in model._meta.concrete_fields if field.name not in validated]
+
+
+def update_tags(instances, add_tags, remove_tags):
+    """Add and remove tags on a batch of objects, which must have their tags prefetched."""
+    if not instances:
+        return
+    content_type = ContentType.objects.get_for_model(instances[0])
+    if add_tags:
+        TaggedItem.objects.bulk_create(
+            [
+                TaggedItem(tag=tag, content_type=content_type, object_id=instance.pk)
+                for instance in instances
+                for tag in set(add_tags) - set(instance.tags.all())
+            ]
+        )
+    if remove_tags:
+        TaggedItem.objects.filter(
+            content_type=content_type, object_id__in=[instance.pk for instance in instances], tag__in=remove_tags
+        ).delete()
+
+
+def bulk_edit_instances(
+    queryset,
+    pks,
+    changes,
+    custom_field_changes=None,
+    add_tags=None,
+    remove_tags=None,
+    request=None,
+    batch_size=None,
+    changelog_message=None,
+):
+    """
+    Apply `changes` ({field: value}) and `custom_field_changes` ({custom field name: serialized value}) to the EC2 or
+    RDS instances in `queryset` with the given pks, and add/remove tags, a batch at a time in a single transaction.
+    If a request is given, the changes are recorded in the change log, with `changelog_message`, and queued as events.
+    Returns the updated instances.
+    """
+    model = queryset.model
+    custom_field_changes = custom_field_changes or {}
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    type_changed = model.catalog_type_field in changes
+
+    fields = [*changes, "last_updated"]
+    # Region follows the VPC (see regions.py)
+    vpc_changed = "vpc" in changes
+    if vpc_changed:
+        fields.append("region")
+    if custom_field_changes:
+        fields.append("custom_field_data")
+    queryset = queryset.prefetch_related("tags")
+    if type_changed:
+        fields.append("estimated_cost_usd_hourly")
+        queryset = queryset.select_related("virtual_machine").prefetch_related("virtual_machine__tags")
+    exclude = get_validation_exclude(model, changes)
+
+    updated = []
+    scopes = set()
+    with transaction.atomic():
+        for start in range(0, len(pks), batch_size):
+            end = start + batch_size
+            batch = list(queryset.filter(pk__in=pks[start:end]))
+            # The snapshots also give the cache scopes the instances are moving out of
+            prepare_update(batch)
+            for instance in batch:
+                for name, value in changes.items():
+                    setattr(instance, name, value)
+                if vpc_changed:
+                    set_region_from_vpc(instance)
+                instance.custom_field_data.update(custom_field_changes)
+                instance.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+
+            plan = plan_enrichment(batch) if type_changed else None
+            if plan:
+                plan.apply_costs()
+            model.objects.bulk_update(batch, fields)
+            if plan:
+                plan.save_vm_changes(request)
+
+            if add_tags or remove_tags:
+                update_tags(batch, add_tags, remove_tags)
+                # Reload the batch so its change log entries show the new tags
+                snapshots = {instance.pk: instance._prechange_snapshot for instance in batch}
+                batch = list(queryset.filter(pk__in=snapshots))
+                for instance in batch:
+                    instance._prechange_snapshot = snapshots[instance.pk]
+
+            if request is not None:
+                log_changes(batch, ObjectChangeActionChoices.ACTION_UPDATE, request, changelog_message)
+                enqueue_events(batch, OBJECT_UPDATED, request)
+            for instance in batch:
+                scopes |= get_invalidated_scopes(instance)
+            updated.extend(batch)
+
+    bump_versions_on_commit(*scopes)
+    return updated
@@ -0,0 +1,136 @@
+"""
+Versioned caching for derived plugin data (topology graphs, summaries, etc.).
+
+Cached values are stored under keys which embed the current version of every scope they depend on, e.g.
+"account:3" or "vpc:12". Changing an object bumps the versions of the scopes it belongs to (see signals.py), which
+orphans every cached value built from it without having to track or delete the individual keys. Versions are
+bumped once the change commits, so a value can't be cached under the new versions from data about to change.
+"""
+
+import time
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+CACHE_PREFIX = "netbox_aws_resources_plugin"
+CACHE_TIMEOUT = 60 * 60
+
+
+def account_scope(pk):
+    return f"account:{pk}"
+
+
+def vpc_scope(pk):
+    return f"vpc:{pk}"
+
+
+def region_scope(region):
+    return f"region:{region}"
+
+
+# Every VPC and subnet CIDR, as indexed for IP lookups (see ip_lookup.py)
+IP_INDEX_SCOPE = "ip-index"
+
+
+def _version_key(scope):
+    return f"{CACHE_PREFIX}:version:{scope}"
+
+
+def _new_version():
+    # Seed versions from the clock so a version key which has been evicted doesn't restart at a number that may still
+    # be embedded in old cache keys.
+    return time.time_ns()
+
+
+def get_versions(*scopes):
+    """Return the current version of each scope, initialising any that are missing."""
+    keys = {scope: _version_key(scope) for scope in scopes}
+    found = cache.get_many(list(keys.values()))
+    versions = []
+    for scope, key in keys.items():
+        version = found.get(key)
+        if version is None:
+            version = _new_version()
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+        versions.append(version)
+    return versions
+
+
+def bump_versions(*scopes):
+    """Invalidate everything cached under the given scopes."""
+    for scope in set(scopes):
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), None)
+
+
+def bump_versions_on_commit(*scopes):
+    """
+    bump_versions() once the current transaction commits (immediately outside of one). Bumping earlier would let a
+    concurrent request cache values built from the data as it was before the change, under the new versions.
+    """
+    transaction.on_commit(partial(bump_versions, *scopes))
+
+
+def get_or_build(name, scopes, builder, timeout=CACHE_TIMEOUT):
+    """
+    Return the value cached under `name` for the current versions of `scopes`, calling `builder()` to produce and
+    store it if there isn't one.
+    """
+    versions = get_versions(*scopes)
+    key = f"{CACHE_PREFIX}:{name}:" + ":".join(f"{scope}@{version}" for scope, version in zip(scopes, versions))
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, timeout)
+    return value
+
+
+def get_or_build_many(name, scopes_by_key, builder, timeout=CACHE_TIMEOUT):
+    """
+    Batched get_or_build(): return {key: value} for each key of `scopes_by_key` ({key: scopes}), each cached under
+    `name`, the key and the current versions of its scopes. The values are fetched with one cache round trip, and
+    the missing ones built together by `builder(missing keys)`, which returns {key: value}.
+    """
+    all_scopes = sorted({scope for scopes in scopes_by_key.values() for scope in scopes})
+    versions = dict(zip(all_scopes, get_versions(*all_scopes)))
+    cache_keys = {
+        key: f"{CACHE_PREFIX}:{name}:{key}:" + ":".join(f"{scope}@{versions[scope]}" for scope in scopes)
+        for key, scopes in scopes_by_key.items()
+    }
+    found = cache.get_many(list(cache_keys.values()))
+    values = {key: found[cache_key] for key, cache_key in cache_keys.items() if cache_key in found}
+    missing = [key for key in cache_keys if key not in values]
+    if missing:
+        built = builder(missing)
+        cache.set_many({cache_keys[key]: built[key] for key in missing if key in built}, timeout)
+        values.update(built)
+    return values
+
+
+def _lease_key(name):
+    return f"{CACHE_PREFIX}:lease:{name}"
+
+
+def acquire_lease(name, owner, timeout):
+    """Take the named lease for `owner` unless someone else holds it. Leases expire after `timeout` seconds."""
+    return cache.add(_lease_key(name), owner, timeout)
+
+
+def holds_lease(name, owner):
+    return cache.get(_lease_key(name)) == owner
+
+
+def renew_lease(name, owner, timeout):
+    """Extend the named lease to `timeout` seconds from now if `owner` still holds it. Returns whether it does."""
+    return holds_lease(name, owner) and cache.touch(_lease_key(name), timeout)
+
+
+def release_lease(name, owner):
+    """Release the named lease if `owner` still holds it."""
+    if holds_lease(name, owner):
+        cache.delete(_lease_key(name))
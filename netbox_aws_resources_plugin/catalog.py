@@ -0,0 +1,28 @@
+"""
+Instance type catalog (vCPU, memory and on-demand price per EC2 instance type and RDS instance class).
+
+The catalog ships as data/instance_data.json and is read once per process.
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+
+INSTANCE_DATA_FILE = Path(__file__).parent / "data" / "instance_data.json"
+
+
+@lru_cache(maxsize=None)
+def load_instance_data():
+    try:
+        with open(INSTANCE_DATA_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        # Fallback to an empty catalog if the file is missing or invalid
+        return {}
+
+
+def get_specs(kind, instance_type):
+    """Return the specs of an EC2 instance type (kind "ec2") or RDS instance class (kind "rds"), if known."""
+    if not instance_type:
+        return None
+    return load_instance_data().get(kind, {}).get(instance_type)
@@ -0,0 +1,43 @@
+"""
+Change logging for objects written in bulk.
+
+bulk_create() and bulk_update() bypass the signal handlers which record NetBox's change log, so bulk code paths
+record the changes themselves with log_changes(). The result is the same ObjectChange rows a per-object save() would
+have produced, inserted with a single query per batch.
+"""
+
+from core.models import ObjectChange
+from django.utils import timezone
+
+LOG_BATCH_SIZE = 1000
+
+
+def prepare_update(instances, snapshot=True):
+    """Snapshot objects before they are modified, and stamp them as updated, for a bulk_update()."""
+    now = timezone.now()
+    for instance in instances:
+        if snapshot:
+            instance.snapshot()
+        instance.last_updated = now
+
+
+def log_changes(instances, action, request, message=None):
+    """
+    Record a change log entry for each object, with an optional message (e.g. a bulk edit's changelog message).
+    Objects should have their tags prefetched (they are included in the serialized data) and, for updates, have been
+    snapshotted before being modified. Updates which didn't change anything are skipped, as they are for individual
+    saves.
+    """
+    changes = []
+    for instance in instances:
+        change = instance.to_objectchange(action)
+        if change is None or not change.has_changes:
+            continue
+        change.user = request.user
+        change.user_name = request.user.username
+        change.request_id = request.id
+        if message:
+            change.message = message
+        changes.append(change)
+    ObjectChange.objects.bulk_create(changes, batch_size=LOG_BATCH_SIZE)
+    return len(changes)
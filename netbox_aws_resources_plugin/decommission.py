@@ -0,0 +1,108 @@
+"""
+Decommissioning an AWS account or VPC together with everything in it.
+
+Every plugin foreign key is PROTECT, so an account or VPC can only be deleted once everything referencing it has
+been. get_subtree() selects that set with one query per model, following every relation which would block a delete:
+
+  - for an account: the account, its VPCs and their subnets, and every load balancer, target group and instance in
+    the account or in one of those VPCs or subnets;
+  - for a VPC: the VPC and its subnets, and every load balancer, target group and instance in the VPC or one of its
+    subnets.
+
+Member accounts of a decommissioned account aren't deleted; they become root accounts. DecommissionJob (jobs.py)
+deletes the subtree model by model in DELETION_ORDER, so nothing is deleted before the objects referencing it, and
+can also release the Prefixes used as the VPCs' and subnets' CIDR blocks.
+
+A subtree can only be deleted as a whole, as anything left behind blocks deleting its parents, so a user whose
+object permissions don't allow deleting every object in it (for instance, another account's load balancer in one
+of the VPCs) can't decommission it at all. get_undeletable() finds those objects.
+"""
+
+from django.db.models import Q
+from ipam.models import Prefix
+
+from .models import (
+    AWSVPC,
+    DELETION_ORDER,
+    AWSAccount,
+    AWSEC2Instance,
+    AWSLoadBalancer,
+    AWSRDSInstance,
+    AWSSubnet,
+    AWSTargetGroup,
+)
+
+# Models which can be decommissioned, by model name
+ROOT_MODELS = {model._meta.model_name: model for model in (AWSAccount, AWSVPC)}
+
+
+def get_required_permissions(release_prefixes=False):
+    """Return the permissions needed to decommission a subtree, which may include objects of every plugin model."""
+    permissions = [f"netbox_aws_resources_plugin.delete_{model._meta.model_name}" for model in DELETION_ORDER]
+    if release_prefixes:
+        permissions.append("ipam.delete_prefix")
+    return permissions
+
+
+def get_subtree(root):
+    """
+    Return a {model: queryset} of the objects to delete to decommission `root` (an AWSAccount or AWSVPC), in the
+    order in which they must be deleted. The querysets are lazy, and select by subquery, so each is evaluated as a
+    single query when it's needed.
+    """
+    if isinstance(root, AWSAccount):
+        accounts = AWSAccount.objects.filter(pk=root.pk)
+        vpcs = AWSVPC.objects.filter(aws_account=root)
+        in_scope = Q(aws_account=root) | Q(vpc__in=vpcs)
+    else:
+        accounts = AWSAccount.objects.none()
+        vpcs = AWSVPC.objects.filter(pk=root.pk)
+        in_scope = Q(vpc__in=vpcs)
+    subnets = AWSSubnet.objects.filter(aws_vpc__in=vpcs)
+    # Instances can also be blocked by their subnet
+    instance_scope = in_scope | Q(subnet__in=subnets)
+
+    subtree = {
+        AWSEC2Instance: AWSEC2Instance.objects.filter(instance_scope),
+        AWSRDSInstance: AWSRDSInstance.objects.filter(instance_scope),
+        AWSTargetGroup: AWSTargetGroup.objects.filter(in_scope),
+        AWSLoadBalancer: AWSLoadBalancer.objects.filter(in_scope),
+        AWSSubnet: subnets,
+        AWSVPC: vpcs,
+        AWSAccount: accounts,
+    }
+    return {model: subtree[model] for model in DELETION_ORDER}
+
+
+def get_prefixes(subtree):
+    """Return the Prefixes used as CIDR blocks by the VPCs and subnets in a subtree."""
+    return Prefix.objects.filter(
+        Q(pk__in=subtree[AWSVPC].values("cidr_block_id")) | Q(pk__in=subtree[AWSSubnet].values("cidr_block_id"))
+    )
+
+
+def get_undeletable(subtree, user, release_prefixes=False):
+    """
+    Return the number of objects of each model (by verbose name) in a subtree, and its Prefixes if they're to be
+    released, which `user` may not delete. Models whose every object the user may delete are omitted.
+    """
+    if user.is_superuser:
+        return {}
+    querysets = dict(subtree)
+    if release_prefixes:
+        querysets[Prefix] = get_prefixes(subtree)
+    undeletable = {}
+    for model, queryset in querysets.items():
+        count = queryset.exclude(pk__in=queryset.restrict(user, "delete").values("pk")).count()
+        if count:
+            undeletable[model._meta.verbose_name_plural] = count
+    return undeletable
+
+
+def get_plan(root, release_prefixes=False):
+    """Return the number of objects of each model (by verbose name) which decommissioning `root` would delete."""
+    subtree = get_subtree(root)
+    plan = {model._meta.verbose_name_plural: queryset.count() for model, queryset in subtree.items()}
+    if release_prefixes:
+        plan[Prefix._meta.verbose_name_plural] = get_prefixes(subtree).count()
+    return plan
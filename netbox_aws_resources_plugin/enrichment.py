@@ -0,0 +1,130 @@
+"""
+Spec enrichment for EC2 and RDS instances.
+
+Enrichment sets an instance's estimated hourly cost, and its linked VirtualMachine's vCPU count and memory, from the
+instance catalog. It runs in two steps:
+
+  1. plan_enrichment() looks up each distinct instance type in the catalog once and works out, in memory, which
+     instances' costs and which VMs' specs need to change. Nothing is written.
+  2. The plan is applied: by a single instance's save(), which assigns the cost before saving and saves its VM
+     after, or by EnrichmentPlan.apply() for a batch, which writes everything with bulk updates in one transaction.
+"""
+
+from decimal import Decimal
+
+from core.choices import ObjectChangeActionChoices
+from django.db import transaction
+from virtualization.models import VirtualMachine
+
+from .catalog import load_instance_data
+from .changelog import log_changes, prepare_update
+
+COST_QUANTUM = Decimal("0.00001")
+
+
+def get_cost(specs):
+    """Return the hourly cost from catalog specs as a Decimal matching the cost field's precision."""
+    if specs.get("price_usd_hourly") is None:
+        return None
+    return Decimal(str(specs["price_usd_hourly"])).quantize(COST_QUANTUM)
+
+
+def get_vm_changes(vm, specs):
+    """Return the {field: value} changes needed to bring a VM's vCPU count and memory (MB) in line with specs."""
+    changes = {}
+    if specs.get("vcpu") is not None and vm.vcpus != specs["vcpu"]:
+        changes["vcpus"] = specs["vcpu"]
+    if specs.get("ram_gb") is not None and vm.memory != specs["ram_gb"] * 1024:
+        changes["memory"] = specs["ram_gb"] * 1024
+    return changes
+
+
+class EnrichmentPlan:
+    """The cost and VM changes worked out for a batch of instances, to be applied together."""
+
+    def __init__(self):
+        # (instance, new cost) and (VM, {field: value}) pairs for the objects which need to change
+        self.costs = []
+        self.vm_changes = []
+
+    def __bool__(self):
+        return bool(self.costs or self.vm_changes)
+
+    def apply_costs(self):
+        """Assign the planned costs in memory. Returns the instances which changed."""
+        for instance, cost in self.costs:
+            instance.estimated_cost_usd_hourly = cost
+        return [instance for instance, _ in self.costs]
+
+    def apply_vm_changes(self):
+        """Assign the planned VM specs in memory. Returns the VMs which changed."""
+        for vm, changes in self.vm_changes:
+            for field, value in changes.items():
+                setattr(vm, field, value)
+        return [vm for vm, _ in self.vm_changes]
+
+    def apply(self, request=None):
+        """
+        Write the plan with one bulk update per model, in a single transaction. If a request is given, the VM
+        changes are recorded in the change log. Costs are derived data and are written without change log entries.
+        """
+        with transaction.atomic():
+            instances = {}
+            for instance in self.apply_costs():
+                instances.setdefault(type(instance), []).append(instance)
+            for model, changed in instances.items():
+                model.objects.bulk_update(changed, ["estimated_cost_usd_hourly"])
+            self.save_vm_changes(request)
+
+    def save_vm_changes(self, request=None):
+        """
+        Write the planned VM specs with one bulk update, recording them in the change log if a request is given (VMs
+        should have their tags prefetched).
+        """
+        vms = [vm for vm, _ in self.vm_changes]
+        prepare_update(vms, snapshot=request is not None)
+        self.apply_vm_changes()
+        VirtualMachine.objects.bulk_update(vms, ["vcpus", "memory", "last_updated"])
+        if request is not None:
+            log_changes(vms, ObjectChangeActionChoices.ACTION_UPDATE, request)
+
+
+def plan_enrichment(instances, catalog=None, costs=True, vm_specs=True):
+    """
+    Plan cost and VM spec changes for a batch of EC2/RDS instances (which may be of both models). Each distinct
+    instance type is looked up in the catalog once. VMs are read from `instance.virtual_machine`, so select them
+    with the instances to avoid a query per instance.
+    """
+    if catalog is None:
+        catalog = load_instance_data()
+
+    specs_by_type = {}
+    for instance in instances:
+        key = (instance.catalog_kind, getattr(instance, instance.catalog_type_field))
+        if key not in specs_by_type:
+            specs_by_type[key] = catalog.get(key[0], {}).get(key[1]) if key[1] else None
+
+    plan = EnrichmentPlan()
+    for instance in instances:
+        specs = specs_by_type[(instance.catalog_kind, getattr(instance, instance.catalog_type_field))]
+        if not specs:
+            continue
+
+        if costs:
+            cost = get_cost(specs)
+            if cost is not None and instance.estimated_cost_usd_hourly != cost:
+                plan.costs.append((instance, cost))
+
+        if vm_specs and instance.virtual_machine_id:
+            changes = get_vm_changes(instance.virtual_machine, specs)
+            if changes:
+                plan.vm_changes.append((instance.virtual_machine, changes))
+    return plan
+
+
+def enrich(instances, request=None, **options):
+    """Plan and apply enrichment for a batch of instances. Returns the plan."""
+    plan = plan_enrichment(instances, **options)
+    if plan:
+        plan.apply(request)
+    return plan
@@ -0,0 +1,226 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+
+from .models import AWSVPC, AWSAccount, AWSEC2Instance, AWSLoadBalancer, AWSRDSInstance, AWSSubnet, AWSTargetGroup
+
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMATS = (EXPORT_FORMAT_NDJSON, EXPORT_FORMAT_CSV)
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Columns written for each model, as (column name, ORM lookup). Parents are written by natural key so an export
+# can be fed straight back into the bulk import forms.
+EXPORT_COLUMNS = {
+    AWSAccount: (
+        ("id", "pk"),
+        ("account_id", "account_id"),
+        ("name", "name"),
+        ("tenant", "tenant__name"),
+        ("parent_account", "parent_account__account_id"),
+        ("created", "created"),
+        ("last_updated", "last_updated"),
+    ),
+    AWSVPC: (
+        ("id", "pk"),
+        ("name", "name"),
+        ("vpc_id", "vpc_id"),
+        ("aws_account", "aws_account__account_id"),
+        ("region", "region"),
+        ("cidr_block", "cidr_block__prefix"),
+        ("state", "state"),
+        ("is_default", "is_default"),
+        ("created", "created"),
+        ("last_updated", "last_updated"),
+    ),
+    AWSSubnet: (
+        ("id", "pk"),
+        ("name", "name"),
+        ("subnet_id", "subnet_id"),
+        ("aws_vpc", "aws_vpc__vpc_id"),
+        ("cidr_block", "cidr_block__prefix"),
+        ("availability_zone", "availability_zone"),
+        ("availability_zone_id", "availability_zone_id"),
+        ("state", "state"),
+        ("map_public_ip_on_launch", "map_public_ip_on_launch"),
+        ("created", "created"),
+        ("last_updated", "last_updated"),
+    ),
+    AWSLoadBalancer: (
+        ("id", "pk"),
+        ("name", "name"),
+        ("arn", "arn"),
+        ("aws_account", "aws_account__account_id"),
+        ("region", "region"),
+        ("vpc", "vpc__vpc_id"),
+        ("type", "type"),
+        ("scheme", "scheme"),
+        ("dns_name", "dns_name"),
+        ("state", "state"),
+        ("created", "created"),
+        ("last_updated", "last_updated"),
+    ),
+    AWSTargetGroup: (
+        ("id", "pk"),
+        ("name", "name"),
+        ("arn", "arn"),
+        ("aws_account", "aws_account__account_id"),
+        ("region", "region"),
+        ("vpc", "vpc__vpc_id"),
+        ("target_type", "target_type"),
+        ("health_check_protocol", "health_check_protocol"),
+        ("health_check_port", "health_check_port"),
+        ("health_check_path", "health_check_path"),
+        ("state", "state"),
+        ("created", "created"),
+        ("last_updated", "last_updated"),
+    ),
+    AWSEC2Instance: (
+        ("id", "pk"),
+        ("name", "name"),
+        ("instance_id", "instance_id"),
+        ("aws_account", "aws_account__account_id"),
+        ("region", "region"),
+        ("vpc", "vpc__vpc_id"),
+        ("subnet", "subnet__subnet_id"),
+        ("instance_type", "instance_type"),
+        ("state", "state"),
+        ("estimated_cost_usd_hourly", "estimated_cost_usd_hourly"),
+        ("virtual_machine", "virtual_machine__name"),
+        ("created", "created"),
+        ("last_updated", "last_updated"),
+    ),
+    AWSRDSInstance: (
+        ("id", "pk"),
+        ("name", "name"),
+        ("instance_id", "instance_id"),
+        ("aws_account", "aws_account__account_id"),
+        ("region", "region"),
+        ("vpc", "vpc__vpc_id"),
+        ("subnet", "subnet__subnet_id"),
+        ("instance_class", "instance_class"),
+        ("engine", "engine"),
+        ("engine_version", "engine_version"),
+        ("state", "state"),
+        ("estimated_cost_usd_hourly", "estimated_cost_usd_hourly"),
+        ("virtual_machine", "virtual_machine__name"),
+        ("created", "created"),
+        ("last_updated", "last_updated"),
+    ),
+}
+
+# Many-to-many columns, as (column name, field name, natural key of the related object). These are fetched once
+# per chunk from the through table rather than joined into the main query.
+EXPORT_M2M_COLUMNS = {
+    AWSLoadBalancer: (("subnets", "subnets", "subnet_id"),),
+    AWSTargetGroup: (("load_balancers", "load_balancers", "arn"),),
+}
+
+# Parents before children
+EXPORT_MODELS = tuple(EXPORT_COLUMNS)
+
+
+def get_export_model(name):
+    """Return the plugin model matching a model name (e.g. "awsvpc"), or None."""
+    for model in EXPORT_MODELS:
+        if model._meta.model_name == name.lower():
+            return model
+    return None
+
+
+def get_export_columns(model):
+    return [column for column, _ in EXPORT_COLUMNS[model]] + [
+        column for column, _, _ in EXPORT_M2M_COLUMNS.get(model, ())
+    ]
+
+
+def _to_text(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    # IPNetwork and anything else with a sensible string form
+    return str(value)
+
+
+def _attach_m2m(model, rows):
+    """Fill in the many-to-many columns for a chunk of rows with one query per relation."""
+    pks = [row["id"] for row in rows]
+    for column, field_name, natural_key in EXPORT_M2M_COLUMNS.get(model, ()):
+        field = model._meta.get_field(field_name)
+        through = field.remote_field.through
+        source = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+        related = defaultdict(list)
+        for source_id, key in (
+            through.objects.filter(**{f"{source}_id__in": pks})
+            .order_by(f"{source}_id", f"{target}_id")
+            .values_list(f"{source}_id", f"{target}__{natural_key}")
+            .iterator()
+        ):
+            related[source_id].append(key)
+        for row in rows:
+            row[column] = related.get(row["id"], [])
+
+
+def iter_model_rows(model, queryset=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield every object of `model` as a flat dict of export columns. Rows are read with a server-side cursor and
+    processed in chunks of `chunk_size`, so memory use doesn't depend on the size of the table.
+    """
+    if queryset is None:
+        queryset = model.objects.all()
+    columns = EXPORT_COLUMNS[model]
+    lookups = [lookup for _, lookup in columns]
+
+    chunk = []
+    for values in queryset.order_by("pk").values_list(*lookups).iterator(chunk_size=chunk_size):
+        chunk.append({column: _to_text(value) for (column, _), value in zip(columns, values)})
+        if len(chunk) >= chunk_size:
+            _attach_m2m(model, chunk)
+            yield from chunk
+            chunk = []
+    if chunk:
+        _attach_m2m(model, chunk)
+        yield from chunk
+
+
+def iter_ndjson(querysets, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield one JSON document per line for every object in `querysets`, a list of (model, queryset) pairs.
+    Each document carries a "model" key identifying its type.
+    """
+    for model, queryset in querysets:
+        model_name = model._meta.model_name
+        for row in iter_model_rows(model, queryset, chunk_size=chunk_size):
+            yield json.dumps({"model": model_name, **row}) + "\n"
+
+
+def iter_csv(model, queryset=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield CSV text for a single model, starting with a header row. Many-to-many columns are written as
+    comma-separated natural keys, matching the bulk import format.
+    """
+    columns = get_export_columns(model)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+
+    def drain():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return value
+
+    writer.writeheader()
+    yield drain()
+    for row in iter_model_rows(model, queryset, chunk_size=chunk_size):
+        for column, _, _ in EXPORT_M2M_COLUMNS.get(model, ()):
+            row[column] = ",".join(str(key) for key in row[column] if key)
+        writer.writerow({column: "" if row[column] is None else row[column] for column in columns})
+        yield drain()
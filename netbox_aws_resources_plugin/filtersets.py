@@ -38,7 +38,7 @@ class AWSAccountFilterSet(NetBoxModelFilterSet, TenancyFilterSet):
         model = AWSAccount
         # Fields that can be filtered on. Add new fields here.
         # tenant_id comes from TenancyFilterSet
-        fields = ["id", "account_id", "name", "parent_account", "is_root_account", "tag"]
+        fields = ["id", "account_id", "name", "parent_account", "is_root_account", "last_seen", "tag"]
 
     def filter_is_root_account(self, queryset, name, value):
         if value is True:
@@ -77,6 +77,7 @@ class AWSVPCFilterSet(NetBoxModelFilterSet):
             "cidr_block",
             "state",
             "is_default",
+            "last_seen",
             "tag",
         ]
 
@@ -108,6 +109,7 @@ class AWSSubnetFilterSet(NetBoxModelFilterSet):
             "availability_zone",
             "state",
             "map_public_ip_on_launch",
+            "last_seen",
             "tag",
         ]
 
@@ -134,6 +136,7 @@ class AWSEC2InstanceFilterSet(NetBoxModelFilterSet):
             "vpc_id",
             "state",
             "virtual_machine_id",
+            "last_seen",
             "tag",
         )
 
@@ -176,6 +179,7 @@ class AWSLoadBalancerFilterSet(NetBoxModelFilterSet):
             "scheme",
             "state",
             "subnets",
+            "last_seen",
             "tag",
         ]  # Changed 'tags' to 'tag'
 
@@ -216,6 +220,7 @@ class AWSTargetGroupFilterSet(NetBoxModelFilterSet):
             "target_type",
             "state",
             "load_balancers",
+            "last_seen",
             "tag",
         ]
 
@@ -242,6 +247,7 @@ class AWSRDSInstanceFilterSet(NetBoxModelFilterSet):
             "vpc_id",
             "state",
             "virtual_machine_id",
+            "last_seen",
             "tag",
         )
 
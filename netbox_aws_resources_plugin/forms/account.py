@@ -1,10 +1,11 @@
 from django import forms
 from tenancy.models import Tenant
 from utilities.forms.fields import DynamicModelChoiceField, TagFilterField
-from netbox.forms import NetBoxModelBulkEditForm, NetBoxModelFilterSetForm, NetBoxModelForm
+from netbox.forms import NetBoxModelBulkEditForm, NetBoxModelFilterSetForm, NetBoxModelForm, NetBoxModelImportForm
 
 from ..models import AWSAccount
 from ..filtersets import AWSAccountFilterSet
+from .fields import NaturalKeyCSVModelChoiceField
 
 
 class AWSAccountForm(NetBoxModelForm):
@@ -45,3 +46,19 @@ class AWSAccountBulkEditForm(NetBoxModelBulkEditForm):
 
     model = AWSAccount
     nullable_fields = ("name", "tenant", "parent_account")
+
+
+class AWSAccountImportForm(NetBoxModelImportForm):
+    tenant = NaturalKeyCSVModelChoiceField(
+        queryset=Tenant.objects.all(), required=False, to_field_name="name", help_text="Assigned tenant (name)"
+    )
+    parent_account = NaturalKeyCSVModelChoiceField(
+        queryset=AWSAccount.objects.all(),
+        required=False,
+        to_field_name="account_id",
+        help_text="Account ID of the parent (root) account",
+    )
+
+    class Meta:
+        model = AWSAccount
+        fields = ("account_id", "name", "tenant", "parent_account", "tags")
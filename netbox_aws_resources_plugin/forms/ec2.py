@@ -1,9 +1,9 @@
 import json
 from pathlib import Path
 from django import forms
-from utilities.forms.fields import DynamicModelChoiceField, TagFilterField
+from utilities.forms.fields import CSVChoiceField, DynamicModelChoiceField, TagFilterField
 from utilities.forms.widgets import APISelect
-from netbox.forms import NetBoxModelBulkEditForm, NetBoxModelFilterSetForm, NetBoxModelForm
+from netbox.forms import NetBoxModelBulkEditForm, NetBoxModelFilterSetForm, NetBoxModelForm, NetBoxModelImportForm
 from django.forms import DecimalField
 from virtualization.models import VirtualMachine
 from ..models import (
@@ -17,6 +17,7 @@ from ..models import (
     AWS_REGION_CHOICES,
 )
 from ..filtersets import AWSEC2InstanceFilterSet, AWSRDSInstanceFilterSet
+from .fields import NaturalKeyCSVModelChoiceField
 
 
 # Helper to load instance data from JSON
@@ -105,11 +106,8 @@ class AWSEC2InstanceForm(NetBoxModelForm):
 class AWSEC2InstanceBulkEditForm(NetBoxModelBulkEditForm):
     pk = forms.ModelMultipleChoiceField(queryset=AWSEC2Instance.objects.all(), widget=forms.MultipleHiddenInput)
     aws_account = DynamicModelChoiceField(queryset=AWSAccount.objects.all(), required=False, label="AWS Account")
-    region = forms.ChoiceField(
-        choices=[("", "---------")] + AWS_REGION_CHOICES,
-        required=False,
-    )
     vpc = DynamicModelChoiceField(queryset=AWSVPC.objects.all(), required=False, label="VPC")
+    instance_type = forms.ChoiceField(choices=load_instance_choices("ec2"), required=False, label="Instance Type")
     state = forms.ChoiceField(
         choices=[("", "---------")] + EC2_INSTANCE_STATE_CHOICES,
         required=False,
@@ -204,11 +202,8 @@ class AWSRDSInstanceForm(NetBoxModelForm):
 class AWSRDSInstanceBulkEditForm(NetBoxModelBulkEditForm):
     pk = forms.ModelMultipleChoiceField(queryset=AWSRDSInstance.objects.all(), widget=forms.MultipleHiddenInput)
     aws_account = DynamicModelChoiceField(queryset=AWSAccount.objects.all(), required=False, label="AWS Account")
-    region = forms.ChoiceField(
-        choices=[("", "---------")] + AWS_REGION_CHOICES,
-        required=False,
-    )
     vpc = DynamicModelChoiceField(queryset=AWSVPC.objects.all(), required=False, label="VPC")
+    instance_class = forms.ChoiceField(choices=load_instance_choices("rds"), required=False, label="Instance Class")
     state = forms.ChoiceField(
         choices=[("", "---------")] + RDS_INSTANCE_STATE_CHOICES,
         required=False,
@@ -236,3 +231,81 @@ class AWSRDSInstanceFilterForm(NetBoxModelFilterSetForm):
         queryset=VirtualMachine.objects.all(), required=False, label="Virtual Machine"
     )
     tag = TagFilterField(model)
+
+
+class AWSEC2InstanceImportForm(NetBoxModelImportForm):
+    aws_account = NaturalKeyCSVModelChoiceField(
+        queryset=AWSAccount.objects.all(), to_field_name="account_id", help_text="AWS Account ID (12 digits)"
+    )
+    region = CSVChoiceField(choices=AWS_REGION_CHOICES, help_text="AWS region code (e.g., us-east-1)")
+    vpc = NaturalKeyCSVModelChoiceField(
+        queryset=AWSVPC.objects.all(), to_field_name="vpc_id", help_text="VPC ID (e.g., vpc-012345abcdef)"
+    )
+    subnet = NaturalKeyCSVModelChoiceField(
+        queryset=AWSSubnet.objects.all(),
+        required=False,
+        to_field_name="subnet_id",
+        help_text="Subnet ID (e.g., subnet-012345abcdef)",
+    )
+    state = CSVChoiceField(choices=EC2_INSTANCE_STATE_CHOICES, required=False, help_text="Instance state")
+    virtual_machine = NaturalKeyCSVModelChoiceField(
+        queryset=VirtualMachine.objects.all(),
+        required=False,
+        to_field_name="name",
+        help_text="Name of the linked Virtual Machine",
+    )
+
+    class Meta:
+        model = AWSEC2Instance
+        fields = (
+            "name",
+            "instance_id",
+            "aws_account",
+            "region",
+            "vpc",
+            "subnet",
+            "instance_type",
+            "state",
+            "virtual_machine",
+            "tags",
+        )
+
+
+class AWSRDSInstanceImportForm(NetBoxModelImportForm):
+    aws_account = NaturalKeyCSVModelChoiceField(
+        queryset=AWSAccount.objects.all(), to_field_name="account_id", help_text="AWS Account ID (12 digits)"
+    )
+    region = CSVChoiceField(choices=AWS_REGION_CHOICES, help_text="AWS region code (e.g., us-east-1)")
+    vpc = NaturalKeyCSVModelChoiceField(
+        queryset=AWSVPC.objects.all(), to_field_name="vpc_id", help_text="VPC ID (e.g., vpc-012345abcdef)"
+    )
+    subnet = NaturalKeyCSVModelChoiceField(
+        queryset=AWSSubnet.objects.all(),
+        required=False,
+        to_field_name="subnet_id",
+        help_text="Subnet ID (e.g., subnet-012345abcdef)",
+    )
+    state = CSVChoiceField(choices=RDS_INSTANCE_STATE_CHOICES, required=False, help_text="Instance state")
+    virtual_machine = NaturalKeyCSVModelChoiceField(
+        queryset=VirtualMachine.objects.all(),
+        required=False,
+        to_field_name="name",
+        help_text="Name of the linked Virtual Machine",
+    )
+
+    class Meta:
+        model = AWSRDSInstance
+        fields = (
+            "name",
+            "instance_id",
+            "aws_account",
+            "region",
+            "vpc",
+            "subnet",
+            "instance_class",
+            "engine",
+            "engine_version",
+            "state",
+            "virtual_machine",
+            "tags",
+        )
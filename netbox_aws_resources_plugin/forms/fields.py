@@ -0,0 +1,101 @@
+import contextvars
+from contextlib import contextmanager
+
+from utilities.forms.fields import CSVModelChoiceField, CSVModelMultipleChoiceField
+
+# Natural key lookups resolved ahead of time for the bulk import in progress.
+# Maps (model, to_field_name) -> {natural key: object}. None outside of an import.
+_prefetched_lookups = contextvars.ContextVar("aws_resources_prefetched_lookups", default=None)
+
+# Marker stored for a natural key that matches more than one object (e.g. the same prefix in two VRFs)
+_AMBIGUOUS = object()
+
+
+def _lookup_key(field):
+    return field.queryset.model, field.to_field_name
+
+
+def _split_values(value):
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in str(value).split(",") if v.strip()]
+
+
+class NaturalKeyCSVModelChoiceField(CSVModelChoiceField):
+    """
+    A CSVModelChoiceField which resolves its value from the lookups prefetched for the current import,
+    falling back to a per-row query when no prefetch is active or the value wasn't prefetched (e.g. a parent
+    account created by an earlier row of the same import).
+    """
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        lookups = _prefetched_lookups.get()
+        if lookups is None or _lookup_key(self) not in lookups:
+            return super().to_python(value)
+
+        obj = lookups[_lookup_key(self)].get(str(value).strip())
+        if obj is None or obj is _AMBIGUOUS:
+            # Query for it, which also raises the parent class's usual errors for missing or ambiguous values
+            return super().to_python(value)
+        return obj
+
+
+class NaturalKeyCSVModelMultipleChoiceField(CSVModelMultipleChoiceField):
+    """
+    Multiple-object counterpart of NaturalKeyCSVModelChoiceField (e.g. a load balancer's subnets).
+    """
+
+    def clean(self, value):
+        lookups = _prefetched_lookups.get()
+        if lookups is None or _lookup_key(self) not in lookups or value in self.empty_values:
+            return super().clean(value)
+
+        resolved = []
+        for key in _split_values(value):
+            obj = lookups[_lookup_key(self)].get(key)
+            if obj is None or obj is _AMBIGUOUS:
+                return super().clean(value)
+            resolved.append(obj)
+        return resolved
+
+
+def _collect_values(records, field_name, multiple):
+    values = set()
+    for record in records:
+        value = record.get(field_name)
+        if value in (None, ""):
+            continue
+        if multiple:
+            values.update(_split_values(value))
+        else:
+            values.add(str(value).strip())
+    return values
+
+
+@contextmanager
+def prefetch_natural_keys(form_class, records):
+    """
+    Resolve every natural-key reference in `records` with one query per referenced field, and make the
+    results available to the form's NaturalKey* fields for the duration of the block.
+    """
+    lookups = {}
+    for field_name, field in form_class.base_fields.items():
+        multiple = isinstance(field, NaturalKeyCSVModelMultipleChoiceField)
+        if not (multiple or isinstance(field, NaturalKeyCSVModelChoiceField)):
+            continue
+        values = _collect_values(records, field_name, multiple)
+        bucket = lookups.setdefault(_lookup_key(field), {})
+        pending = values.difference(bucket)
+        if not pending:
+            continue
+        for obj in field.queryset.filter(**{f"{field.to_field_name}__in": pending}):
+            key = str(getattr(obj, field.to_field_name))
+            bucket[key] = _AMBIGUOUS if key in bucket else obj
+
+    token = _prefetched_lookups.set(lookups)
+    try:
+        yield lookups
+    finally:
+        _prefetched_lookups.reset(token)
@@ -2,12 +2,27 @@ from django import forms
 # from ipam.models import Prefix # Uncomment if needed for LB forms
 # from tenancy.models import Tenant # Uncomment if needed for LB forms
 from utilities.forms import BOOLEAN_WITH_BLANK_CHOICES, add_blank_choice
-from utilities.forms.fields import DynamicModelChoiceField, TagFilterField, DynamicModelMultipleChoiceField
+from utilities.forms.fields import (
+    CSVChoiceField,
+    DynamicModelChoiceField,
+    TagFilterField,
+    DynamicModelMultipleChoiceField,
+)
 from utilities.forms.widgets import APISelect, APISelectMultiple
-from netbox.forms import NetBoxModelBulkEditForm, NetBoxModelFilterSetForm, NetBoxModelForm
+from netbox.forms import NetBoxModelBulkEditForm, NetBoxModelFilterSetForm, NetBoxModelForm, NetBoxModelImportForm
 
-from ..models import AWSAccount, AWSVPC, AWSSubnet, AWSLoadBalancer
+from ..models import (
+    AWSAccount,
+    AWSVPC,
+    AWSSubnet,
+    AWSLoadBalancer,
+    AWS_REGION_CHOICES,
+    LOADBALANCER_SCHEME_CHOICES,
+    LOADBALANCER_STATE_CHOICES,
+    LOADBALANCER_TYPE_CHOICES,
+)
 from ..filtersets import AWSLoadBalancerFilterSet
+from .fields import NaturalKeyCSVModelChoiceField, NaturalKeyCSVModelMultipleChoiceField
 
 
 class AWSLoadBalancerForm(NetBoxModelForm):
@@ -125,3 +140,38 @@ class AWSLoadBalancerBulkEditForm(NetBoxModelBulkEditForm):
 
     model = AWSLoadBalancer
     nullable_fields = ["aws_account", "vpc", "type", "scheme", "state", "description", "comments"] # subnets can be cleared by not selecting any
+
+
+class AWSLoadBalancerImportForm(NetBoxModelImportForm):
+    aws_account = NaturalKeyCSVModelChoiceField(
+        queryset=AWSAccount.objects.all(), to_field_name="account_id", help_text="AWS Account ID (12 digits)"
+    )
+    region = CSVChoiceField(choices=AWS_REGION_CHOICES, help_text="AWS region code (e.g., us-east-1)")
+    vpc = NaturalKeyCSVModelChoiceField(
+        queryset=AWSVPC.objects.all(), to_field_name="vpc_id", help_text="VPC ID (e.g., vpc-012345abcdef)"
+    )
+    type = CSVChoiceField(choices=LOADBALANCER_TYPE_CHOICES, help_text="Load Balancer type")
+    scheme = CSVChoiceField(choices=LOADBALANCER_SCHEME_CHOICES, help_text="Load Balancer scheme")
+    state = CSVChoiceField(choices=LOADBALANCER_STATE_CHOICES, help_text="Operational state")
+    subnets = NaturalKeyCSVModelMultipleChoiceField(
+        queryset=AWSSubnet.objects.all(),
+        required=False,
+        to_field_name="subnet_id",
+        help_text="Comma-separated Subnet IDs",
+    )
+
+    class Meta:
+        model = AWSLoadBalancer
+        fields = (
+            "name",
+            "arn",
+            "aws_account",
+            "region",
+            "vpc",
+            "type",
+            "scheme",
+            "dns_name",
+            "state",
+            "subnets",
+            "tags",
+        )
@@ -3,12 +3,13 @@ import os
 from django import forms
 from ipam.models import Prefix
 from utilities.forms import BOOLEAN_WITH_BLANK_CHOICES, add_blank_choice
-from utilities.forms.fields import DynamicModelChoiceField
+from utilities.forms.fields import CSVChoiceField, DynamicModelChoiceField
 from utilities.forms.widgets import APISelect
-from netbox.forms import NetBoxModelBulkEditForm, NetBoxModelFilterSetForm, NetBoxModelForm
+from netbox.forms import NetBoxModelBulkEditForm, NetBoxModelFilterSetForm, NetBoxModelForm, NetBoxModelImportForm
 
-from ..models import AWSVPC, AWSSubnet
+from ..models import AWSVPC, AWSSubnet, AWS_SUBNET_STATE_CHOICES
 from ..filtersets import AWSSubnetFilterSet
+from .fields import NaturalKeyCSVModelChoiceField
 
 # Load AZ data from JSON file
 file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "az_data.json")
@@ -79,3 +80,33 @@ class AWSSubnetBulkEditForm(NetBoxModelBulkEditForm):
 
     model = AWSSubnet
     nullable_fields = ("aws_vpc", "availability_zone", "state", "map_public_ip_on_launch")
+
+
+class AWSSubnetImportForm(NetBoxModelImportForm):
+    aws_vpc = NaturalKeyCSVModelChoiceField(
+        # The VPC's prefix is needed by AWSSubnet.clean(), so fetch it alongside the VPC
+        queryset=AWSVPC.objects.select_related("cidr_block"),
+        to_field_name="vpc_id",
+        help_text="VPC ID of the parent VPC (e.g., vpc-012345abcdef)",
+    )
+    cidr_block = NaturalKeyCSVModelChoiceField(
+        queryset=Prefix.objects.all(),
+        required=False,
+        to_field_name="prefix",
+        help_text="CIDR block of the subnet (e.g., 10.0.1.0/24)",
+    )
+    state = CSVChoiceField(choices=AWS_SUBNET_STATE_CHOICES, required=False, help_text="Operational state")
+
+    class Meta:
+        model = AWSSubnet
+        fields = (
+            "name",
+            "subnet_id",
+            "aws_vpc",
+            "cidr_block",
+            "availability_zone",
+            "availability_zone_id",
+            "state",
+            "map_public_ip_on_launch",
+            "tags",
+        )
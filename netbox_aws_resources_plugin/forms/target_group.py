@@ -1,8 +1,13 @@
 from django import forms
 from utilities.forms import add_blank_choice
-from utilities.forms.fields import DynamicModelChoiceField, DynamicModelMultipleChoiceField, TagFilterField
+from utilities.forms.fields import (
+    CSVChoiceField,
+    DynamicModelChoiceField,
+    DynamicModelMultipleChoiceField,
+    TagFilterField,
+)
 from utilities.forms.widgets import APISelect, APISelectMultiple
-from netbox.forms import NetBoxModelForm, NetBoxModelFilterSetForm, NetBoxModelBulkEditForm
+from netbox.forms import NetBoxModelForm, NetBoxModelFilterSetForm, NetBoxModelBulkEditForm, NetBoxModelImportForm
 
 from ipam.models import Service
 from ..models import (
@@ -15,6 +20,7 @@ from ..models import (
     TARGET_GROUP_HEALTH_CHECK_PROTOCOL_CHOICES,
 )
 from ..filtersets import AWSTargetGroupFilterSet
+from .fields import NaturalKeyCSVModelChoiceField, NaturalKeyCSVModelMultipleChoiceField
 
 
 class AWSTargetGroupForm(NetBoxModelForm):
@@ -164,3 +170,45 @@ class AWSTargetGroupBulkEditForm(NetBoxModelBulkEditForm):
         "healthy_threshold_count",
         "unhealthy_threshold_count",
     ]
+
+
+class AWSTargetGroupImportForm(NetBoxModelImportForm):
+    aws_account = NaturalKeyCSVModelChoiceField(
+        queryset=AWSAccount.objects.all(), to_field_name="account_id", help_text="AWS Account ID (12 digits)"
+    )
+    vpc = NaturalKeyCSVModelChoiceField(
+        queryset=AWSVPC.objects.all(),
+        to_field_name="vpc_id",
+        help_text="VPC ID (e.g., vpc-012345abcdef). Region is derived from this VPC.",
+    )
+    target_type = CSVChoiceField(choices=TARGET_GROUP_TYPE_CHOICES, help_text="Type of targets")
+    load_balancers = NaturalKeyCSVModelMultipleChoiceField(
+        queryset=AWSLoadBalancer.objects.all(),
+        required=False,
+        to_field_name="arn",
+        help_text="Comma-separated Load Balancer ARNs",
+    )
+    health_check_protocol = CSVChoiceField(
+        choices=TARGET_GROUP_HEALTH_CHECK_PROTOCOL_CHOICES, required=False, help_text="Protocol for health checks"
+    )
+    state = CSVChoiceField(choices=AWS_TARGET_GROUP_STATE_CHOICES, required=False, help_text="Operational state")
+
+    class Meta:
+        model = AWSTargetGroup
+        fields = (
+            "name",
+            "arn",
+            "aws_account",
+            "vpc",
+            "target_type",
+            "load_balancers",
+            "health_check_protocol",
+            "health_check_port",
+            "health_check_path",
+            "health_check_interval_seconds",
+            "health_check_timeout_seconds",
+            "healthy_threshold_count",
+            "unhealthy_threshold_count",
+            "state",
+            "tags",
+        )
@@ -2,10 +2,12 @@ from django import forms
 from ipam.models import Prefix
 from utilities.forms.fields import DynamicModelChoiceField, TagFilterField
 from utilities.forms.widgets import APISelect
-from netbox.forms import NetBoxModelBulkEditForm, NetBoxModelFilterSetForm, NetBoxModelForm
+from utilities.forms.fields import CSVChoiceField
+from netbox.forms import NetBoxModelBulkEditForm, NetBoxModelFilterSetForm, NetBoxModelForm, NetBoxModelImportForm
 
-from ..models import AWSAccount, AWSVPC
+from ..models import AWSAccount, AWSVPC, AWS_REGION_CHOICES, AWS_VPC_STATE_CHOICES
 from ..filtersets import AWSVPCFilterSet
+from .fields import NaturalKeyCSVModelChoiceField
 
 
 class AWSVPCForm(NetBoxModelForm):
@@ -68,3 +70,18 @@ class AWSVPCBulkEditForm(NetBoxModelBulkEditForm):
 
     model = AWSVPC
     nullable_fields = ("name", "aws_account", "region", "cidr_block", "state", "is_default")
+
+
+class AWSVPCImportForm(NetBoxModelImportForm):
+    aws_account = NaturalKeyCSVModelChoiceField(
+        queryset=AWSAccount.objects.all(), to_field_name="account_id", help_text="AWS Account ID (12 digits)"
+    )
+    region = CSVChoiceField(choices=AWS_REGION_CHOICES, help_text="AWS region code (e.g., us-east-1)")
+    cidr_block = NaturalKeyCSVModelChoiceField(
+        queryset=Prefix.objects.all(), to_field_name="prefix", help_text="Primary CIDR block (e.g., 10.0.0.0/16)"
+    )
+    state = CSVChoiceField(choices=AWS_VPC_STATE_CHOICES, required=False, help_text="Operational state")
+
+    class Meta:
+        model = AWSVPC
+        fields = ("name", "vpc_id", "aws_account", "region", "cidr_block", "state", "is_default", "tags")
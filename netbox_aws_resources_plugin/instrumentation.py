@@ -0,0 +1,136 @@
+"""
+Query and latency instrumentation for the plugin's views and API endpoints.
+
+QueryMetricsMiddleware wraps every request to the plugin's UI and API URLs with a database execute wrapper. For each
+request it records the number of queries, the time spent in the database and the rest of the request time
+(mostly view logic and rendering), labelled by URL name, so an API list and detail are measured separately.
+
+The measurements are exported as Prometheus metrics alongside NetBox's own (served at /metrics when METRICS_ENABLED
+is set). A request which runs the same SQL statement `n_plus_one_threshold` or more times, the signature of an N+1
+query, is logged as a warning and counted. If `query_debug_header` is enabled, the measurements are also returned
+in response headers.
+"""
+
+import logging
+import time
+from collections import Counter
+
+from django.db import connection
+from netbox.plugins import get_plugin_config
+
+try:
+    from prometheus_client import Counter as MetricCounter
+    from prometheus_client import Histogram
+except ImportError:
+    MetricCounter = Histogram = None
+
+logger = logging.getLogger("netbox_aws_resources_plugin.instrumentation")
+
+PLUGIN_NAME = "netbox_aws_resources_plugin"
+# Appears in the path of every plugin UI and API URL
+PLUGIN_URL_SEGMENT = "/netbox-aws-resources-plugin/"
+
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, float("inf"))
+
+if Histogram is not None:
+    REQUEST_SECONDS = Histogram(
+        "netbox_aws_plugin_request_seconds", "Time taken to handle a plugin request", ["view", "method"]
+    )
+    DB_SECONDS = Histogram(
+        "netbox_aws_plugin_request_db_seconds", "Time spent in database queries per plugin request", ["view", "method"]
+    )
+    RENDER_SECONDS = Histogram(
+        "netbox_aws_plugin_request_render_seconds",
+        "Time spent outside the database (view logic and rendering) per plugin request",
+        ["view", "method"],
+    )
+    QUERY_COUNT = Histogram(
+        "netbox_aws_plugin_request_queries",
+        "Database queries per plugin request",
+        ["view", "method"],
+        buckets=QUERY_BUCKETS,
+    )
+    REPEATED_QUERIES = MetricCounter(
+        "netbox_aws_plugin_repeated_queries",
+        "Plugin requests in which a statement was repeated at least n_plus_one_threshold times (likely N+1)",
+        ["view", "method"],
+    )
+
+
+class QueryCollector:
+    """Database execute wrapper which counts and times the queries run through it."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            # Parameters are passed separately, so the same query for different rows has the same SQL
+            self.statements[sql] += 1
+
+    def get_repeated(self, threshold):
+        """Return (SQL, count) pairs for statements run at least `threshold` times, most repeated first."""
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+def get_view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else "unresolved"
+
+
+class QueryMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if PLUGIN_URL_SEGMENT not in request.path_info or not get_plugin_config(PLUGIN_NAME, "query_instrumentation"):
+            return self.get_response(request)
+
+        collector = QueryCollector()
+        started = time.perf_counter()
+        # Template and API responses are rendered before they reach middleware, so rendering is included. The body
+        # of a streaming response is produced after this returns and isn't.
+        with connection.execute_wrapper(collector):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        view, method = get_view_name(request), request.method
+        repeated = collector.get_repeated(get_plugin_config(PLUGIN_NAME, "n_plus_one_threshold"))
+
+        if Histogram is not None:
+            REQUEST_SECONDS.labels(view, method).observe(elapsed)
+            DB_SECONDS.labels(view, method).observe(collector.duration)
+            RENDER_SECONDS.labels(view, method).observe(max(elapsed - collector.duration, 0))
+            QUERY_COUNT.labels(view, method).observe(collector.count)
+            if repeated:
+                REPEATED_QUERIES.labels(view, method).inc()
+
+        if repeated:
+            sql, count = repeated[0]
+            logger.warning(
+                "Possible N+1 in %s %s (%s): %d statement(s) repeated, worst %d times in %d queries: %s",
+                method,
+                request.path,
+                view,
+                len(repeated),
+                count,
+                collector.count,
+                sql[:300],
+            )
+
+        if get_plugin_config(PLUGIN_NAME, "query_debug_header"):
+            response["X-Query-Count"] = str(collector.count)
+            response["Server-Timing"] = (
+                f"db;dur={collector.duration * 1000:.1f}, app;dur={(elapsed - collector.duration) * 1000:.1f}"
+            )
+            if repeated:
+                response["X-Repeated-Queries"] = ", ".join(str(count) for _, count in repeated[:5])
+
+        return response
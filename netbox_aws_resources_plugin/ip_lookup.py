@@ -0,0 +1,261 @@
+"""
+IP address to AWS resource lookup.
+
+lookup_ips() answers "who owns this address?" for one or many IPs: the subnets and VPCs whose CIDR blocks contain it,
+with their accounts, and the EC2/RDS instances whose linked virtual machine has the address assigned. Private ranges
+are commonly reused across accounts, so an address can belong to a subnet in more than one VPC; every match is
+returned, most specific first.
+
+Containment is answered from an in-memory longest-prefix-match index of every VPC and subnet CIDR, held per process:
+one dictionary per prefix length in use, keyed by network address, so matching an address takes one dictionary probe
+per length (a few dozen at most) whatever the size of the inventory. Any change to a VPC, subnet or Prefix bumps the
+index's cache version (see signals.py). On next use the index catches up incrementally: it reloads only the VPCs and
+subnets updated since it was last refreshed, and drops deleted ones, rather than rebuilding from scratch. Objects are
+then fetched with one query per model for the whole batch of addresses.
+"""
+
+import threading
+from datetime import timedelta
+
+import netaddr
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+from ipam.models import IPAddress
+from virtualization.models import VMInterface
+
+from .caching import IP_INDEX_SCOPE, get_versions
+from .models import AWSVPC, AWSAccount, AWSEC2Instance, AWSRDSInstance, AWSSubnet
+
+# Addresses accepted in one lookup
+MAX_LOOKUP_IPS = 10000
+
+# Changes are reloaded from slightly before the last refresh, to catch transactions which committed after it but
+# stamped an earlier last_updated
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+INSTANCE_MODELS = (AWSEC2Instance, AWSRDSInstance)
+
+
+class PrefixIndex:
+    """Longest-prefix-match index of CIDR blocks, each identified by a key (e.g. a primary key)."""
+
+    def __init__(self):
+        # (IP version, prefix length) -> {network address: {keys}}
+        self.tables = {}
+        # IP version -> prefix lengths in use, longest first
+        self.lengths = {4: [], 6: []}
+        # key -> (IP version, prefix length, network address)
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key, network):
+        """Index a netaddr.IPNetwork under `key`, replacing the key's previous network."""
+        self.remove(key)
+        entry = (network.version, network.prefixlen, network.first)
+        table = self.tables.get(entry[:2])
+        if table is None:
+            table = self.tables[entry[:2]] = {}
+            self.lengths[network.version] = sorted({*self.lengths[network.version], network.prefixlen}, reverse=True)
+        table.setdefault(network.first, set()).add(key)
+        self.entries[key] = entry
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        version, length, first = entry
+        table = self.tables[(version, length)]
+        table[first].discard(key)
+        if not table[first]:
+            del table[first]
+        if not table:
+            del self.tables[(version, length)]
+            self.lengths[version].remove(length)
+
+    def match(self, address):
+        """Return the keys of every network containing a netaddr.IPAddress, most specific first."""
+        bits = 32 if address.version == 4 else 128
+        value = int(address)
+        keys = []
+        for length in self.lengths[address.version]:
+            shift = bits - length
+            found = self.tables[(address.version, length)].get(value >> shift << shift)
+            if found:
+                keys.extend(sorted(found))
+        return keys
+
+
+class IPIndex:
+    """The CIDR blocks of every VPC and subnet, kept up to date with the database (see the module docstring)."""
+
+    def __init__(self):
+        self.vpcs = PrefixIndex()
+        self.subnets = PrefixIndex()
+        self.version = None
+        self.refreshed = None
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """Catch up with changes made since the last refresh, if the index's cache version says there were any."""
+        version = get_versions(IP_INDEX_SCOPE)[0]
+        if version == self.version:
+            return
+        started = timezone.now()
+        for model, index in ((AWSVPC, self.vpcs), (AWSSubnet, self.subnets)):
+            queryset = model.objects.all()
+            if self.refreshed is not None:
+                since = self.refreshed - REFRESH_OVERLAP
+                queryset = queryset.filter(Q(last_updated__gte=since) | Q(cidr_block__last_updated__gte=since))
+                existing = set(model.objects.values_list("pk", flat=True))
+                for pk in set(index.entries) - existing:
+                    index.remove(pk)
+            for pk, prefix in queryset.values_list("pk", "cidr_block__prefix"):
+                if prefix is None:
+                    index.remove(pk)
+                else:
+                    index.add(pk, netaddr.IPNetwork(prefix))
+        self.version, self.refreshed = version, started
+
+    def match(self, addresses):
+        """Return {address: (matching subnet pks, matching VPC pks)}, each most specific first."""
+        with self.lock:
+            self.refresh()
+            return {address: (self.subnets.match(address), self.vpcs.match(address)) for address in addresses}
+
+
+_index = IPIndex()
+
+
+def parse_ips(values):
+    """Parse IP address strings, returning (unique netaddr.IPAddresses in order, invalid values)."""
+    addresses, invalid = {}, []
+    for value in values:
+        # netaddr would read an integer as an address, but JSON numbers and nulls are mistakes
+        if not isinstance(value, str):
+            invalid.append(value)
+            continue
+        try:
+            address = netaddr.IPAddress(value.strip())
+        except (netaddr.AddrFormatError, ValueError, TypeError):
+            invalid.append(value)
+        else:
+            addresses.setdefault(address, None)
+    return list(addresses), invalid
+
+
+def _url(instance):
+    return reverse(f"plugins:netbox_aws_resources_plugin:{instance._meta.model_name}", kwargs={"pk": instance.pk})
+
+
+def _restrict(queryset, user):
+    return queryset.restrict(user, "view") if user is not None else queryset
+
+
+def describe_account(account):
+    return {"id": account.pk, "name": account.name, "account_id": account.account_id, "url": _url(account)}
+
+
+def describe_vpc(vpc):
+    return {
+        "id": vpc.pk,
+        "name": vpc.name,
+        "vpc_id": vpc.vpc_id,
+        "cidr_block": str(vpc.cidr_block.prefix) if vpc.cidr_block else None,
+        "region": vpc.region,
+        "url": _url(vpc),
+    }
+
+
+def describe_subnet(subnet):
+    return {
+        "id": subnet.pk,
+        "name": subnet.name,
+        "subnet_id": subnet.subnet_id,
+        "cidr_block": str(subnet.cidr_block.prefix) if subnet.cidr_block else None,
+        "url": _url(subnet),
+    }
+
+
+def describe_instance(instance):
+    return {
+        "model": instance._meta.model_name,
+        "id": instance.pk,
+        "name": instance.name,
+        "instance_id": instance.instance_id,
+        "url": _url(instance),
+    }
+
+
+def get_instances_by_ip(addresses, user=None):
+    """Return {address: [EC2/RDS instances]} for instances whose linked VM has one of the addresses assigned."""
+    vm_ips = IPAddress.objects.filter(
+        address__net_in=[str(address) for address in addresses],
+        assigned_object_type=ContentType.objects.get_for_model(VMInterface),
+    ).values_list("address", "vminterface__virtual_machine_id")
+    vms_by_ip = {}
+    for address, vm_id in vm_ips:
+        vms_by_ip.setdefault(address.ip, set()).add(vm_id)
+    if not vms_by_ip:
+        return {}
+
+    vm_ids = set().union(*vms_by_ip.values())
+    instances_by_vm = {}
+    for model in INSTANCE_MODELS:
+        for instance in _restrict(model.objects.filter(virtual_machine_id__in=vm_ids), user):
+            instances_by_vm.setdefault(instance.virtual_machine_id, []).append(instance)
+    return {
+        address: [instance for vm_id in sorted(vms) for instance in instances_by_vm.get(vm_id, [])]
+        for address, vms in vms_by_ip.items()
+    }
+
+
+def lookup_ips(addresses, user=None):
+    """
+    Find the owners of each netaddr.IPAddress, limited to the objects `user` may view if given. Returns a list of
+    {"ip", "matches", "instances"}, where each match holds the containing subnet (or None, if only the VPC's CIDR
+    contains the address), VPC and account. A subnet's VPC or account which the user may not view is given as None.
+    """
+    matched = _index.match(addresses)
+    subnet_pks = {pk for subnets, _ in matched.values() for pk in subnets}
+    subnets = _restrict(AWSSubnet.objects.filter(pk__in=subnet_pks), user).select_related("cidr_block")
+    subnets = {subnet.pk: subnet for subnet in subnets}
+    vpc_pks = {pk for _, vpcs in matched.values() for pk in vpcs} | {subnet.aws_vpc_id for subnet in subnets.values()}
+    vpcs = {vpc.pk: vpc for vpc in AWSVPC.objects.filter(pk__in=vpc_pks).select_related("cidr_block")}
+    if user is not None and not user.is_superuser:
+        visible_vpcs = set(_restrict(AWSVPC.objects.filter(pk__in=vpcs), user).values_list("pk", flat=True))
+    else:
+        visible_vpcs = set(vpcs)
+    accounts = _restrict(AWSAccount.objects.filter(pk__in={vpc.aws_account_id for vpc in vpcs.values()}), user)
+    accounts = {account.pk: account for account in accounts}
+    instances = get_instances_by_ip(addresses, user)
+
+    def describe_match(subnet, vpc):
+        account = accounts.get(vpc.aws_account_id)
+        return {
+            "subnet": describe_subnet(subnet) if subnet else None,
+            "vpc": describe_vpc(vpc) if vpc.pk in visible_vpcs else None,
+            "aws_account": describe_account(account) if account else None,
+        }
+
+    results = []
+    for address in addresses:
+        subnet_matches, vpc_matches = matched[address]
+        matched_subnets = [subnets[pk] for pk in subnet_matches if pk in subnets]
+        matches = [describe_match(subnet, vpcs[subnet.aws_vpc_id]) for subnet in matched_subnets]
+        # VPCs containing the address outside any of their subnets
+        in_subnets = {subnet.aws_vpc_id for subnet in matched_subnets}
+        for pk in vpc_matches:
+            if pk in visible_vpcs and pk not in in_subnets:
+                matches.append(describe_match(None, vpcs[pk]))
+        results.append(
+            {
+                "ip": str(address),
+                "matches": matches,
+                "instances": [describe_instance(instance) for instance in instances.get(address, [])],
+            }
+        )
+    return results
@@ -0,0 +1,440 @@
+"""
+Background jobs for the plugin's bulk operations.
+
+Each job walks its querysets in primary-key chunks and processes every chunk in its own transaction, so a failure
+only rolls back the chunk it happened in. Progress (objects processed, failed chunks and per-job results) is written
+to the job's data as it goes and is shown on the plugin's Background Jobs page and in NetBox's own job views.
+
+Periodic reconciliation is sharded by AWS account and region: a system job queues one ReconcileShardJob per shard,
+so the shards are spread across however many RQ workers are running. Each shard holds a cache lease from the moment
+it's queued until it finishes, so a shard is never queued or processed twice at once. The lease is renewed before
+each reconciliation step, and a shard which finds it has lost its lease (having run past the lease timeout) stops.
+"""
+
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from functools import cached_property
+
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django_rq import get_queue
+from ipam.models import Prefix
+from netbox.jobs import JobRunner, system_job
+from netbox.plugins import get_plugin_config
+from utilities.rqworker import get_queue_for_model, get_workers_for_queue
+from virtualization.models import Cluster, VirtualMachine
+
+from . import decommission, staleness
+from .caching import acquire_lease, bump_versions, holds_lease, release_lease, renew_lease
+from .enrichment import enrich
+from .events import batched_events, make_sync_request
+from .models import AWSVPC, AWSAccount, AWSEC2Instance, AWSLoadBalancer, AWSRDSInstance, AWSSubnet, AWSTargetGroup
+from .signals import get_cache_scopes
+from .vm_linkage import INSTANCE_MODELS, link_virtual_machines, sync_vm_specs
+
+DEFAULT_CHUNK_SIZE = 500
+# Cap on the number of errors/issues stored in the job data
+MAX_REPORTED = 1000
+
+
+def _scoped(queryset, aws_account_id=None, region=None):
+    if aws_account_id is not None:
+        queryset = queryset.filter(aws_account_id=aws_account_id)
+    if region is not None:
+        queryset = queryset.filter(region=region)
+    return queryset
+
+
+class ProgressJob(JobRunner, ABC):
+    """Base for jobs which record their progress (objects processed, failed chunks and results) in the job's data."""
+
+    @cached_property
+    def request(self):
+        """Request to attribute bulk changes to in the change log, if the job was started by a user."""
+        return make_sync_request(self.job.user) if self.job.user else None
+
+    def save_progress(self):
+        self.job.save(update_fields=["data"])
+
+    def report(self, key, item):
+        """Record a result item (e.g. a validation issue) in the job data."""
+        items = self.progress["results"].setdefault(key, [])
+        if len(items) < MAX_REPORTED:
+            items.append(item)
+
+    def start_progress(self, total):
+        self.progress = {"total": total, "processed": 0, "failed": 0, "errors": [], "results": {}}
+        self.job.data = self.progress
+        self.save_progress()
+
+    def check_failures(self):
+        if self.progress["failed"]:
+            raise RuntimeError(
+                f"{self.progress['failed']} of {self.progress['total']} objects failed; completed chunks were kept"
+            )
+
+
+class ChunkedJob(ProgressJob):
+    """Base for jobs which process one or more querysets in chunks, each in its own transaction."""
+
+    chunk_size = DEFAULT_CHUNK_SIZE
+
+    @abstractmethod
+    def process_chunk(self, model, pks):
+        """Process the objects with the given primary keys. Called inside a transaction."""
+
+    def process_queryset(self, queryset, chunk_size=None):
+        """Run process_chunk() over the queryset in primary-key chunks, each in its own transaction."""
+        chunk_size = chunk_size or self.chunk_size
+        pks = list(queryset.order_by("pk").values_list("pk", flat=True))
+        for start in range(0, len(pks), chunk_size):
+            end = start + chunk_size
+            chunk = pks[start:end]
+            try:
+                with transaction.atomic():
+                    self.process_chunk(queryset.model, chunk)
+            except Exception as e:
+                self.progress["failed"] += len(chunk)
+                if len(self.progress["errors"]) < MAX_REPORTED:
+                    self.progress["errors"].append(
+                        {"model": queryset.model._meta.model_name, "pks": [chunk[0], chunk[-1]], "error": repr(e)}
+                    )
+            self.progress["processed"] += len(chunk)
+            self.save_progress()
+
+
+class ScopedChunkedJob(ChunkedJob):
+    """
+    Base for chunked jobs over the whole inventory, or one AWS account and/or region of it. These can be started from
+    the Background Jobs page and the API, and are the steps of a reconciliation run.
+
+    A job started by a user only processes the objects the user's object permissions allow: get_querysets() should
+    pass its querysets through restrict().
+    """
+
+    # Permissions a user needs to start the job from the UI or API
+    permissions = ()
+
+    @abstractmethod
+    def get_querysets(self, aws_account_id=None, region=None):
+        """Return the querysets to process, optionally limited to one account and/or region."""
+
+    def restrict(self, queryset, action="view"):
+        """Limit a queryset to the objects the job's user may act on. System jobs (with no user) process everything."""
+        return queryset.restrict(self.job.user, action) if self.job.user else queryset
+
+    def run(self, *args, chunk_size=None, **filters):
+        querysets = self.get_querysets(**filters)
+        self.start_progress(sum(queryset.count() for queryset in querysets))
+        for queryset in querysets:
+            self.process_queryset(queryset, chunk_size)
+        self.check_failures()
+
+
+class RecomputeCostsJob(ScopedChunkedJob):
+    """Reprice every EC2 and RDS instance from the instance catalog."""
+
+    permissions = (
+        "netbox_aws_resources_plugin.change_awsec2instance",
+        "netbox_aws_resources_plugin.change_awsrdsinstance",
+    )
+
+    class Meta:
+        name = "Recompute AWS instance costs"
+
+    def get_querysets(self, aws_account_id=None, region=None):
+        return [
+            self.restrict(_scoped(model.objects.all(), aws_account_id, region), "change") for model in INSTANCE_MODELS
+        ]
+
+    def process_chunk(self, model, pks):
+        instances = model.objects.filter(pk__in=pks).only(
+            "pk", "aws_account", "region", "vpc", model.catalog_type_field, "estimated_cost_usd_hourly"
+        )
+        plan = enrich(list(instances), vm_specs=False)
+        changed = [instance for instance, _ in plan.costs]
+        bump_versions(*(scope for instance in changed for scope in get_cache_scopes(instance)))
+        self.progress["results"]["costs_updated"] = self.progress["results"].get("costs_updated", 0) + len(changed)
+
+
+class ReconcileVMsJob(ScopedChunkedJob):
+    """Sync the vCPU count and memory of VirtualMachines linked to EC2/RDS instances with the instance catalog."""
+
+    permissions = (
+        "netbox_aws_resources_plugin.view_awsec2instance",
+        "netbox_aws_resources_plugin.view_awsrdsinstance",
+        "virtualization.change_virtualmachine",
+    )
+
+    class Meta:
+        name = "Reconcile AWS virtual machines"
+
+    def get_querysets(self, aws_account_id=None, region=None):
+        vms = self.restrict(VirtualMachine.objects.all(), "change")
+        return [
+            self.restrict(_scoped(model.objects.filter(virtual_machine__in=vms), aws_account_id, region))
+            for model in INSTANCE_MODELS
+        ]
+
+    def process_chunk(self, model, pks):
+        changed = sync_vm_specs(model, pks, self.request)
+        self.progress["results"]["vms_updated"] = self.progress["results"].get("vms_updated", 0) + changed
+
+
+class ValidateCIDRsJob(ScopedChunkedJob):
+    """Check every VPC's CIDR block and that its subnets' CIDR blocks fall inside it without overlapping."""
+
+    permissions = ("netbox_aws_resources_plugin.view_awsvpc", "netbox_aws_resources_plugin.view_awssubnet")
+
+    class Meta:
+        name = "Validate AWS VPC CIDRs"
+
+    def get_querysets(self, aws_account_id=None, region=None):
+        return [self.restrict(_scoped(AWSVPC.objects.all(), aws_account_id, region))]
+
+    def process_chunk(self, model, pks):
+        vpcs = {vpc.pk: vpc for vpc in AWSVPC.objects.filter(pk__in=pks).select_related("cidr_block")}
+        subnets_by_vpc = {}
+        subnets = self.restrict(AWSSubnet.objects.filter(aws_vpc__in=pks))
+        for subnet in subnets.select_related("cidr_block"):
+            subnets_by_vpc.setdefault(subnet.aws_vpc_id, []).append(subnet)
+
+        for vpc in vpcs.values():
+            if vpc.cidr_block is None:
+                self.report("cidr_issues", {"vpc": vpc.pk, "object": str(vpc), "issue": "VPC has no CIDR block"})
+                continue
+            vpc_network = vpc.cidr_block.prefix
+
+            networks = []
+            for subnet in subnets_by_vpc.get(vpc.pk, []):
+                if subnet.cidr_block is None:
+                    issue = "Subnet has no CIDR block"
+                    self.report("cidr_issues", {"vpc": vpc.pk, "object": str(subnet), "issue": issue})
+                    continue
+                network = subnet.cidr_block.prefix
+                if network not in vpc_network:
+                    issue = f"{network} is outside the VPC's {vpc_network}"
+                    self.report("cidr_issues", {"vpc": vpc.pk, "object": str(subnet), "issue": issue})
+                networks.append((network, subnet))
+
+            # Sorted by start address, a subnet overlaps an earlier one if it starts before the furthest end seen so far
+            networks.sort(key=lambda item: (item[0].first, -item[0].last))
+            furthest = None
+            for network, subnet in networks:
+                if furthest is not None and network.first <= furthest[0].last:
+                    issue = f"{network} overlaps {furthest[1]}"
+                    self.report("cidr_issues", {"vpc": vpc.pk, "object": str(subnet), "issue": issue})
+                if furthest is None or network.last > furthest[0].last:
+                    furthest = (network, subnet)
+
+
+class ReconcileShardJob(ProgressJob):
+    """Run every reconciliation step for one AWS account and region."""
+
+    steps = (RecomputeCostsJob, ReconcileVMsJob, ValidateCIDRsJob)
+
+    class Meta:
+        name = "Reconcile AWS account region"
+
+    def run(self, *args, aws_account_id, region, lease, chunk_size=None, **kwargs):
+        lease_name = shard_lease_name(aws_account_id, region)
+        # The lease may have expired and been taken by a newer run while this job sat in the queue
+        if not holds_lease(lease_name, lease):
+            self.job.data = {"aws_account": aws_account_id, "region": region, "skipped": "lease not held"}
+            self.save_progress()
+            return
+
+        try:
+            steps = [(step_class, step_class(self.job)) for step_class in self.steps]
+            querysets = {
+                step_class: step.get_querysets(aws_account_id=aws_account_id, region=region)
+                for step_class, step in steps
+            }
+            self.start_progress(sum(qs.count() for step_querysets in querysets.values() for qs in step_querysets))
+            self.progress.update({"aws_account": aws_account_id, "region": region, "timings": {}})
+
+            lease_timeout = get_plugin_config("netbox_aws_resources_plugin", "reconciliation_lease_timeout")
+            started = time.monotonic()
+            for step_class, step in steps:
+                # A newer run may have taken over the shard if this one overran its lease; leave the rest to it
+                if not renew_lease(lease_name, lease, lease_timeout):
+                    self.progress["aborted"] = f"lease lost before {step_class.name}"
+                    break
+                step.progress = self.progress
+                step_started = time.monotonic()
+                for queryset in querysets[step_class]:
+                    step.process_queryset(queryset, chunk_size)
+                self.progress["timings"][step_class.name] = round(time.monotonic() - step_started, 3)
+            self.progress["duration"] = round(time.monotonic() - started, 3)
+            self.save_progress()
+        finally:
+            release_lease(lease_name, lease)
+
+        self.check_failures()
+
+
+class ReconciliationDispatchJob(JobRunner):
+    """Queue a reconciliation job for every AWS account and region, to be spread across the available workers."""
+
+    # Every step's permissions, as the shard jobs run as the dispatching user
+    permissions = tuple(
+        dict.fromkeys(permission for step in ReconcileShardJob.steps for permission in step.permissions)
+    )
+
+    class Meta:
+        name = "Dispatch AWS reconciliation"
+
+    def run(self, *args, **kwargs):
+        shards = get_shards()
+        accounts = AWSAccount.objects.in_bulk({aws_account_id for aws_account_id, _ in shards})
+        lease_timeout = get_plugin_config("netbox_aws_resources_plugin", "reconciliation_lease_timeout")
+
+        queued = skipped = 0
+        for aws_account_id, region in shards:
+            lease = uuid.uuid4().hex
+            # A shard whose lease is still held is queued or running from an earlier dispatch; leave it alone
+            if not acquire_lease(shard_lease_name(aws_account_id, region), lease, lease_timeout):
+                skipped += 1
+                continue
+            ReconcileShardJob.enqueue(
+                instance=accounts[aws_account_id],
+                user=self.job.user,
+                aws_account_id=aws_account_id,
+                region=region,
+                lease=lease,
+            )
+            queued += 1
+
+        self.job.data = {"shards": len(shards), "queued": queued, "skipped": skipped}
+
+
+def shard_lease_name(aws_account_id, region):
+    return f"reconcile:{aws_account_id}:{region}"
+
+
+def get_shards():
+    """Return the sorted (AWS account ID, region) pairs which have any resources."""
+    shards = set()
+    for model in (AWSVPC, AWSLoadBalancer, AWSTargetGroup, AWSEC2Instance, AWSRDSInstance):
+        shards.update(model.objects.order_by().values_list("aws_account_id", "region").distinct())
+    return sorted(shards)
+
+
+_reconciliation_interval = get_plugin_config("netbox_aws_resources_plugin", "reconciliation_interval")
+if _reconciliation_interval:
+    system_job(interval=_reconciliation_interval)(ReconciliationDispatchJob)
+
+
+class LinkVMsJob(JobRunner):
+    """Link EC2 and RDS instances to matching virtual machines, optionally creating VMs for the rest."""
+
+    permissions = (
+        "netbox_aws_resources_plugin.change_awsec2instance",
+        "netbox_aws_resources_plugin.change_awsrdsinstance",
+        "virtualization.add_virtualmachine",
+        "virtualization.change_virtualmachine",
+    )
+
+    class Meta:
+        name = "Link AWS virtual machines"
+
+    def run(self, *args, model_names=None, cluster_id=None, **options):
+        cluster = Cluster.objects.get(pk=cluster_id) if cluster_id else None
+        request = make_sync_request(self.job.user)
+        self.job.data = {"results": {}}
+        for model in INSTANCE_MODELS:
+            if model_names and model._meta.model_name not in model_names:
+                continue
+            self.job.data["results"][model._meta.model_name] = link_virtual_machines(
+                model, request, cluster=cluster, user=self.job.user, **options
+            )
+            self.job.save(update_fields=["data"])
+
+
+class DecommissionJob(ChunkedJob):
+    """Delete an AWS account or VPC and everything in it, children first (see decommission.py)."""
+
+    class Meta:
+        name = "Decommission AWS resources"
+
+    def process_chunk(self, model, pks):
+        model.objects.filter(pk__in=pks).delete()
+
+    def run(self, *args, model_name, pk, dry_run=False, release_prefixes=False, chunk_size=None, **kwargs):
+        # The job isn't attached to the account/VPC, as deleting that would delete the job with it
+        root = decommission.ROOT_MODELS[model_name].objects.get(pk=pk)
+        subtree = decommission.get_subtree(root)
+        # Checked again here, as the subtree or the user's permissions may have changed since the job was queued
+        if self.job.user:
+            undeletable = decommission.get_undeletable(subtree, self.job.user, release_prefixes)
+            if undeletable:
+                counts = ", ".join(f"{count} {name}" for name, count in undeletable.items())
+                raise PermissionDenied(f"{self.job.user} may not delete {counts} in {root}; nothing was deleted")
+        querysets = list(subtree.values())
+        plan = {queryset.model._meta.model_name: queryset.count() for queryset in querysets}
+        if release_prefixes:
+            # Found before the VPCs and subnets using them are deleted
+            prefix_ids = list(decommission.get_prefixes(subtree).values_list("pk", flat=True))
+            querysets.append(Prefix.objects.filter(pk__in=prefix_ids))
+            plan["prefix"] = len(prefix_ids)
+
+        self.start_progress(sum(plan.values()))
+        self.progress.update({"root": str(root), "root_type": model_name, "dry_run": dry_run})
+        self.progress["results"]["plan"] = plan
+        self.save_progress()
+        if dry_run:
+            return
+
+        # Deletes are change-logged per object, with their events delivered in batches
+        with batched_events(self.request) if self.request else nullcontext():
+            for queryset in querysets:
+                self.process_queryset(queryset, chunk_size)
+                # Nothing further up the tree can be deleted while any of its children are left
+                if self.progress["failed"]:
+                    break
+        self.check_failures()
+
+
+class SweepStaleJob(JobRunner):
+    """Tag or delete AWS resources which no sync has seen since a cutoff (see staleness.py)."""
+
+    class Meta:
+        name = "Sweep stale AWS resources"
+
+    def run(self, *args, before, action=staleness.SWEEP_MARK, dry_run=False, **kwargs):
+        request = make_sync_request(self.job.user) if self.job.user else None
+        results = staleness.sweep(before, action, request=request, dry_run=dry_run, user=self.job.user)
+        self.job.data = {"before": before.isoformat(), "action": action, "dry_run": dry_run, "results": results}
+
+
+# Jobs which can be started from the Background Jobs page and the API, by key
+JOB_CLASSES = {
+    "recompute-costs": RecomputeCostsJob,
+    "reconcile-vms": ReconcileVMsJob,
+    "validate-cidrs": ValidateCIDRsJob,
+    "reconcile": ReconciliationDispatchJob,
+}
+
+
+def get_job_names():
+    return [job_class.name for job_class in JOB_CLASSES.values()] + [
+        ReconcileShardJob.name,
+        LinkVMsJob.name,
+        DecommissionJob.name,
+        SweepStaleJob.name,
+    ]
+
+
+def get_queue_status():
+    """Return the depth of the RQ queue the plugin's jobs run on and the number of workers serving it."""
+    queue_name = get_queue_for_model(None)
+    queue = get_queue(queue_name)
+    return {
+        "name": queue_name,
+        "queued": queue.count,
+        "started": queue.started_job_registry.count,
+        "failed": queue.failed_job_registry.count,
+        "workers": get_workers_for_queue(queue_name),
+    }
@@ -0,0 +1,182 @@
+"""
+Load testing the plugin's UI and API against a (typically synthetic) inventory.
+
+run_load_test() replays a weighted mix of typical requests - list pages, filtered lists, object detail pages,
+topology views, API lists and details - through Django's test client. The requests run in-process but through the
+full middleware, view, serializer and template stack, so no running server or API token is needed. Each worker thread
+has its own client and database connection. The result holds every request's latency, from which summarize() reports
+percentiles per request kind and overall.
+"""
+
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from .models import AWSVPC, AWSAccount, AWSEC2Instance, AWSLoadBalancer, AWSRDSInstance, AWSSubnet, AWSTargetGroup
+
+UI = "plugins:netbox_aws_resources_plugin"
+API = "plugins-api:netbox_aws_resources_plugin-api"
+
+# Objects sampled per model as targets for detail and topology requests
+TARGET_SAMPLE_SIZE = 1000
+PERCENTILES = (50, 90, 95, 99)
+
+# (label, weight, URL name, model whose pk is the URL's pk, query params). A model class as a query parameter value
+# is replaced with the pk of a random object of that model.
+UI_MIX = [
+    ("ui vpc list", 8, f"{UI}:awsvpc_list", None, {}),
+    ("ui subnet list", 8, f"{UI}:awssubnet_list", None, {}),
+    ("ui ec2 list", 10, f"{UI}:awsec2instance_list", None, {}),
+    ("ui ec2 list by vpc", 6, f"{UI}:awsec2instance_list", None, {"vpc_id": AWSVPC}),
+    ("ui ec2 search", 4, f"{UI}:awsec2instance_list", None, {"q": "synthetic-i-0001"}),
+    ("ui rds list", 3, f"{UI}:awsrdsinstance_list", None, {}),
+    ("ui load balancer list", 3, f"{UI}:awsloadbalancer_list", None, {}),
+    ("ui target group list", 2, f"{UI}:awstargetgroup_list", None, {}),
+    ("ui account detail", 3, f"{UI}:awsaccount", AWSAccount, {}),
+    ("ui vpc detail", 8, f"{UI}:awsvpc", AWSVPC, {}),
+    ("ui subnet detail", 6, f"{UI}:awssubnet", AWSSubnet, {}),
+    ("ui ec2 detail", 10, f"{UI}:awsec2instance", AWSEC2Instance, {}),
+    ("ui rds detail", 2, f"{UI}:awsrdsinstance", AWSRDSInstance, {}),
+    ("ui load balancer detail", 2, f"{UI}:awsloadbalancer", AWSLoadBalancer, {}),
+    ("ui target group detail", 2, f"{UI}:awstargetgroup", AWSTargetGroup, {}),
+    ("ui vpc topology", 3, f"{UI}:awsvpc_topology", AWSVPC, {}),
+]
+
+API_MIX = [
+    ("api vpc list", 8, f"{API}:awsvpc-list", None, {"limit": 50}),
+    ("api vpc list by account", 6, f"{API}:awsvpc-list", None, {"aws_account_id": AWSAccount}),
+    ("api subnet list", 8, f"{API}:awssubnet-list", None, {"limit": 50}),
+    ("api subnet list by vpc", 8, f"{API}:awssubnet-list", None, {"aws_vpc_id": AWSVPC}),
+    ("api subnet brief list", 4, f"{API}:awssubnet-list", None, {"brief": "true", "limit": 250}),
+    ("api load balancer list", 4, f"{API}:awsloadbalancer-list", None, {"limit": 50}),
+    ("api target group list", 3, f"{API}:awstargetgroup-list", None, {"limit": 50}),
+    ("api account detail", 3, f"{API}:awsaccount-detail", AWSAccount, {}),
+    ("api vpc detail", 6, f"{API}:awsvpc-detail", AWSVPC, {}),
+    ("api subnet detail", 6, f"{API}:awssubnet-detail", AWSSubnet, {}),
+    ("api vpc topology", 3, f"{API}:topology", None, {"vpc_id": AWSVPC}),
+    ("api change feed", 2, f"{API}:change-feed", None, {}),
+]
+
+MIXES = {"ui": UI_MIX, "api": API_MIX, "mixed": UI_MIX + API_MIX}
+
+
+def get_targets(mix, rng, sample_size=TARGET_SAMPLE_SIZE):
+    """
+    Sample object pks for every model the mix needs as a URL or query parameter target. Sampling is done with `rng`
+    from the pks in order, rather than by the database, so a seeded run targets the same objects every time.
+    """
+    models = {model for _, _, _, model, _ in mix if model}
+    models |= {value for *_, params in mix for value in params.values() if isinstance(value, type)}
+    targets = {}
+    for model in sorted(models, key=lambda model: model._meta.model_name):
+        pks = list(model.objects.order_by("pk").values_list("pk", flat=True))
+        if not pks:
+            raise ValueError(f"No {model._meta.verbose_name_plural} to target; generate an inventory first.")
+        targets[model] = rng.sample(pks, min(sample_size, len(pks)))
+    return targets
+
+
+def build_requests(mix, count, targets, rng):
+    """Draw `count` (label, URL, params) requests from the mix in proportion to the weights."""
+    entries = rng.choices(mix, weights=[weight for _, weight, *_ in mix], k=count)
+    requests = []
+    for label, _, url_name, model, params in entries:
+        kwargs = {"pk": rng.choice(targets[model])} if model else {}
+        params = {
+            key: rng.choice(targets[value]) if isinstance(value, type) else value for key, value in params.items()
+        }
+        requests.append((label, reverse(url_name, kwargs=kwargs), params))
+    return requests
+
+
+def get_host():
+    """Return a host name the test client can send which ALLOWED_HOSTS accepts."""
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*":
+            return host.lstrip(".")
+    return "testserver"
+
+
+class LoadTestResult:
+    def __init__(self):
+        # label -> [seconds, ...] and label -> {status code: count} for responses other than 200
+        self.timings = {}
+        self.errors = {}
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, label, seconds, status_code):
+        with self._lock:
+            self.timings.setdefault(label, []).append(seconds)
+            if status_code != 200:
+                errors = self.errors.setdefault(label, {})
+                errors[status_code] = errors.get(status_code, 0) + 1
+
+    @property
+    def count(self):
+        return sum(len(timings) for timings in self.timings.values())
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    summary = {"count": len(ordered), "mean": sum(ordered) / len(ordered), "max": ordered[-1]}
+    for p in PERCENTILES:
+        summary[f"p{p}"] = percentile(ordered, p)
+    return summary
+
+
+def _worker(user, host, requests, result):
+    # A view raising an exception is recorded as a 500 rather than ending the thread
+    client = Client(raise_request_exception=False, HTTP_HOST=host)
+    client.force_login(user)
+    try:
+        for label, url, params in requests:
+            started = time.perf_counter()
+            response = client.get(url, params)
+            if result is not None:
+                result.record(label, time.perf_counter() - started, response.status_code)
+    finally:
+        # Each thread has its own database connection
+        connection.close()
+
+
+def _run(user, host, requests, concurrency, result=None):
+    threads = [
+        threading.Thread(target=_worker, args=(user, host, requests[i::concurrency], result))
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_load_test(user, mix="mixed", count=1000, concurrency=4, warmup=50, seed=None):
+    """
+    Replay `count` requests drawn from a mix (see MIXES) as `user`, over `concurrency` threads, after `warmup`
+    unrecorded requests. Returns a LoadTestResult.
+    """
+    rng = random.Random(seed)
+    entries = MIXES[mix]
+    targets = get_targets(entries, rng)
+    host = get_host()
+
+    if warmup:
+        _run(user, host, build_requests(entries, warmup, targets, rng), concurrency)
+
+    result = LoadTestResult()
+    requests = build_requests(entries, count, targets, rng)
+    started = time.perf_counter()
+    _run(user, host, requests, concurrency, result)
+    result.duration = time.perf_counter() - started
+    return result
@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from netbox_aws_resources_plugin import audit
+
+
+class Command(BaseCommand):
+    help = (
+        "Audit the AWS inventory for inconsistencies: instances in subnets of another VPC, load balancer subnets and "
+        "target group load balancers outside the VPC, regions and accounts which differ from the VPC's, and subnets "
+        "outside their VPC's CIDR block"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="append",
+            dest="checks",
+            help="Check to run (e.g. awssubnet-cidr). May be repeated; defaults to all checks.",
+        )
+        parser.add_argument("--limit", type=int, default=0, help="Issues listed per check (default 0, all)")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+        parser.add_argument("--fail-on-issues", action="store_true", help="Exit with an error if anything is found")
+
+    def handle(self, *args, checks, limit, **options):
+        unknown = set(checks or []) - set(audit.get_check_keys())
+        if unknown:
+            raise CommandError(f"Unknown checks: {', '.join(sorted(unknown))}")
+
+        report = audit.run_audit(keys=checks, limit=limit or None)
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2, default=str))
+        else:
+            for check in report["checks"]:
+                style = self.style.ERROR if check["count"] else self.style.SUCCESS
+                self.stdout.write(style(f"{check['title']} ({check['key']}): {check['count']}"))
+                for issue in check["issues"]:
+                    details = ", ".join(f"{key}={value}" for key, value in issue.items() if key not in audit.ISSUE_KEYS)
+                    self.stdout.write(f"  {issue['name']} (#{issue['object_id']}): {details}")
+            self.stdout.write(f"{report['total']} issues found in {report['duration']}s")
+
+        if options["fail_on_issues"] and report["total"]:
+            raise CommandError(f"{report['total']} integrity issues found.")
@@ -0,0 +1,64 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from netbox_aws_resources_plugin import loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a weighted mix of typical plugin UI and API requests against the current inventory and report "
+        "latency percentiles per request kind. Generate an inventory with generate_aws_inventory first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", required=True, help="Username to make the requests as")
+        parser.add_argument("--mix", choices=loadtest.MIXES, default="mixed")
+        parser.add_argument("--requests", type=int, default=1000, dest="count", help="Requests to time")
+        parser.add_argument("--concurrency", type=int, default=4, help="Worker threads")
+        parser.add_argument("--warmup", type=int, default=50, help="Untimed requests to make first")
+        parser.add_argument("--seed", type=int, help="Random seed, to replay the same requests")
+        parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+
+    def handle(self, *args, user, mix, count, concurrency, warmup, seed, **options):
+        try:
+            user = get_user_model().objects.get(username=user)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User not found: {user}")
+        if count < 1 or concurrency < 1:
+            raise CommandError("--requests and --concurrency must be at least 1.")
+
+        try:
+            result = loadtest.run_load_test(
+                user, mix=mix, count=count, concurrency=concurrency, warmup=warmup, seed=seed
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        rows = {label: loadtest.summarize(timings) for label, timings in sorted(result.timings.items())}
+        overall = loadtest.summarize([t for timings in result.timings.values() for t in timings])
+
+        if options["json"]:
+            summary = {
+                "requests": result.count,
+                "duration": result.duration,
+                "throughput": result.count / result.duration,
+                "overall": overall,
+                "requests_by_kind": rows,
+                "errors": result.errors,
+            }
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+
+        columns = ["count", "mean"] + [f"p{p}" for p in loadtest.PERCENTILES] + ["max"]
+        self.stdout.write(f"{'request':30}" + "".join(f"{column:>10}" for column in columns))
+        for label, summary in [*rows.items(), ("overall", overall)]:
+            values = [f"{summary['count']:>10}"] + [f"{summary[column] * 1000:>8.1f}ms" for column in columns[1:]]
+            self.stdout.write(f"{label:30}" + "".join(values))
+        self.stdout.write(
+            f"{result.count} requests in {result.duration:.1f}s ({result.count / result.duration:.1f}/s) "
+            f"over {concurrency} threads"
+        )
+        for label, errors in sorted(result.errors.items()):
+            self.stdout.write(self.style.ERROR(f"{label}: " + ", ".join(f"{n}x HTTP {s}" for s, n in errors.items())))
@@ -0,0 +1,88 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from netbox_aws_resources_plugin.models import (
+    AWSVPC,
+    AWSAccount,
+    AWSEC2Instance,
+    AWSLoadBalancer,
+    AWSRDSInstance,
+    AWSSubnet,
+    AWSTargetGroup,
+)
+
+PAGE_SIZE = 50
+
+# Matches the scan nodes of a PostgreSQL plan, e.g. "Index Scan using nbaws_ec2_vpc_state_idx on ..."
+SCAN_RE = re.compile(
+    r"(?P<scan>Seq Scan|Parallel Seq Scan|Index Scan|Index Only Scan|Bitmap Index Scan|Bitmap Heap Scan)"
+    r"(?: Backward)?(?: using (?P<index>\S+))? on (?P<table>\S+)"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the queries behind the plugin's list views and common API filters, showing whether each is served "
+        "by an index or a sequential scan. Run it against a large inventory before and after applying migrations to "
+        "compare plans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--analyze", action="store_true", help="Run EXPLAIN ANALYZE and report execution times")
+        parser.add_argument("--verbose-plans", action="store_true", help="Print the full plan for every query")
+
+    def get_cases(self):
+        """Return (label, queryset) pairs mirroring the first page of each list view and common filters."""
+        account = AWSAccount.objects.order_by("pk").first()
+        vpc = AWSVPC.objects.order_by("pk").first()
+        if account is None or vpc is None:
+            raise CommandError("No AWS accounts/VPCs found; load an inventory first.")
+        region = vpc.region
+
+        cases = [
+            ("VPC list (default ordering)", AWSVPC.objects.select_related("aws_account", "cidr_block")),
+            ("VPC by account + region", AWSVPC.objects.filter(aws_account=account, region=region)),
+            ("VPC by region + state", AWSVPC.objects.filter(region=region, state="available")),
+            ("Subnet list (default ordering)", AWSSubnet.objects.select_related("aws_vpc", "cidr_block")),
+            ("Subnet by VPC", AWSSubnet.objects.filter(aws_vpc=vpc)),
+            ("Subnet by VPC + state", AWSSubnet.objects.filter(aws_vpc=vpc, state="available")),
+        ]
+        for model, state in (
+            (AWSLoadBalancer, "active"),
+            (AWSTargetGroup, "active"),
+            (AWSEC2Instance, "running"),
+            (AWSRDSInstance, "available"),
+        ):
+            name = model._meta.verbose_name
+            cases += [
+                (f"{name} list (default ordering)", model.objects.select_related("aws_account", "vpc")),
+                (f"{name} by account + region", model.objects.filter(aws_account=account, region=region)),
+                (f"{name} by VPC + state", model.objects.filter(vpc=vpc, state=state)),
+                (f"{name} by region + state", model.objects.filter(region=region, state=state)),
+            ]
+        return [(label, queryset[:PAGE_SIZE]) for label, queryset in cases]
+
+    def handle(self, *args, analyze, verbose_plans, **options):
+        is_postgres = connection.vendor == "postgresql"
+        explain_options = {"analyze": True} if analyze and is_postgres else {}
+
+        for label, queryset in self.get_cases():
+            plan = queryset.explain(**explain_options)
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+
+            if is_postgres:
+                for match in SCAN_RE.finditer(plan):
+                    scan = match.group("scan")
+                    style = self.style.WARNING if "Seq Scan" in scan else self.style.SUCCESS
+                    index = f" using {match.group('index')}" if match.group("index") else ""
+                    self.stdout.write(style(f"  {scan}{index} on {match.group('table')}"))
+                if analyze:
+                    timing = re.search(r"Execution Time: ([\d.]+ ms)", plan)
+                    if timing:
+                        self.stdout.write(f"  Execution time: {timing.group(1)}")
+
+            if verbose_plans or not is_postgres:
+                for line in plan.splitlines():
+                    self.stdout.write(f"    {line}")
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from netbox_aws_resources_plugin import exporters
+
+
+class Command(BaseCommand):
+    help = "Stream the AWS inventory to NDJSON or CSV without loading it into memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", choices=exporters.EXPORT_FORMATS, default=exporters.EXPORT_FORMAT_NDJSON, dest="export_format"
+        )
+        parser.add_argument(
+            "--model",
+            action="append",
+            dest="models",
+            help="Model to export (e.g. awsvpc). May be repeated; defaults to all models.",
+        )
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="Output file for NDJSON, or output directory for CSV (one file per model). Defaults to stdout.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=exporters.DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, export_format, models, output, chunk_size, **options):
+        export_models = []
+        for name in models or []:
+            model = exporters.get_export_model(name)
+            if model is None:
+                raise CommandError(f"Unknown model: {name}")
+            export_models.append(model)
+        export_models = export_models or list(exporters.EXPORT_MODELS)
+
+        if export_format == exporters.EXPORT_FORMAT_NDJSON:
+            chunks = exporters.iter_ndjson([(model, None) for model in export_models], chunk_size=chunk_size)
+            self._write(chunks, output)
+            return
+
+        if output == "-":
+            if len(export_models) != 1:
+                raise CommandError("CSV output to stdout requires exactly one --model.")
+            self._write(exporters.iter_csv(export_models[0], chunk_size=chunk_size), output)
+            return
+
+        directory = Path(output)
+        directory.mkdir(parents=True, exist_ok=True)
+        for model in export_models:
+            path = directory / f"{model._meta.model_name}.csv"
+            self._write(exporters.iter_csv(model, chunk_size=chunk_size), str(path))
+            self.stderr.write(f"Wrote {path}")
+
+    def _write(self, chunks, output):
+        if output == "-":
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            sys.stdout.flush()
+            return
+        with open(output, "w", newline="") as f:
+            for chunk in chunks:
+                f.write(chunk)
@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from netbox_aws_resources_plugin import synthetic
+from netbox_aws_resources_plugin.models import AWSAccount
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic AWS inventory across every plugin model, with nested Prefixes for VPC and subnet CIDRs, "
+        "for performance and load testing. Never run this against a production NetBox."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--preset", choices=synthetic.PRESETS, default="small", help="Estate size (default small)")
+        for key in synthetic.PRESETS["small"]:
+            parser.add_argument(f"--{key.replace('_', '-')}", type=int, dest=key, help=f"Override the preset's {key}")
+        parser.add_argument(
+            "--region",
+            action="append",
+            dest="regions",
+            help="Region to spread VPCs over. May be repeated; defaults to six common regions.",
+        )
+        parser.add_argument("--root-prefix", default=synthetic.DEFAULT_ROOT_PREFIX)
+        parser.add_argument("--batch-size", type=int, default=synthetic.DEFAULT_BATCH_SIZE)
+        parser.add_argument("--clear", action="store_true", help="Delete previously generated objects first")
+        parser.add_argument("--clear-only", action="store_true", help="Delete previously generated objects and exit")
+
+    def handle(self, *args, preset, regions, root_prefix, batch_size, clear, clear_only, **options):
+        if clear or clear_only:
+            started = time.monotonic()
+            deleted = synthetic.clear_inventory()
+            for name, count in deleted.items():
+                self.stdout.write(f"  deleted {count} {name}")
+            self.stdout.write(f"  cleared in {time.monotonic() - started:.1f}s")
+            if clear_only:
+                return
+        elif synthetic.get_synthetic(AWSAccount).exists():
+            raise CommandError("A synthetic inventory already exists; use --clear to replace it.")
+
+        counts = dict(synthetic.PRESETS[preset])
+        counts.update({key: options[key] for key in counts if options[key] is not None})
+        try:
+            generator = synthetic.InventoryGenerator(
+                **counts, regions=regions or synthetic.DEFAULT_REGIONS, root_prefix=root_prefix, batch_size=batch_size
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        started = time.monotonic()
+        counts = generator.generate()
+        elapsed = time.monotonic() - started
+        for key, count in counts.items():
+            self.stdout.write(f"  {key.replace('_', ' ')}: {count}")
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(f"Generated {total} objects in {elapsed:.1f}s ({total / elapsed:,.0f}/s)"))
@@ -0,0 +1,75 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from virtualization.models import Cluster
+
+from netbox_aws_resources_plugin import vm_linkage
+from netbox_aws_resources_plugin.events import make_sync_request
+
+
+class Command(BaseCommand):
+    help = (
+        "Link EC2 and RDS instances to VirtualMachines by name, tag or custom field, optionally creating VMs for "
+        "instances with no match, and sync linked VMs' vCPU count and memory from the instance catalog"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            action="append",
+            dest="models",
+            choices=[model._meta.model_name for model in vm_linkage.INSTANCE_MODELS],
+            help="Model to link (awsec2instance or awsrdsinstance). May be repeated; defaults to both.",
+        )
+        parser.add_argument("--match", choices=vm_linkage.MATCH_STRATEGIES, default=vm_linkage.MATCH_NAME)
+        parser.add_argument("--custom-field", help="VM custom field holding the instance ID, for --match custom-field")
+        parser.add_argument("--create-missing", action="store_true", help="Create VMs for instances with no match")
+        parser.add_argument("--cluster", help="Name or ID of the cluster to create VMs in")
+        parser.add_argument("--no-sync-specs", action="store_false", dest="sync_specs")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+        parser.add_argument("--user", help="Username to record in the change log (required unless --dry-run)")
+        parser.add_argument("--batch-size", type=int, default=vm_linkage.DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, models, match, custom_field, create_missing, cluster, user, **options):
+        sync_specs, dry_run, batch_size = options["sync_specs"], options["dry_run"], options["batch_size"]
+        if match == vm_linkage.MATCH_CUSTOM_FIELD and not custom_field:
+            raise CommandError("--custom-field is required with --match custom-field.")
+
+        if create_missing:
+            if not cluster:
+                raise CommandError("--cluster is required with --create-missing.")
+            lookup = {"pk": cluster} if cluster.isdigit() else {"name": cluster}
+            try:
+                cluster = Cluster.objects.get(**lookup)
+            except Cluster.DoesNotExist:
+                raise CommandError(f"Cluster not found: {cluster}")
+
+        request = None
+        if not dry_run:
+            if not user:
+                raise CommandError("--user is required to record the changes in the change log.")
+            try:
+                request = make_sync_request(user)
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User not found: {user}")
+
+        for model in vm_linkage.INSTANCE_MODELS:
+            if models and model._meta.model_name not in models:
+                continue
+            started = time.monotonic()
+            stats = vm_linkage.link_virtual_machines(
+                model,
+                request,
+                strategy=match,
+                custom_field=custom_field,
+                create_missing=create_missing,
+                cluster=cluster if create_missing else None,
+                sync_specs=sync_specs,
+                dry_run=dry_run,
+                batch_size=batch_size,
+            )
+            self.stdout.write(self.style.MIGRATE_HEADING(model._meta.verbose_name_plural))
+            for key, value in sorted(stats.items()):
+                self.stdout.write(f"  {key.replace('_', ' ')}: {value}")
+            self.stdout.write(f"  finished in {time.monotonic() - started:.1f}s")
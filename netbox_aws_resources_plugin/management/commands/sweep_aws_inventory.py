@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from netbox_aws_resources_plugin import staleness
+from netbox_aws_resources_plugin.events import make_sync_request
+
+
+class Command(BaseCommand):
+    help = (
+        "Find AWS resources which no sync has seen since a cutoff and tag them as stale, or delete them. Resources "
+        "which have never been seen by a sync are left alone."
+    )
+
+    def add_arguments(self, parser):
+        cutoff = parser.add_mutually_exclusive_group(required=True)
+        cutoff.add_argument("--before", help="Sweep resources last seen before this ISO 8601 timestamp")
+        cutoff.add_argument("--older-than", type=float, help="Sweep resources last seen more than this many hours ago")
+        parser.add_argument("--delete", action="store_true", help="Delete the resources rather than tagging them")
+        parser.add_argument("--dry-run", action="store_true", help="Count what would be swept without writing")
+        parser.add_argument("--user", help="Username to record in the change log (required with --delete)")
+
+    def handle(self, *args, before, older_than, user, **options):
+        if before:
+            cutoff = parse_datetime(before)
+            if cutoff is None:
+                raise CommandError(f"Invalid timestamp: {before}")
+        else:
+            cutoff = timezone.now() - timedelta(hours=older_than)
+
+        action = staleness.SWEEP_DELETE if options["delete"] else staleness.SWEEP_MARK
+        request = None
+        if action == staleness.SWEEP_DELETE and not options["dry_run"]:
+            if not user:
+                raise CommandError("--user is required to record the deletions in the change log.")
+            try:
+                request = make_sync_request(user)
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User not found: {user}")
+
+        report = staleness.sweep(cutoff, action, request=request, dry_run=options["dry_run"])
+        self.stdout.write(f"Resources last seen before {cutoff.isoformat()}:")
+        for model_name, counts in report.items():
+            model = staleness.MODELS_BY_NAME[model_name]
+            details = ", ".join(f"{key}: {value}" for key, value in counts.items())
+            self.stdout.write(f"  {model._meta.verbose_name_plural}: {details}")
@@ -0,0 +1,95 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("netbox_aws_resources_plugin", "0014_remove_awstargetgroup_port_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="awsvpc",
+            index=models.Index(fields=["name", "vpc_id", "region", "aws_account"], name="nbaws_vpc_ordering_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsvpc",
+            index=models.Index(fields=["aws_account", "region"], name="nbaws_vpc_account_region_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsvpc",
+            index=models.Index(fields=["region", "state"], name="nbaws_vpc_region_state_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awssubnet",
+            index=models.Index(fields=["aws_vpc", "cidr_block"], name="nbaws_subnet_vpc_cidr_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awssubnet",
+            index=models.Index(fields=["aws_vpc", "state"], name="nbaws_subnet_vpc_state_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsloadbalancer",
+            index=models.Index(fields=["name"], name="nbaws_lb_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsloadbalancer",
+            index=models.Index(fields=["aws_account", "region"], name="nbaws_lb_account_region_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsloadbalancer",
+            index=models.Index(fields=["vpc", "state"], name="nbaws_lb_vpc_state_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsloadbalancer",
+            index=models.Index(fields=["region", "state"], name="nbaws_lb_region_state_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awstargetgroup",
+            index=models.Index(fields=["name"], name="nbaws_tg_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awstargetgroup",
+            index=models.Index(fields=["aws_account", "region"], name="nbaws_tg_account_region_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awstargetgroup",
+            index=models.Index(fields=["vpc", "state"], name="nbaws_tg_vpc_state_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awstargetgroup",
+            index=models.Index(fields=["region", "state"], name="nbaws_tg_region_state_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsec2instance",
+            index=models.Index(fields=["name"], name="nbaws_ec2_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsec2instance",
+            index=models.Index(fields=["aws_account", "region"], name="nbaws_ec2_account_region_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsec2instance",
+            index=models.Index(fields=["vpc", "state"], name="nbaws_ec2_vpc_state_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsec2instance",
+            index=models.Index(fields=["region", "state"], name="nbaws_ec2_region_state_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsrdsinstance",
+            index=models.Index(fields=["name"], name="nbaws_rds_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsrdsinstance",
+            index=models.Index(fields=["aws_account", "region"], name="nbaws_rds_account_region_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsrdsinstance",
+            index=models.Index(fields=["vpc", "state"], name="nbaws_rds_vpc_state_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsrdsinstance",
+            index=models.Index(fields=["region", "state"], name="nbaws_rds_region_state_idx"),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from netbox_aws_resources_plugin.regions import propagate_vpc_regions
+
+VPC_REGION_MODELS = ("awsloadbalancer", "awstargetgroup", "awsec2instance", "awsrdsinstance")
+
+
+def sync_regions(apps, schema_editor):
+    """Correct load balancers, target groups and instances whose region has drifted from their VPC's."""
+    propagate_vpc_regions(
+        apps.get_model("netbox_aws_resources_plugin", "awsvpc"),
+        [apps.get_model("netbox_aws_resources_plugin", name) for name in VPC_REGION_MODELS],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("netbox_aws_resources_plugin", "0015_add_list_and_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(sync_regions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,88 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("netbox_aws_resources_plugin", "0016_sync_regions_from_vpcs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="awsaccount",
+            name="last_seen",
+            field=models.DateTimeField(
+                blank=True, editable=False, help_text="When a sync last found this resource in AWS", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="awsvpc",
+            name="last_seen",
+            field=models.DateTimeField(
+                blank=True, editable=False, help_text="When a sync last found this resource in AWS", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="awssubnet",
+            name="last_seen",
+            field=models.DateTimeField(
+                blank=True, editable=False, help_text="When a sync last found this resource in AWS", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="awsloadbalancer",
+            name="last_seen",
+            field=models.DateTimeField(
+                blank=True, editable=False, help_text="When a sync last found this resource in AWS", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="awstargetgroup",
+            name="last_seen",
+            field=models.DateTimeField(
+                blank=True, editable=False, help_text="When a sync last found this resource in AWS", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="awsec2instance",
+            name="last_seen",
+            field=models.DateTimeField(
+                blank=True, editable=False, help_text="When a sync last found this resource in AWS", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="awsrdsinstance",
+            name="last_seen",
+            field=models.DateTimeField(
+                blank=True, editable=False, help_text="When a sync last found this resource in AWS", null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="awsaccount",
+            index=models.Index(fields=["last_seen"], name="nbaws_account_last_seen_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsvpc",
+            index=models.Index(fields=["last_seen"], name="nbaws_vpc_last_seen_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awssubnet",
+            index=models.Index(fields=["last_seen"], name="nbaws_subnet_last_seen_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsloadbalancer",
+            index=models.Index(fields=["last_seen"], name="nbaws_lb_last_seen_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awstargetgroup",
+            index=models.Index(fields=["last_seen"], name="nbaws_tg_last_seen_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsec2instance",
+            index=models.Index(fields=["last_seen"], name="nbaws_ec2_last_seen_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="awsrdsinstance",
+            index=models.Index(fields=["last_seen"], name="nbaws_rds_last_seen_idx"),
+        ),
+    ]
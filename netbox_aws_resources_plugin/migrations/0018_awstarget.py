@@ -0,0 +1,87 @@
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("netbox_aws_resources_plugin", "0017_add_last_seen"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AWSTarget",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                (
+                    "ip_address",
+                    models.GenericIPAddressField(
+                        blank=True,
+                        help_text="The IP address registered, for target groups of type ip",
+                        null=True,
+                        verbose_name="IP Address",
+                    ),
+                ),
+                (
+                    "port",
+                    models.PositiveIntegerField(
+                        help_text="The port the target receives traffic on",
+                        validators=[
+                            django.core.validators.MinValueValidator(1),
+                            django.core.validators.MaxValueValidator(65535),
+                        ],
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "instance",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="The EC2 instance registered, for target groups of type instance",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="target_registrations",
+                        to="netbox_aws_resources_plugin.awsec2instance",
+                    ),
+                ),
+                (
+                    "target_group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="targets",
+                        to="netbox_aws_resources_plugin.awstargetgroup",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "AWS Target",
+                "verbose_name_plural": "AWS Targets",
+                "ordering": ("target_group", "pk"),
+                "indexes": [
+                    models.Index(fields=["instance", "target_group"], name="nbaws_target_instance_idx"),
+                    models.Index(fields=["ip_address", "target_group"], name="nbaws_target_ip_idx"),
+                ],
+                "constraints": [
+                    models.CheckConstraint(
+                        condition=models.Q(
+                            models.Q(instance__isnull=False, ip_address__isnull=True),
+                            models.Q(instance__isnull=True, ip_address__isnull=False),
+                            _connector="OR",
+                        ),
+                        name="nbaws_target_instance_or_ip",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(instance__isnull=False),
+                        fields=("target_group", "instance", "port"),
+                        name="unique_awstarget_group_instance_port",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(ip_address__isnull=False),
+                        fields=("target_group", "ip_address", "port"),
+                        name="unique_awstarget_group_ip_port",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -3,11 +3,15 @@ from pathlib import Path
 from django.db import models
 from django.urls import reverse
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from ipam.models import Prefix, Service  # Import NetBox Prefix model
 from netbox.models import NetBoxModel
 from tenancy.models import Tenant
 from virtualization.models import VirtualMachine
 
+from .enrichment import plan_enrichment
+from .regions import set_region_from_vpc
+
 
 class AWSAccount(NetBoxModel):
     account_id = models.CharField(
@@ -26,6 +30,10 @@ class AWSAccount(NetBoxModel):
         help_text="The root account if this is a member (sub) account.",
     )
 
+    last_seen = models.DateTimeField(
+        blank=True, null=True, editable=False, help_text="When a sync last found this resource in AWS"
+    )
+
     # Properties for search indexing
     @property
     def search_parent_name(self):
@@ -43,6 +51,9 @@ class AWSAccount(NetBoxModel):
         ordering = ("account_id", "name")
         verbose_name = "AWS Account"
         verbose_name_plural = "AWS Accounts"
+        indexes = [
+            models.Index(fields=["last_seen"], name="nbaws_account_last_seen_idx"),
+        ]
 
     def __str__(self):
         if self.name:
@@ -177,10 +188,20 @@ class AWSVPC(NetBoxModel):
     )
     is_default = models.BooleanField(default=False, help_text="Whether this is the default VPC for the account/region")
 
+    last_seen = models.DateTimeField(
+        blank=True, null=True, editable=False, help_text="When a sync last found this resource in AWS"
+    )
+
     class Meta:
         ordering = ("name", "vpc_id", "region", "aws_account")
         verbose_name = "AWS VPC"
         verbose_name_plural = "AWS VPCs"
+        indexes = [
+            models.Index(fields=["name", "vpc_id", "region", "aws_account"], name="nbaws_vpc_ordering_idx"),
+            models.Index(fields=["aws_account", "region"], name="nbaws_vpc_account_region_idx"),
+            models.Index(fields=["region", "state"], name="nbaws_vpc_region_state_idx"),
+            models.Index(fields=["last_seen"], name="nbaws_vpc_last_seen_idx"),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["aws_account", "region", "vpc_id"],  # VPC ID is unique per region, but account adds safety
@@ -188,6 +209,13 @@ class AWSVPC(NetBoxModel):
             )
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored region, so a change can be propagated to the VPC's dependents once saved (see regions.py)
+        instance._loaded_region = instance.__dict__.get("region")
+        return instance
+
     def clean(self):
         super().clean()
         # The assigned Prefix for a VPC cannot be a child prefix.
@@ -244,6 +272,10 @@ class AWSSubnet(NetBoxModel):
         help_text="Whether instances in this subnet get a public IP on launch by default",
     )
 
+    last_seen = models.DateTimeField(
+        blank=True, null=True, editable=False, help_text="When a sync last found this resource in AWS"
+    )
+
     def clean(self):
         super().clean()
         if self.cidr_block and self.aws_vpc:
@@ -257,6 +289,11 @@ class AWSSubnet(NetBoxModel):
         ordering = ("aws_vpc", "cidr_block")
         verbose_name = "AWS Subnet"
         verbose_name_plural = "AWS Subnets"
+        indexes = [
+            models.Index(fields=["aws_vpc", "cidr_block"], name="nbaws_subnet_vpc_cidr_idx"),
+            models.Index(fields=["aws_vpc", "state"], name="nbaws_subnet_vpc_state_idx"),
+            models.Index(fields=["last_seen"], name="nbaws_subnet_last_seen_idx"),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["aws_vpc", "subnet_id"],  # Subnet ID is unique within a VPC
@@ -320,8 +357,24 @@ class AWSLoadBalancer(NetBoxModel):
         help_text="Subnets associated with this Load Balancer. Should be within the selected VPC.",
     )
 
+    last_seen = models.DateTimeField(
+        blank=True, null=True, editable=False, help_text="When a sync last found this resource in AWS"
+    )
+
+    def save(self, *args, **kwargs):
+        # Region is always the VPC's (see regions.py)
+        set_region_from_vpc(self)
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ("name",)
+        indexes = [
+            models.Index(fields=["name"], name="nbaws_lb_name_idx"),
+            models.Index(fields=["aws_account", "region"], name="nbaws_lb_account_region_idx"),
+            models.Index(fields=["vpc", "state"], name="nbaws_lb_vpc_state_idx"),
+            models.Index(fields=["region", "state"], name="nbaws_lb_region_state_idx"),
+            models.Index(fields=["last_seen"], name="nbaws_lb_last_seen_idx"),
+        ]
 
 
 # Choices for EC2 Instance model fields
@@ -452,6 +505,10 @@ class AWSTargetGroup(NetBoxModel):
         help_text="The current state of the Target Group",
     )
 
+    last_seen = models.DateTimeField(
+        blank=True, null=True, editable=False, help_text="When a sync last found this resource in AWS"
+    )
+
     def __str__(self):
         return self.name
 
@@ -460,14 +517,21 @@ class AWSTargetGroup(NetBoxModel):
         return reverse("plugins:netbox_aws_resources_plugin:awsloadbalancer_list")  # Placeholder
 
     def save(self, *args, **kwargs):
-        # VPC is now mandatory, so self.vpc will always be set.
-        self.region = self.vpc.region
+        # Region is always the VPC's (see regions.py)
+        set_region_from_vpc(self)
         super().save(*args, **kwargs)
 
     class Meta:
         ordering = ("name",)
         verbose_name = "AWS Target Group"
         verbose_name_plural = "AWS Target Groups"
+        indexes = [
+            models.Index(fields=["name"], name="nbaws_tg_name_idx"),
+            models.Index(fields=["aws_account", "region"], name="nbaws_tg_account_region_idx"),
+            models.Index(fields=["vpc", "state"], name="nbaws_tg_vpc_state_idx"),
+            models.Index(fields=["region", "state"], name="nbaws_tg_region_state_idx"),
+            models.Index(fields=["last_seen"], name="nbaws_tg_last_seen_idx"),
+        ]
 
 
 class AWSEC2Instance(NetBoxModel):
@@ -517,10 +581,25 @@ class AWSEC2Instance(NetBoxModel):
         to=VirtualMachine, on_delete=models.SET_NULL, related_name="aws_ec2_instance", blank=True, null=True
     )
 
+    last_seen = models.DateTimeField(
+        blank=True, null=True, editable=False, help_text="When a sync last found this resource in AWS"
+    )
+
+    # Section of the instance catalog (catalog.py) and the field holding this instance's type within it
+    catalog_kind = "ec2"
+    catalog_type_field = "instance_type"
+
     class Meta:
         ordering = ("name",)
         verbose_name = "AWS EC2 Instance"
         verbose_name_plural = "AWS EC2 Instances"
+        indexes = [
+            models.Index(fields=["name"], name="nbaws_ec2_name_idx"),
+            models.Index(fields=["aws_account", "region"], name="nbaws_ec2_account_region_idx"),
+            models.Index(fields=["vpc", "state"], name="nbaws_ec2_vpc_state_idx"),
+            models.Index(fields=["region", "state"], name="nbaws_ec2_region_state_idx"),
+            models.Index(fields=["last_seen"], name="nbaws_ec2_last_seen_idx"),
+        ]
 
     def __str__(self):
         return self.name or self.instance_id
@@ -530,43 +609,19 @@ class AWSEC2Instance(NetBoxModel):
         return reverse("plugins:netbox_aws_resources_plugin:awsaccount_list")  # Placeholder
 
     def save(self, *args, **kwargs):
-        specs = None
-        # If an instance type is set, try to find its specs to update cost and VM details.
-        if self.instance_type:
-            try:
-                data_file = Path(__file__).parent / "data" / "instance_data.json"
-                with open(data_file, "r") as f:
-                    instance_data = json.load(f)
-                specs = instance_data.get("ec2", {}).get(self.instance_type)
-            except (FileNotFoundError, json.JSONDecodeError, KeyError):
-                specs = None  # Ensure specs is None if file/key is missing
-
-        # If we found specs, update the cost on this instance.
-        if specs:
-            self.estimated_cost_usd_hourly = specs.get("price_usd_hourly")
+        # Region is always the VPC's (see regions.py)
+        set_region_from_vpc(self)
+
+        # Set the cost, and plan the linked VM's specs, from the instance catalog (see enrichment.py)
+        plan = plan_enrichment([self])
+        plan.apply_costs()
 
         # Save the AWSEC2Instance itself.
         super().save(*args, **kwargs)
 
-        # After saving, if a VM is linked and we have specs, update the VM.
-        if self.virtual_machine and specs:
-            vm_updated = False
-
-            new_vcpus = specs.get("vcpu")
-            new_ram_gb = specs.get("ram_gb")
-
-            if new_vcpus is not None and self.virtual_machine.vcpus != new_vcpus:
-                self.virtual_machine.vcpus = new_vcpus
-                vm_updated = True
-
-            if new_ram_gb is not None:
-                memory_mb = new_ram_gb * 1024
-                if self.virtual_machine.memory != memory_mb:
-                    self.virtual_machine.memory = memory_mb
-                    vm_updated = True
-
-            if vm_updated:
-                self.virtual_machine.save()
+        # The VM is saved individually so the change is logged as for any other edit.
+        for vm in plan.apply_vm_changes():
+            vm.save()
 
 
 class AWSRDSInstance(NetBoxModel):
@@ -622,10 +677,25 @@ class AWSRDSInstance(NetBoxModel):
         to=VirtualMachine, on_delete=models.SET_NULL, related_name="aws_rds_instance", blank=True, null=True
     )
 
+    last_seen = models.DateTimeField(
+        blank=True, null=True, editable=False, help_text="When a sync last found this resource in AWS"
+    )
+
+    # Section of the instance catalog (catalog.py) and the field holding this instance's class within it
+    catalog_kind = "rds"
+    catalog_type_field = "instance_class"
+
     class Meta:
         ordering = ("name",)
         verbose_name = "AWS RDS Instance"
         verbose_name_plural = "AWS RDS Instances"
+        indexes = [
+            models.Index(fields=["name"], name="nbaws_rds_name_idx"),
+            models.Index(fields=["aws_account", "region"], name="nbaws_rds_account_region_idx"),
+            models.Index(fields=["vpc", "state"], name="nbaws_rds_vpc_state_idx"),
+            models.Index(fields=["region", "state"], name="nbaws_rds_region_state_idx"),
+            models.Index(fields=["last_seen"], name="nbaws_rds_last_seen_idx"),
+        ]
 
     def __str__(self):
         return self.name or self.instance_id
@@ -635,40 +705,81 @@ class AWSRDSInstance(NetBoxModel):
         return reverse("plugins:netbox_aws_resources_plugin:awsaccount_list")  # Placeholder
 
     def save(self, *args, **kwargs):
-        specs = None
-        # If an instance class is set, try to find its specs to update cost and VM details.
-        if self.instance_class:
-            try:
-                data_file = Path(__file__).parent / "data" / "instance_data.json"
-                with open(data_file, "r") as f:
-                    instance_data = json.load(f)
-                specs = instance_data.get("rds", {}).get(self.instance_class)
-            except (FileNotFoundError, json.JSONDecodeError, KeyError):
-                specs = None  # Ensure specs is None if file/key is missing
-
-        # If we found specs, update the cost on this instance.
-        if specs:
-            self.estimated_cost_usd_hourly = specs.get("price_usd_hourly")
+        # Region is always the VPC's (see regions.py)
+        set_region_from_vpc(self)
+
+        # Set the cost, and plan the linked VM's specs, from the instance catalog (see enrichment.py)
+        plan = plan_enrichment([self])
+        plan.apply_costs()
 
         # Save the AWSRDSInstance itself.
         super().save(*args, **kwargs)
 
-        # After saving, if a VM is linked and we have specs, update the VM.
-        if self.virtual_machine and specs:
-            vm_updated = False
+        # The VM is saved individually so the change is logged as for any other edit.
+        for vm in plan.apply_vm_changes():
+            vm.save()
 
-            new_vcpus = specs.get("vcpu")
-            new_ram_gb = specs.get("ram_gb")
 
-            if new_vcpus is not None and self.virtual_machine.vcpus != new_vcpus:
-                self.virtual_machine.vcpus = new_vcpus
-                vm_updated = True
+class AWSTarget(models.Model):
+    """
+    A target registered with a target group: an EC2 instance or an IP address, on a port. Targets are registered and
+    deregistered in bulk (see targets.py) rather than edited one at a time, so like a many-to-many through table this
+    is a plain model rather than a NetBoxModel.
+    """
+
+    target_group = models.ForeignKey(to=AWSTargetGroup, on_delete=models.CASCADE, related_name="targets")
+    instance = models.ForeignKey(
+        to=AWSEC2Instance,
+        on_delete=models.CASCADE,
+        related_name="target_registrations",
+        blank=True,
+        null=True,
+        help_text="The EC2 instance registered, for target groups of type instance",
+    )
+    ip_address = models.GenericIPAddressField(
+        blank=True,
+        null=True,
+        verbose_name="IP Address",
+        help_text="The IP address registered, for target groups of type ip",
+    )
+    port = models.PositiveIntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(65535)], help_text="The port the target receives traffic on"
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("target_group", "pk")
+        verbose_name = "AWS Target"
+        verbose_name_plural = "AWS Targets"
+        indexes = [
+            # Reverse lookups: the target groups (and load balancers) routing to an instance or IP
+            models.Index(fields=["instance", "target_group"], name="nbaws_target_instance_idx"),
+            models.Index(fields=["ip_address", "target_group"], name="nbaws_target_ip_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(instance__isnull=False, ip_address__isnull=True)
+                | models.Q(instance__isnull=True, ip_address__isnull=False),
+                name="nbaws_target_instance_or_ip",
+            ),
+            models.UniqueConstraint(
+                fields=["target_group", "instance", "port"],
+                condition=models.Q(instance__isnull=False),
+                name="unique_awstarget_group_instance_port",
+            ),
+            models.UniqueConstraint(
+                fields=["target_group", "ip_address", "port"],
+                condition=models.Q(ip_address__isnull=False),
+                name="unique_awstarget_group_ip_port",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.instance or self.ip_address}:{self.port}"
+
 
-            if new_ram_gb is not None:
-                memory_mb = new_ram_gb * 1024
-                if self.virtual_machine.memory != memory_mb:
-                    self.virtual_machine.memory = memory_mb
-                    vm_updated = True
+# Models whose region is always their VPC's region (see regions.py)
+VPC_REGION_MODELS = (AWSLoadBalancer, AWSTargetGroup, AWSEC2Instance, AWSRDSInstance)
 
-            if vm_updated:
-                self.virtual_machine.save()
+# Plugin models in an order in which they can be deleted: each before the models it references
+DELETION_ORDER = (AWSEC2Instance, AWSRDSInstance, AWSTargetGroup, AWSLoadBalancer, AWSSubnet, AWSVPC, AWSAccount)
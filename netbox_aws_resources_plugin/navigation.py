@@ -57,53 +57,137 @@ awsrdsinstance_add_button = PluginMenuButton(
     color=ButtonColorChoices.GREEN,
 )
 
+# Button for importing AWS Accounts
+awsaccount_import_button = PluginMenuButton(
+    link="plugins:netbox_aws_resources_plugin:awsaccount_import",
+    title="Import Accounts",
+    icon_class="mdi mdi-upload",
+    color=ButtonColorChoices.CYAN,
+)
+
+# Button for importing AWS VPCs
+awsvpc_import_button = PluginMenuButton(
+    link="plugins:netbox_aws_resources_plugin:awsvpc_import",
+    title="Import VPCs",
+    icon_class="mdi mdi-upload",
+    color=ButtonColorChoices.CYAN,
+)
+
+# Button for importing AWS Subnets
+awssubnet_import_button = PluginMenuButton(
+    link="plugins:netbox_aws_resources_plugin:awssubnet_import",
+    title="Import Subnets",
+    icon_class="mdi mdi-upload",
+    color=ButtonColorChoices.CYAN,
+)
+
+# Button for importing AWS Load Balancers
+awsloadbalancer_import_button = PluginMenuButton(
+    link="plugins:netbox_aws_resources_plugin:awsloadbalancer_import",
+    title="Import Load Balancers",
+    icon_class="mdi mdi-upload",
+    color=ButtonColorChoices.CYAN,
+)
+
+# Button for importing AWS Target Groups
+awstargetgroup_import_button = PluginMenuButton(
+    link="plugins:netbox_aws_resources_plugin:awstargetgroup_import",
+    title="Import Target Groups",
+    icon_class="mdi mdi-upload",
+    color=ButtonColorChoices.CYAN,
+)
+
+# Button for importing AWS EC2 Instances
+awsec2instance_import_button = PluginMenuButton(
+    link="plugins:netbox_aws_resources_plugin:awsec2instance_import",
+    title="Import EC2 Instances",
+    icon_class="mdi mdi-upload",
+    color=ButtonColorChoices.CYAN,
+)
+
+# Button for importing AWS RDS Instances
+awsrdsinstance_import_button = PluginMenuButton(
+    link="plugins:netbox_aws_resources_plugin:awsrdsinstance_import",
+    title="Import RDS Instances",
+    icon_class="mdi mdi-upload",
+    color=ButtonColorChoices.CYAN,
+)
+
 # Menu item for listing AWS Accounts
 awsaccount_list_item = PluginMenuItem(
     link="plugins:netbox_aws_resources_plugin:awsaccount_list",
     link_text="AWS Accounts",
-    buttons=(awsaccount_add_button,),
+    buttons=(awsaccount_add_button, awsaccount_import_button),
 )
 
 # Menu item for listing AWS VPCs
 awsvpc_list_item = PluginMenuItem(
     link="plugins:netbox_aws_resources_plugin:awsvpc_list",
     link_text="AWS VPCs",
-    buttons=(awsvpc_add_button,),
+    buttons=(awsvpc_add_button, awsvpc_import_button),
 )
 
 # Menu item for listing AWS Subnets
 awssubnet_list_item = PluginMenuItem(
     link="plugins:netbox_aws_resources_plugin:awssubnet_list",
     link_text="AWS Subnets",
-    buttons=(awssubnet_add_button,),
+    buttons=(awssubnet_add_button, awssubnet_import_button),
 )
 
 # Menu item for listing AWS Load Balancers
 awsloadbalancer_list_item = PluginMenuItem(
     link="plugins:netbox_aws_resources_plugin:awsloadbalancer_list",
     link_text="AWS Load Balancers",
-    buttons=(awsloadbalancer_add_button,),
+    buttons=(awsloadbalancer_add_button, awsloadbalancer_import_button),
 )
 
 # Menu item for listing AWS Target Groups
 awstargetgroup_list_item = PluginMenuItem(
     link="plugins:netbox_aws_resources_plugin:awstargetgroup_list",
     link_text="AWS Target Groups",
-    buttons=(awstargetgroup_add_button,),
+    buttons=(awstargetgroup_add_button, awstargetgroup_import_button),
 )
 
 # Menu item for listing AWS EC2 Instances
 awsec2instance_list_item = PluginMenuItem(
     link="plugins:netbox_aws_resources_plugin:awsec2instance_list",
     link_text="AWS EC2 Instances",
-    buttons=(awsec2instance_add_button,),
+    buttons=(awsec2instance_add_button, awsec2instance_import_button),
 )
 
 # Menu item for listing AWS RDS Instances
 awsrdsinstance_list_item = PluginMenuItem(
     link="plugins:netbox_aws_resources_plugin:awsrdsinstance_list",
     link_text="AWS RDS Instances",
-    buttons=(awsrdsinstance_add_button,),
+    buttons=(awsrdsinstance_add_button, awsrdsinstance_import_button),
+)
+
+# Menu item for the plugin's background jobs
+background_jobs_item = PluginMenuItem(
+    link="plugins:netbox_aws_resources_plugin:background_jobs",
+    link_text="Background Jobs",
+    permissions=["core.view_job"],
+)
+
+# Menu item for the inventory integrity audit
+integrity_audit_item = PluginMenuItem(
+    link="plugins:netbox_aws_resources_plugin:integrity_audit",
+    link_text="Integrity Audit",
+    permissions=["netbox_aws_resources_plugin.view_awssubnet"],
+)
+
+# Menu item for looking up the owners of IP addresses
+ip_lookup_item = PluginMenuItem(
+    link="plugins:netbox_aws_resources_plugin:ip_lookup",
+    link_text="IP Lookup",
+    permissions=["netbox_aws_resources_plugin.view_awssubnet"],
+)
+
+# Menu item for the rightsizing report
+rightsizing_item = PluginMenuItem(
+    link="plugins:netbox_aws_resources_plugin:rightsizing",
+    link_text="Rightsizing",
+    permissions=["netbox_aws_resources_plugin.view_awsaccount"],
 )
 
 # Define the top-level menu
@@ -122,6 +206,7 @@ menu = PluginMenu(
                 awsrdsinstance_list_item,
             ),
         ),
+        ("Operations", (background_jobs_item, integrity_audit_item, ip_lookup_item, rightsizing_item)),
         # You can add more groups and items here later as your plugin grows
     ),
     icon_class="mdi mdi-cloud",  # Original cloud icon
@@ -0,0 +1,42 @@
+"""
+Region denormalization.
+
+Load balancers, target groups and EC2/RDS instances store a `region`, which is indexed and filtered on, but it is
+always their VPC's region. It is kept consistent in two places:
+
+  - set_region_from_vpc() sets it whenever one of these objects is saved, from the VPC loaded with the object (by a
+    form, an import or select_related()), so that normally no query is needed;
+  - propagate_vpc_regions() copies VPC regions to every dependent whose region differs, with one UPDATE per model.
+    It runs when a VPC's region changes, and can repair the whole inventory. Like estimated costs, the copied
+    regions are derived data and are written without change log entries.
+
+Nothing here imports the plugin's models, so the functions can also be used by migrations with historical models.
+"""
+
+from django.db.models import F, OuterRef, Subquery
+
+
+def set_region_from_vpc(instance):
+    """Set an object's region from its VPC, using the VPC already loaded with the object if there is one."""
+    vpc = instance._state.fields_cache.get("vpc")
+    if vpc is not None:
+        instance.region = vpc.region
+    elif instance.vpc_id is not None:
+        vpc_model = instance._meta.get_field("vpc").related_model
+        region = vpc_model.objects.filter(pk=instance.vpc_id).values_list("region", flat=True).first()
+        instance.region = region or instance.region
+
+
+def propagate_vpc_regions(vpc_model, dependent_models, vpc_ids=None):
+    """
+    Copy each VPC's region to the objects of `dependent_models` in it whose region differs, optionally only for the
+    VPCs with the given pks. Runs one UPDATE per model. Returns the number of objects updated per model name.
+    """
+    vpc_region = Subquery(vpc_model.objects.filter(pk=OuterRef("vpc_id")).values("region")[:1])
+    updated = {}
+    for model in dependent_models:
+        queryset = model.objects.exclude(region=F("vpc__region"))
+        if vpc_ids is not None:
+            queryset = queryset.filter(vpc_id__in=vpc_ids)
+        updated[model._meta.model_name] = queryset.update(region=vpc_region)
+    return updated
@@ -0,0 +1,269 @@
+"""
+Rightsizing recommendations from the instance catalog.
+
+An EC2 instance type's (or RDS instance class's) recommended replacement is the cheapest type in the catalog with at
+least as many vCPUs and as much memory, and the difference in on-demand price is the hourly saving from switching.
+Catalog entries without a price (listed at 0) are neither recommended nor given a recommendation. Optionally only
+types of the same family (e.g. m5, or db.r6g) are considered, since switching family can change CPU architecture or
+performance characteristics.
+
+Recommendations are worked out per catalog type rather than per instance, as an inventory only uses a few hundred
+types however many instances it has. Each kind of catalog is loaded once per process into arrays of vCPUs, memory
+and price, ordered by price, and every type is compared with every other in one vectorized operation. Instances are
+then evaluated by mapping their types to catalog positions and gathering each position's saving, again as array
+operations, so evaluating 100k instances takes milliseconds. NumPy is used if it's installed; without it the same
+comparisons run in pure Python, which is slower but still only proportional to the size of the catalog.
+
+get_account_savings() reports the potential savings of every account from one grouped query per model, counting the
+active instances of each account by type. Only running (or, for RDS, available) instances cost compute, so stopped
+and terminated instances aren't counted.
+"""
+
+from functools import lru_cache
+
+from django.db.models import Count
+from django.urls import reverse
+
+from .catalog import load_instance_data
+from .ip_lookup import describe_account
+from .models import AWSAccount, AWSEC2Instance, AWSRDSInstance
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HOURS_PER_MONTH = 730
+
+# Instances listed in a report for one account
+DEFAULT_INSTANCE_LIMIT = 1000
+
+# States in which an instance isn't billed for compute, by model
+INACTIVE_STATES = {
+    AWSEC2Instance: ("shutting-down", "terminated", "stopping", "stopped"),
+    AWSRDSInstance: ("deleting", "stopping", "stopped"),
+}
+RIGHTSIZED_MODELS = tuple(INACTIVE_STATES)
+
+
+def get_family(kind, instance_type):
+    """Return the family of an EC2 instance type ("m5.large" -> "m5") or RDS class ("db.r6g.large" -> "r6g")."""
+    parts = instance_type.split(".")
+    if kind == "rds" and len(parts) > 2:
+        return parts[1]
+    return parts[0]
+
+
+def _recommend_numpy(vcpus, ram, prices, families):
+    vcpus, ram, prices = (np.asarray(values, dtype=float) for values in (vcpus, ram, prices))
+    # fits[i, j]: type j is cheaper than type i and at least as large. Unknown prices are NaN, which never compares.
+    fits = (vcpus[None, :] >= vcpus[:, None]) & (ram[None, :] >= ram[:, None]) & (prices[None, :] < prices[:, None])
+    if families is not None:
+        codes = np.unique(np.asarray(families), return_inverse=True)[1]
+        fits &= codes[None, :] == codes[:, None]
+    # Types are ordered by price, so the first fitting column of a row is its cheapest replacement
+    found = fits.any(axis=1)
+    best = np.where(found, fits.argmax(axis=1), -1)
+    savings = np.where(found, prices - prices[best], 0.0)
+    return best, savings
+
+
+def _recommend_python(vcpus, ram, prices, families):
+    best, savings = [], []
+    for i, price in enumerate(prices):
+        found = -1
+        if price is not None:
+            # Types are ordered by price, so only earlier ones can be cheaper, and the first which fits is cheapest
+            for j in range(i):
+                if (
+                    prices[j] < price
+                    and vcpus[j] >= vcpus[i]
+                    and ram[j] >= ram[i]
+                    and (families is None or families[j] == families[i])
+                ):
+                    found = j
+                    break
+        best.append(found)
+        savings.append(price - prices[found] if found >= 0 else 0.0)
+    return best, savings
+
+
+class Catalog:
+    """One kind of the instance catalog ("ec2" or "rds") as arrays ordered by price, with unpriced types last."""
+
+    def __init__(self, kind, specs):
+        self.kind = kind
+        entries = []
+        for instance_type, spec in specs.items():
+            price = spec.get("price_usd_hourly") or None
+            entries.append((price is None, price or 0, spec.get("vcpu") or 0, spec.get("ram_gb") or 0, instance_type))
+        entries.sort()
+        self.types = [entry[4] for entry in entries]
+        self.positions = {instance_type: i for i, instance_type in enumerate(self.types)}
+        self.prices = [None if unpriced else price for unpriced, price, *_ in entries]
+        self.vcpus = [entry[2] for entry in entries]
+        self.ram = [entry[3] for entry in entries]
+        self.families = [get_family(kind, instance_type) for instance_type in self.types]
+        self._recommendations = {}
+
+    def __len__(self):
+        return len(self.types)
+
+    def get_price(self, instance_type):
+        position = self.positions.get(instance_type)
+        return self.prices[position] if position is not None else None
+
+    def get_recommendations(self, same_family=False):
+        """
+        Return, for every catalog position, the position of its recommended replacement (-1 if there is none) and the
+        hourly saving from switching, as two arrays (lists, without NumPy).
+        """
+        if same_family not in self._recommendations:
+            families = self.families if same_family else None
+            if np is not None:
+                prices = [float("nan") if price is None else price for price in self.prices]
+                result = _recommend_numpy(self.vcpus, self.ram, prices, families)
+            else:
+                result = _recommend_python(self.vcpus, self.ram, self.prices, families)
+            self._recommendations[same_family] = result
+        return self._recommendations[same_family]
+
+    def evaluate(self, instance_types, same_family=False):
+        """
+        Return the catalog position of each instance type's recommended replacement (-1 if there is none) and the
+        hourly saving, as two arrays (lists, without NumPy) aligned with `instance_types`. Types missing from the
+        catalog have no recommendation.
+        """
+        positions = [self.positions.get(instance_type, -1) for instance_type in instance_types]
+        if not self.types:
+            if np is not None:
+                return np.full(len(positions), -1), np.zeros(len(positions))
+            return [-1] * len(positions), [0.0] * len(positions)
+        best, savings = self.get_recommendations(same_family)
+        if np is not None:
+            positions = np.asarray(positions, dtype=int)
+            known = positions >= 0
+            positions = np.where(known, positions, 0)
+            return np.where(known, best[positions], -1), np.where(known, savings[positions], 0.0)
+        return (
+            [best[position] if position >= 0 else -1 for position in positions],
+            [savings[position] if position >= 0 else 0.0 for position in positions],
+        )
+
+
+@lru_cache(maxsize=None)
+def get_catalog(kind):
+    return Catalog(kind, load_instance_data().get(kind, {}))
+
+
+def _active(model, user=None):
+    queryset = model.objects.exclude(state__in=INACTIVE_STATES[model])
+    return queryset.restrict(user, "view") if user is not None else queryset
+
+
+def get_account_savings(accounts=None, user=None, same_family=False):
+    """
+    Return the potential savings of each account (or of the given account pks), limited to the instances `user` may
+    view if given, as {account pk: {"instances", "rightsizable", "hourly_cost", "hourly_savings"}}. Costs are hourly
+    on-demand prices in USD, from the catalog.
+    """
+    report = {}
+    for model in RIGHTSIZED_MODELS:
+        catalog = get_catalog(model.catalog_kind)
+        queryset = _active(model, user)
+        if accounts is not None:
+            queryset = queryset.filter(aws_account__in=accounts)
+        rows = list(
+            queryset.order_by()
+            .values("aws_account", model.catalog_type_field)
+            .annotate(count=Count("pk"))
+            .values_list("aws_account", model.catalog_type_field, "count")
+        )
+        best, savings = catalog.evaluate([instance_type for _, instance_type, _ in rows], same_family)
+        for (account_pk, instance_type, count), position, saving in zip(rows, best, savings):
+            totals = report.setdefault(
+                account_pk, {"instances": 0, "rightsizable": 0, "hourly_cost": 0.0, "hourly_savings": 0.0}
+            )
+            totals["instances"] += count
+            totals["hourly_cost"] += (catalog.get_price(instance_type) or 0) * count
+            if position >= 0:
+                totals["rightsizable"] += count
+                totals["hourly_savings"] += float(saving) * count
+    return report
+
+
+def get_instance_recommendations(model, queryset=None, user=None, same_family=False, limit=None):
+    """
+    Return the active instances of a model (optionally within a queryset) which have a cheaper replacement, largest
+    saving first, as a list of {"instance": (pk, name, instance ID, account pk), "instance_type", "recommended_type",
+    "hourly_cost", "hourly_saving"}.
+    """
+    catalog = get_catalog(model.catalog_kind)
+    queryset = _active(model, user) if queryset is None else queryset.exclude(state__in=INACTIVE_STATES[model])
+    rows = list(queryset.values_list("pk", "name", "instance_id", "aws_account_id", model.catalog_type_field))
+    best, savings = catalog.evaluate([row[4] for row in rows], same_family)
+    if np is not None:
+        order = np.argsort(-savings, kind="stable")
+        order = order[savings[order] > 0][:limit].tolist()
+    else:
+        order = sorted((i for i, saving in enumerate(savings) if saving > 0), key=lambda i: -savings[i])[:limit]
+    return [
+        {
+            "instance": rows[i][:4],
+            "instance_type": rows[i][4],
+            "recommended_type": catalog.types[best[i]],
+            "hourly_cost": catalog.get_price(rows[i][4]),
+            "hourly_saving": round(float(savings[i]), 4),
+        }
+        for i in order
+    ]
+
+
+def _with_monthly(totals):
+    return {
+        **totals,
+        "hourly_cost": round(totals["hourly_cost"], 4),
+        "hourly_savings": round(totals["hourly_savings"], 4),
+        "monthly_savings": round(totals["hourly_savings"] * HOURS_PER_MONTH, 2),
+    }
+
+
+def get_report(user=None, same_family=False, aws_account=None, limit=DEFAULT_INSTANCE_LIMIT):
+    """
+    Return the rightsizing report, limited to what `user` may view if given: {"accounts", "totals"}, with each
+    account's savings (largest first), and for an `aws_account` also "instances", the account's instances which have a
+    cheaper replacement, largest saving first (at most `limit`; None lists them all).
+    """
+    savings = get_account_savings([aws_account.pk] if aws_account else None, user, same_family)
+    accounts = AWSAccount.objects.filter(pk__in=savings)
+    if user is not None:
+        accounts = accounts.restrict(user, "view")
+    accounts = list(accounts)
+    rows = [{"aws_account": describe_account(account), **_with_monthly(savings[account.pk])} for account in accounts]
+    rows.sort(key=lambda row: row["hourly_savings"], reverse=True)
+    totals = {
+        key: sum(savings[account.pk][key] for account in accounts)
+        for key in ("instances", "rightsizable", "hourly_cost", "hourly_savings")
+    }
+    report = {"accounts": rows, "totals": _with_monthly(totals)}
+
+    if aws_account is not None:
+        instances = []
+        for model in RIGHTSIZED_MODELS:
+            queryset = model.objects.filter(aws_account=aws_account)
+            if user is not None:
+                queryset = queryset.restrict(user, "view")
+            for recommendation in get_instance_recommendations(model, queryset, same_family=same_family, limit=limit):
+                pk, name, instance_id, _ = recommendation.pop("instance")
+                model_name = model._meta.model_name
+                instance = {
+                    "model": model_name,
+                    "id": pk,
+                    "name": name,
+                    "instance_id": instance_id,
+                    "url": reverse(f"plugins:netbox_aws_resources_plugin:{model_name}", kwargs={"pk": pk}),
+                }
+                instances.append({"instance": instance, **recommendation})
+        instances.sort(key=lambda row: row["hourly_saving"], reverse=True)
+        report["instances"] = instances[:limit]
+    return report
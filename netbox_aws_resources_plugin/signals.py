@@ -0,0 +1,111 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from ipam.models import Prefix
+
+from .caching import IP_INDEX_SCOPE, account_scope, bump_versions, bump_versions_on_commit, region_scope, vpc_scope
+from .models import (
+    AWSVPC,
+    VPC_REGION_MODELS,
+    AWSAccount,
+    AWSEC2Instance,
+    AWSLoadBalancer,
+    AWSRDSInstance,
+    AWSSubnet,
+    AWSTargetGroup,
+)
+from .regions import propagate_vpc_regions
+
+# Models whose changes invalidate cached derived data
+CACHED_MODELS = (AWSAccount, AWSVPC, AWSSubnet, AWSLoadBalancer, AWSTargetGroup, AWSEC2Instance, AWSRDSInstance)
+
+
+def _vpc_scopes(vpc_id, vpc=None):
+    if vpc_id is None:
+        return set()
+    if vpc is None:
+        values = AWSVPC.objects.filter(pk=vpc_id).values_list("aws_account_id", "region").first()
+        if values is None:
+            return {vpc_scope(vpc_id)}
+        account_id, region = values
+    else:
+        account_id, region = vpc.aws_account_id, vpc.region
+    return {vpc_scope(vpc_id), account_scope(account_id), region_scope(region)}
+
+
+def get_cache_scopes(instance):
+    """Return the cache scopes an object belongs to in its current state."""
+    if isinstance(instance, AWSAccount):
+        scopes = {account_scope(instance.pk)}
+        if instance.parent_account_id:
+            scopes.add(account_scope(instance.parent_account_id))
+        return scopes
+
+    if isinstance(instance, AWSVPC):
+        return {vpc_scope(instance.pk), account_scope(instance.aws_account_id), region_scope(instance.region)}
+
+    if isinstance(instance, AWSSubnet):
+        # Use the VPC if it's already been loaded, to avoid a query per save
+        vpc = instance._state.fields_cache.get("aws_vpc")
+        return _vpc_scopes(instance.aws_vpc_id, vpc)
+
+    scopes = {account_scope(instance.aws_account_id), region_scope(instance.region)}
+    if instance.vpc_id:
+        scopes.add(vpc_scope(instance.vpc_id))
+    return scopes
+
+
+def _prechange_scopes(instance):
+    """Return the scopes an object belonged to before it was edited, if a pre-change snapshot was taken."""
+    snapshot = getattr(instance, "_prechange_snapshot", None) or {}
+    scopes = set()
+    if snapshot.get("aws_account"):
+        scopes.add(account_scope(snapshot["aws_account"]))
+    if snapshot.get("parent_account"):
+        scopes.add(account_scope(snapshot["parent_account"]))
+    if snapshot.get("region"):
+        scopes.add(region_scope(snapshot["region"]))
+    if snapshot.get("vpc"):
+        scopes.add(vpc_scope(snapshot["vpc"]))
+    if snapshot.get("aws_vpc"):
+        scopes.update(_vpc_scopes(snapshot["aws_vpc"]))
+    return scopes
+
+
+def get_invalidated_scopes(instance):
+    """Return the scopes a change to an object invalidates: those it belongs to now and those it belonged to before."""
+    return get_cache_scopes(instance) | _prechange_scopes(instance)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_cached_data(sender, instance, **kwargs):
+    if sender not in CACHED_MODELS:
+        return
+    bump_versions_on_commit(*get_invalidated_scopes(instance))
+
+
+@receiver(post_save, sender=AWSVPC)
+@receiver(post_delete, sender=AWSVPC)
+@receiver(post_save, sender=AWSSubnet)
+@receiver(post_delete, sender=AWSSubnet)
+@receiver(post_save, sender=Prefix)
+def invalidate_ip_index(sender, **kwargs):
+    # A VPC or subnet, or the Prefix holding its CIDR, may have changed; the IP lookup index catches up on next use
+    bump_versions(IP_INDEX_SCOPE)
+
+
+@receiver(post_save, sender=AWSVPC)
+def propagate_vpc_region(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_loaded_region", None)
+    if created or previous is None or previous == instance.region:
+        return
+    propagate_vpc_regions(AWSVPC, VPC_REGION_MODELS, vpc_ids=[instance.pk])
+    instance._loaded_region = instance.region
+    bump_versions_on_commit(region_scope(previous), region_scope(instance.region))
+
+
+@receiver(m2m_changed, sender=AWSLoadBalancer.subnets.through)
+@receiver(m2m_changed, sender=AWSTargetGroup.load_balancers.through)
+def invalidate_cached_relations(sender, instance, action, **kwargs):
+    if action.startswith("post_") and isinstance(instance, CACHED_MODELS):
+        bump_versions_on_commit(*get_cache_scopes(instance))
@@ -0,0 +1,183 @@
+"""
+Mark-and-sweep detection of resources which have disappeared from AWS.
+
+Every plugin model has an indexed `last_seen` timestamp, which syncs set on everything they find:
+
+  - mark_seen() stamps a queryset with one UPDATE, and mark_seen_by_key() stamps objects by their AWS identifier
+    (account ID, VPC ID, ARN...) with one UPDATE per model. Neither saves the objects, so the timestamps are written
+    without change log entries, events or cache invalidation, like other sync metadata. Stamping also clears the
+    stale tag from objects which have reappeared.
+  - sweep() finds the objects not seen since a cutoff (typically the start of the last full sync) with one range scan
+    of the last_seen index per model, and either tags them as stale (in bulk, also without change log entries) or
+    deletes them.
+
+Given a user, both only touch the objects the user's object permissions allow them to change (or, for a delete
+sweep, delete); the rest are left alone, as though they'd been seen.
+
+Objects which have never been stamped (created by hand, or before syncs stamped them) are never swept. Deletes run
+in DELETION_ORDER, children first, and skip any object still referenced by something which isn't being deleted;
+they go through the ORM, so each deletion is change-logged.
+"""
+
+from contextlib import nullcontext
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import PROTECT
+from django.utils import timezone
+from extras.models import Tag, TaggedItem
+
+from .events import batched_events
+from .models import (
+    AWSVPC,
+    DELETION_ORDER,
+    AWSAccount,
+    AWSEC2Instance,
+    AWSLoadBalancer,
+    AWSRDSInstance,
+    AWSSubnet,
+    AWSTargetGroup,
+)
+
+SWEEP_MARK = "mark"
+SWEEP_DELETE = "delete"
+SWEEP_ACTIONS = (SWEEP_MARK, SWEEP_DELETE)
+
+STALE_TAG_SLUG = "aws-stale"
+STALE_TAG_NAME = "AWS Stale"
+STALE_TAG_COLOR = "ff9800"
+
+# The AWS identifier of each model, by which syncs report what they found
+NATURAL_KEYS = {
+    AWSAccount: "account_id",
+    AWSVPC: "vpc_id",
+    AWSSubnet: "subnet_id",
+    AWSLoadBalancer: "arn",
+    AWSTargetGroup: "arn",
+    AWSEC2Instance: "instance_id",
+    AWSRDSInstance: "instance_id",
+}
+MODELS_BY_NAME = {model._meta.model_name: model for model in DELETION_ORDER}
+
+# Identifiers per UPDATE when stamping by key, to keep the IN list a sensible size
+KEY_BATCH_SIZE = 5000
+
+
+def get_required_permissions(action=SWEEP_MARK):
+    """Return the permissions needed to sweep: changing (tagging) or deleting objects of every plugin model."""
+    verb = "delete" if action == SWEEP_DELETE else "change"
+    return [f"netbox_aws_resources_plugin.{verb}_{model._meta.model_name}" for model in DELETION_ORDER]
+
+
+def get_stale_tag():
+    tag, _ = Tag.objects.get_or_create(slug=STALE_TAG_SLUG, defaults={"name": STALE_TAG_NAME, "color": STALE_TAG_COLOR})
+    return tag
+
+
+def _clear_stale_tag(queryset):
+    TaggedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(queryset.model),
+        tag__slug=STALE_TAG_SLUG,
+        object_id__in=queryset.values("pk"),
+    ).delete()
+
+
+def mark_seen(queryset, seen=None):
+    """Stamp every object in a queryset as seen at `seen` (default now). Returns the number of objects stamped."""
+    seen = seen or timezone.now()
+    count = queryset.update(last_seen=seen)
+    _clear_stale_tag(queryset)
+    return count
+
+
+def _restrict(queryset, user, action):
+    return queryset.restrict(user, action) if user is not None else queryset
+
+
+def mark_seen_by_key(model, keys, seen=None, user=None):
+    """
+    Stamp the objects of a model with the given AWS identifiers (see NATURAL_KEYS) as seen at `seen` (default now).
+    Unknown identifiers, and objects `user` may not change, are ignored. Returns the number of objects stamped.
+    """
+    seen = seen or timezone.now()
+    keys = list(keys)
+    queryset = _restrict(model.objects.all(), user, "change")
+    count = 0
+    for start in range(0, len(keys), KEY_BATCH_SIZE):
+        end = start + KEY_BATCH_SIZE
+        count += mark_seen(queryset.filter(**{f"{NATURAL_KEYS[model]}__in": keys[start:end]}), seen)
+    return count
+
+
+def get_unseen(model, before, user=None, action=SWEEP_MARK):
+    """
+    Return the objects of a model last seen before `before`. Objects never seen aren't included, and nor are objects
+    `user` may not change (SWEEP_MARK) or delete (SWEEP_DELETE).
+    """
+    queryset = model.objects.filter(last_seen__lt=before)
+    return _restrict(queryset, user, "delete" if action == SWEEP_DELETE else "change")
+
+
+def _exclude_referenced(queryset, before=None, user=None):
+    """
+    Exclude objects which are still referenced by a protecting foreign key from another plugin object, and so can't
+    be deleted. With `before`, only references from objects which wouldn't themselves be swept are counted, to
+    estimate a sweep without deleting anything.
+    """
+    for relation in queryset.model._meta.related_objects:
+        if relation.on_delete is not PROTECT or relation.related_model not in NATURAL_KEYS:
+            continue
+        attname = relation.field.attname
+        referencing = relation.related_model.objects.filter(**{f"{attname}__isnull": False})
+        if before is not None:
+            referencing = referencing.exclude(
+                pk__in=get_unseen(relation.related_model, before, user, SWEEP_DELETE).values("pk")
+            )
+        queryset = queryset.exclude(pk__in=referencing.values(attname))
+    return queryset
+
+
+def sweep(before, action=SWEEP_MARK, request=None, dry_run=False, user=None):
+    """
+    Find the objects of every model last seen before `before` and tag them as stale (SWEEP_MARK) or delete them
+    (SWEEP_DELETE), leaving alone any which `user` may not change or delete. Deletions are attributed to `request` in
+    the change log, with their events delivered in batches. A dry run only counts. Returns {model name: {"unseen":
+    count, "marked"/"deleted": count}}; a dry run of a delete also estimates how many objects are "deletable".
+    """
+    if action not in SWEEP_ACTIONS:
+        raise ValueError(f"Unknown sweep action: {action}")
+
+    report = {}
+    if action == SWEEP_MARK:
+        tag = None if dry_run else get_stale_tag()
+        for model in DELETION_ORDER:
+            unseen = get_unseen(model, before, user, action)
+            if dry_run:
+                report[model._meta.model_name] = {"unseen": unseen.count(), "marked": 0}
+                continue
+            content_type = ContentType.objects.get_for_model(model)
+            pks = list(unseen.values_list("pk", flat=True))
+            tagged = TaggedItem.objects.filter(content_type=content_type, tag=tag, object_id__in=unseen.values("pk"))
+            tagged = set(tagged.values_list("object_id", flat=True))
+            TaggedItem.objects.bulk_create(
+                [TaggedItem(tag=tag, content_type=content_type, object_id=pk) for pk in pks if pk not in tagged]
+            )
+            report[model._meta.model_name] = {"unseen": len(pks), "marked": len(pks) - len(tagged)}
+        return report
+
+    if dry_run:
+        for model in DELETION_ORDER:
+            unseen = get_unseen(model, before, user, action)
+            count = _exclude_referenced(unseen, before, user).count()
+            report[model._meta.model_name] = {"unseen": unseen.count(), "deleted": 0, "deletable": count}
+        return report
+
+    with batched_events(request) if request else nullcontext():
+        with transaction.atomic():
+            # Children first, so a parent whose children have all been swept can be deleted in the same run
+            for model in DELETION_ORDER:
+                unseen = get_unseen(model, before, user, action)
+                count = unseen.count()
+                deleted = _exclude_referenced(unseen).delete()[1].get(model._meta.label, 0) if count else 0
+                report[model._meta.model_name] = {"unseen": count, "deleted": deleted}
+    return report
@@ -0,0 +1,95 @@
+"""
+Aggregate summaries shown on object detail pages. Each summary is computed with a fixed number of aggregate queries
+and cached until an object in its scope changes (see caching.py).
+"""
+
+from decimal import Decimal
+
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .caching import account_scope, get_or_build, vpc_scope
+from .models import AWSVPC, AWSAccount, AWSEC2Instance, AWSLoadBalancer, AWSRDSInstance, AWSSubnet, AWSTargetGroup
+
+
+def _count_subquery(queryset, field):
+    """A correlated subquery counting the rows of `queryset` whose `field` matches the outer row's pk."""
+    counts = queryset.filter(**{field: OuterRef("pk")}).order_by().values(field).annotate(count=Count("pk"))
+    return Coalesce(Subquery(counts.values("count"), output_field=IntegerField()), Value(0))
+
+
+def _build_account_summary(account):
+    return (
+        AWSAccount.objects.filter(pk=account.pk)
+        .annotate(
+            child_account_count=_count_subquery(AWSAccount.objects.all(), "parent_account"),
+            vpc_count=_count_subquery(AWSVPC.objects.all(), "aws_account"),
+            subnet_count=_count_subquery(AWSSubnet.objects.all(), "aws_vpc__aws_account"),
+            load_balancer_count=_count_subquery(AWSLoadBalancer.objects.all(), "aws_account"),
+            target_group_count=_count_subquery(AWSTargetGroup.objects.all(), "aws_account"),
+            ec2_instance_count=_count_subquery(AWSEC2Instance.objects.all(), "aws_account"),
+            rds_instance_count=_count_subquery(AWSRDSInstance.objects.all(), "aws_account"),
+        )
+        .values(
+            "child_account_count",
+            "vpc_count",
+            "subnet_count",
+            "load_balancer_count",
+            "target_group_count",
+            "ec2_instance_count",
+            "rds_instance_count",
+        )
+        .get()
+    )
+
+
+def get_account_summary(account):
+    """Return counts of the objects belonging to an AWS account, computed in a single query."""
+    return get_or_build("account-summary", [account_scope(account.pk)], lambda: _build_account_summary(account))
+
+
+def _build_vpc_summary(vpc):
+    resources = {}
+    hourly_cost = Decimal("0")
+
+    # One grouped query per model: object counts (and cost, where applicable) by state
+    for model in (AWSEC2Instance, AWSRDSInstance):
+        rows = (
+            model.objects.filter(vpc=vpc)
+            .order_by()
+            .values("state")
+            .annotate(count=Count("pk"), cost=Sum("estimated_cost_usd_hourly"))
+        )
+        by_state = {}
+        for row in rows:
+            by_state[row["state"] or "unknown"] = row["count"]
+            hourly_cost += row["cost"] or 0
+        resources[model._meta.model_name] = by_state
+
+    for model in (AWSLoadBalancer, AWSTargetGroup):
+        rows = model.objects.filter(vpc=vpc).order_by().values("state").annotate(count=Count("pk"))
+        resources[model._meta.model_name] = {row["state"] or "unknown": row["count"] for row in rows}
+
+    subnets_by_az = {
+        row["availability_zone"] or "unknown": row["count"]
+        for row in AWSSubnet.objects.filter(aws_vpc=vpc)
+        .order_by("availability_zone")
+        .values("availability_zone")
+        .annotate(count=Count("pk"))
+    }
+
+    return {
+        "resources": resources,
+        "totals": {name: sum(by_state.values()) for name, by_state in resources.items()},
+        "hourly_cost": hourly_cost,
+        "subnets_by_az": subnets_by_az,
+        "subnet_count": sum(subnets_by_az.values()),
+    }
+
+
+def get_vpc_summary(vpc):
+    """
+    Return the resources attached to a VPC: per-model counts by state, total estimated hourly cost and subnet counts
+    per availability zone. Computed with five grouped queries and cached until something in the VPC changes.
+    """
+    return get_or_build("vpc-summary", [vpc_scope(vpc.pk)], lambda: _build_vpc_summary(vpc))
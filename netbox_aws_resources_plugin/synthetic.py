@@ -0,0 +1,359 @@
+"""
+Synthetic AWS inventories for performance and load testing.
+
+InventoryGenerator builds a consistent estate across every plugin model: accounts under a root account, VPCs
+spread over accounts and regions, subnets whose Prefixes nest inside their VPC's Prefix, and load balancers, target
+groups and EC2/RDS instances attached to VPCs and subnets in the same account and region. Everything is written with
+bulk_create() in batches, so no signals run and no change log is written. Prefix depth and child counts are rebuilt
+once at the end. Names and IDs are deterministic, so the same settings always produce the same estate.
+
+Generated accounts are tagged with SYNTHETIC_TAG_SLUG, and every other generated object belongs to one of them, so
+get_synthetic() and clear_inventory() find exactly the generated estate however real objects are named.
+"""
+
+import math
+
+import netaddr
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from extras.models import Tag, TaggedItem
+from ipam.models import Prefix
+from ipam.utils import rebuild_prefixes
+
+from .caching import IP_INDEX_SCOPE, account_scope, bump_versions, region_scope, vpc_scope
+from .catalog import load_instance_data
+from .enrichment import get_cost
+from .models import (
+    AWSVPC,
+    DELETION_ORDER,
+    AWSAccount,
+    AWSEC2Instance,
+    AWSLoadBalancer,
+    AWSRDSInstance,
+    AWSSubnet,
+    AWSTargetGroup,
+)
+
+DEFAULT_REGIONS = ("us-east-1", "us-west-2", "eu-west-1", "eu-central-1", "ap-southeast-2", "ap-northeast-1")
+DEFAULT_BATCH_SIZE = 2000
+DEFAULT_ROOT_PREFIX = "10.0.0.0/8"
+NAME_PREFIX = "synthetic"
+ACCOUNT_ID_BASE = 900000000000
+
+# Marks generated accounts, and so everything in them, so they can be found (and removed) again
+SYNTHETIC_TAG_SLUG = "aws-synthetic"
+SYNTHETIC_TAG_NAME = "AWS Synthetic"
+SYNTHETIC_TAG_COLOR = "9e9e9e"
+
+# Object counts per model for some standard estate sizes
+PRESETS = {
+    "small": {
+        "accounts": 10,
+        "vpcs": 50,
+        "subnets": 500,
+        "load_balancers": 100,
+        "target_groups": 200,
+        "ec2_instances": 1000,
+        "rds_instances": 100,
+    },
+    "medium": {
+        "accounts": 50,
+        "vpcs": 500,
+        "subnets": 5000,
+        "load_balancers": 1000,
+        "target_groups": 2000,
+        "ec2_instances": 10000,
+        "rds_instances": 1000,
+    },
+    "production": {
+        "accounts": 300,
+        "vpcs": 2000,
+        "subnets": 40000,
+        "load_balancers": 5000,
+        "target_groups": 10000,
+        "ec2_instances": 100000,
+        "rds_instances": 5000,
+    },
+}
+
+
+def uniform_counts(count):
+    """Counts for an estate with `count` objects of every model."""
+    return {key: count for key in PRESETS["small"]}
+
+
+def get_synthetic_tag():
+    tag, _ = Tag.objects.get_or_create(
+        slug=SYNTHETIC_TAG_SLUG, defaults={"name": SYNTHETIC_TAG_NAME, "color": SYNTHETIC_TAG_COLOR}
+    )
+    return tag
+
+
+def get_synthetic(model):
+    """Return the generated objects of a plugin model: the tagged accounts, and everything in them."""
+    accounts = AWSAccount.objects.filter(tags__slug=SYNTHETIC_TAG_SLUG)
+    if model is AWSAccount:
+        return accounts
+    if model is AWSSubnet:
+        return model.objects.filter(aws_vpc__aws_account__in=accounts)
+    return model.objects.filter(aws_account__in=accounts)
+
+
+def clear_inventory():
+    """
+    Delete every generated object, and the Prefixes created for generated VPCs and subnets, in a single transaction.
+    Returns the number of objects deleted per model.
+    """
+    deleted = {}
+    with transaction.atomic():
+        prefix_ids = [
+            *get_synthetic(AWSSubnet).values_list("cidr_block_id", flat=True),
+            *get_synthetic(AWSVPC).values_list("cidr_block_id", flat=True),
+        ]
+        scopes = [
+            IP_INDEX_SCOPE,
+            *(account_scope(pk) for pk in get_synthetic(AWSAccount).values_list("pk", flat=True)),
+            *(vpc_scope(pk) for pk in get_synthetic(AWSVPC).values_list("pk", flat=True)),
+            *(region_scope(region) for region in get_synthetic(AWSVPC).values_list("region", flat=True).distinct()),
+        ]
+        for model in DELETION_ORDER:
+            _, counts = get_synthetic(model).delete()
+            deleted[model._meta.verbose_name_plural] = counts.get(model._meta.label, 0)
+        _, counts = Prefix.objects.filter(pk__in=prefix_ids).delete()
+        deleted[Prefix._meta.verbose_name_plural] = counts.get(Prefix._meta.label, 0)
+        rebuild_prefixes(None)
+    bump_versions(*scopes)
+    return deleted
+
+
+class InventoryGenerator:
+    def __init__(
+        self,
+        accounts,
+        vpcs,
+        subnets,
+        load_balancers=0,
+        target_groups=0,
+        ec2_instances=0,
+        rds_instances=0,
+        regions=DEFAULT_REGIONS,
+        root_prefix=DEFAULT_ROOT_PREFIX,
+        batch_size=DEFAULT_BATCH_SIZE,
+    ):
+        if not accounts or not vpcs:
+            raise ValueError("At least one account and one VPC are required.")
+        if (load_balancers or target_groups or ec2_instances or rds_instances) and not subnets:
+            raise ValueError("Load balancers, target groups and instances require subnets.")
+        if target_groups and not load_balancers:
+            raise ValueError("Target groups require load balancers.")
+
+        self.counts = {
+            "accounts": accounts,
+            "vpcs": vpcs,
+            "subnets": subnets,
+            "load_balancers": load_balancers,
+            "target_groups": target_groups,
+            "ec2_instances": ec2_instances,
+            "rds_instances": rds_instances,
+        }
+        self.regions = list(regions)
+        self.batch_size = batch_size
+        self.root_prefix = netaddr.IPNetwork(root_prefix)
+        self.vpc_length, self.subnet_length = self.get_prefix_lengths()
+
+    def get_prefix_lengths(self):
+        """Pick the longest VPC and subnet prefix lengths which fit every VPC, and its subnets, in the root prefix."""
+        vpc_length = max(16, self.root_prefix.prefixlen + math.ceil(math.log2(self.counts["vpcs"])))
+        subnets_per_vpc = math.ceil(self.counts["subnets"] / self.counts["vpcs"]) if self.counts["subnets"] else 1
+        subnet_length = vpc_length + max(1, math.ceil(math.log2(max(subnets_per_vpc, 1))))
+        if subnet_length > 28:
+            raise ValueError(
+                f"{self.counts['vpcs']} VPCs with {subnets_per_vpc} subnets each don't fit in {self.root_prefix}."
+            )
+        return vpc_length, subnet_length
+
+    def _network(self, first, length):
+        return netaddr.IPNetwork(f"{netaddr.IPAddress(first, self.root_prefix.version)}/{length}")
+
+    def _bulk_create(self, model, objects):
+        return model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def generate(self):
+        """Create the inventory in a single transaction. Returns the number of objects created per model."""
+        with transaction.atomic():
+            accounts = self.create_accounts()
+            vpcs = self.create_vpcs(accounts)
+            subnets = self.create_subnets(vpcs)
+            load_balancers = self.create_load_balancers(vpcs, subnets)
+            self.create_target_groups(load_balancers)
+            self.create_instances(AWSEC2Instance, self.counts["ec2_instances"], subnets)
+            self.create_instances(AWSRDSInstance, self.counts["rds_instances"], subnets)
+            # bulk_create() skips the signals which maintain each Prefix's depth and child count
+            rebuild_prefixes(None)
+
+        bump_versions(
+            IP_INDEX_SCOPE,
+            *(account_scope(account.pk) for account in accounts),
+            *(vpc_scope(vpc.pk) for vpc in vpcs),
+            *(region_scope(region) for region in self.regions),
+        )
+        return dict(self.counts)
+
+    def create_accounts(self):
+        root = AWSAccount(name=f"{NAME_PREFIX}-root", account_id=str(ACCOUNT_ID_BASE))
+        self._bulk_create(AWSAccount, [root])
+        members = [
+            AWSAccount(name=f"{NAME_PREFIX}-account-{i:05d}", account_id=str(ACCOUNT_ID_BASE + i), parent_account=root)
+            for i in range(1, self.counts["accounts"])
+        ]
+        accounts = [root] + self._bulk_create(AWSAccount, members)
+
+        tag = get_synthetic_tag()
+        content_type = ContentType.objects.get_for_model(AWSAccount)
+        self._bulk_create(
+            TaggedItem, [TaggedItem(tag=tag, content_type=content_type, object_id=account.pk) for account in accounts]
+        )
+        return accounts
+
+    def create_vpcs(self, accounts):
+        vpc_size = 2 ** (self.root_prefix.max_prefixlen - self.vpc_length)
+        prefixes = self._bulk_create(
+            Prefix,
+            [
+                Prefix(prefix=self._network(self.root_prefix.first + i * vpc_size, self.vpc_length))
+                for i in range(self.counts["vpcs"])
+            ],
+        )
+        vpcs = []
+        for i, prefix in enumerate(prefixes):
+            # Each account's VPCs rotate through the regions
+            vpcs.append(
+                AWSVPC(
+                    name=f"{NAME_PREFIX}-vpc-{i:06d}",
+                    vpc_id=f"vpc-{i:017x}",
+                    aws_account_id=accounts[i % len(accounts)].pk,
+                    region=self.regions[(i // len(accounts)) % len(self.regions)],
+                    cidr_block=prefix,
+                    state="available",
+                )
+            )
+        return self._bulk_create(AWSVPC, vpcs)
+
+    def create_subnets(self, vpcs):
+        subnet_size = 2 ** (self.root_prefix.max_prefixlen - self.subnet_length)
+        # Subnet i goes in VPC i % len(vpcs), so each VPC gets consecutive slices of its own prefix
+        placements = []
+        for i in range(self.counts["subnets"]):
+            vpc = vpcs[i % len(vpcs)]
+            network = self._network(vpc.cidr_block.prefix.first + (i // len(vpcs)) * subnet_size, self.subnet_length)
+            placements.append((i, vpc, network))
+
+        prefixes = self._bulk_create(Prefix, [Prefix(prefix=network) for _, _, network in placements])
+        subnets = [
+            AWSSubnet(
+                name=f"{NAME_PREFIX}-subnet-{i:06d}",
+                subnet_id=f"subnet-{i:017x}",
+                aws_vpc=vpc,
+                cidr_block=prefix,
+                availability_zone=f"{vpc.region}{'abc'[i // len(vpcs) % 3]}",
+                state="available",
+            )
+            for (i, vpc, _), prefix in zip(placements, prefixes)
+        ]
+        return self._bulk_create(AWSSubnet, subnets)
+
+    def create_load_balancers(self, vpcs, subnets):
+        if not self.counts["load_balancers"]:
+            return []
+        subnets_by_vpc = {}
+        for subnet in subnets:
+            subnets_by_vpc.setdefault(subnet.aws_vpc_id, []).append(subnet)
+        # Only VPCs with subnets can hold load balancers
+        vpcs = [vpc for vpc in vpcs if vpc.pk in subnets_by_vpc]
+
+        load_balancers = []
+        for i in range(self.counts["load_balancers"]):
+            vpc = vpcs[i % len(vpcs)]
+            load_balancers.append(
+                AWSLoadBalancer(
+                    name=f"{NAME_PREFIX}-lb-{i:06d}",
+                    arn=f"arn:aws:elasticloadbalancing:{vpc.region}:{ACCOUNT_ID_BASE}:loadbalancer/app/lb-{i}/{i:016x}",
+                    aws_account_id=vpc.aws_account_id,
+                    region=vpc.region,
+                    vpc=vpc,
+                    type="application" if i % 3 else "network",
+                    scheme="internal" if i % 2 else "internet-facing",
+                    dns_name=f"{NAME_PREFIX}-lb-{i:06d}.{vpc.region}.elb.amazonaws.com",
+                    state="active",
+                )
+            )
+        load_balancers = self._bulk_create(AWSLoadBalancer, load_balancers)
+
+        # Attach each load balancer to (up to) two subnets in its VPC
+        through = AWSLoadBalancer.subnets.through
+        links = []
+        for lb in load_balancers:
+            for subnet in subnets_by_vpc[lb.vpc_id][:2]:
+                links.append(through(awsloadbalancer_id=lb.pk, awssubnet_id=subnet.pk))
+        self._bulk_create(through, links)
+        return load_balancers
+
+    def create_target_groups(self, load_balancers):
+        if not self.counts["target_groups"]:
+            return []
+        target_groups = []
+        for i in range(self.counts["target_groups"]):
+            lb = load_balancers[i % len(load_balancers)]
+            target_groups.append(
+                AWSTargetGroup(
+                    name=f"{NAME_PREFIX}-tg-{i:06d}",
+                    arn=f"arn:aws:elasticloadbalancing:{lb.region}:{ACCOUNT_ID_BASE}:targetgroup/tg-{i}/{i:016x}",
+                    aws_account_id=lb.aws_account_id,
+                    region=lb.region,
+                    vpc_id=lb.vpc_id,
+                    target_type="instance",
+                    state="active",
+                )
+            )
+        target_groups = self._bulk_create(AWSTargetGroup, target_groups)
+
+        through = AWSTargetGroup.load_balancers.through
+        self._bulk_create(
+            through,
+            [
+                through(awstargetgroup_id=tg.pk, awsloadbalancer_id=load_balancers[i % len(load_balancers)].pk)
+                for i, tg in enumerate(target_groups)
+            ],
+        )
+        return target_groups
+
+    def create_instances(self, model, count, subnets):
+        if not count:
+            return []
+        catalog = load_instance_data().get(model.catalog_kind, {})
+        # Cycle through the catalog in a stable order so costs vary but are reproducible
+        types = sorted(catalog) or [""]
+        prefix = "i" if model is AWSEC2Instance else "db"
+        vpcs = {}
+
+        instances = []
+        for i in range(count):
+            subnet = subnets[i % len(subnets)]
+            vpc = vpcs.get(subnet.aws_vpc_id) or vpcs.setdefault(subnet.aws_vpc_id, subnet.aws_vpc)
+            instance_type = types[i % len(types)]
+            specs = catalog.get(instance_type)
+            instance = model(
+                name=f"{NAME_PREFIX}-{prefix}-{i:06d}",
+                instance_id=f"{prefix}-{i:017x}",
+                aws_account_id=vpc.aws_account_id,
+                region=vpc.region,
+                vpc_id=vpc.pk,
+                subnet=subnet,
+                state="running" if model is AWSEC2Instance else "available",
+                estimated_cost_usd_hourly=get_cost(specs) if specs else None,
+            )
+            setattr(instance, model.catalog_type_field, instance_type)
+            if model is AWSRDSInstance:
+                instance.engine = "postgres"
+            instances.append(instance)
+        return self._bulk_create(model, instances)
@@ -18,11 +18,22 @@ class AWSAccountTable(NetBoxTable):
         model = AWSAccount
         # Fields to display in the table. Add new fields here.
         # 'pk' checkbox and 'actions' buttons are added by NetBoxTable by default.
-        fields = ("pk", "id", "account_id", "name", "tenant", "parent_account", "account_type", "tags", "actions")
+        fields = (
+            "pk",
+            "id",
+            "account_id",
+            "name",
+            "tenant",
+            "parent_account",
+            "account_type",
+            "tags",
+            "last_seen",
+            "actions",
+        )
         default_columns = ("account_id", "name", "tenant", "parent_account", "account_type", "actions")
 
     def render_account_type(self, record):
-        if record.parent_account is None:
+        if record.parent_account_id is None:
             return "Root"
         return "Sub-account"
 
@@ -50,6 +61,7 @@ class AWSVPCTable(NetBoxTable):
             "state",
             "is_default",
             "tags",
+            "last_seen",
             "actions",
         )
         default_columns = ("name", "vpc_id", "aws_account", "region", "cidr_block", "state", "is_default", "actions")
@@ -78,6 +90,7 @@ class AWSSubnetTable(NetBoxTable):
             "state",
             "map_public_ip_on_launch",
             "tags",
+            "last_seen",
             "actions",
         )
         default_columns = (
@@ -133,6 +146,7 @@ class AWSLoadBalancerTable(NetBoxTable):
             "type",
             "scheme",
             "ip_address_type",
+            "last_seen",
             "actions",
         )
         default_columns = ("name", "arn", "aws_account", "region", "vpc", "dns_name", "state", "type")
@@ -162,6 +176,7 @@ class AWSEC2InstanceTable(NetBoxTable):
             "state",
             "estimated_cost_usd_hourly",
             "tags",
+            "last_seen",
             "actions",
         )
         default_columns = (
@@ -205,6 +220,7 @@ class AWSRDSInstanceTable(NetBoxTable):
             "state",
             "estimated_cost_usd_hourly",
             "tags",
+            "last_seen",
             "actions",
         )
         default_columns = (
@@ -235,7 +251,9 @@ class AWSTargetGroupTable(NetBoxTable):
     tags = columns.TagColumn(url_name="plugins:netbox_aws_resources_plugin:awstargetgroup_list")
 
     def render_load_balancers_count(self, record):
-        return record.load_balancers.count()
+        # Use the count annotated by the view's queryset when there is one, to avoid a query per row
+        count = getattr(record, "load_balancer_count", None)
+        return record.load_balancers.count() if count is None else count
 
     class Meta(NetBoxTable.Meta):
         model = AWSTargetGroup
@@ -257,6 +275,7 @@ class AWSTargetGroupTable(NetBoxTable):
             "tags",
             "created",
             "last_updated",
+            "last_seen",
             "actions",
         )
         default_columns = (
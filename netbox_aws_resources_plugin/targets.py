@@ -0,0 +1,265 @@
+"""
+Target group membership.
+
+AWSTarget records which EC2 instances or IP addresses are registered with a target group, and on which port. Syncs
+register and deregister targets in bulk, so rather than saving targets one at a time:
+
+  - parse_targets() resolves a batch of target specifications to (instance pk, IP address, port) keys, looking up
+    every instance in the batch with one query;
+  - register_targets() and deregister_targets() compare the keys with the target group's current membership (one
+    query) and apply only the difference, with one bulk INSERT for the targets added and one DELETE for those
+    removed. With replace=True, register_targets() makes the membership exactly the batch given.
+
+get_routes() answers the reverse question, "which target groups and load balancers route to this instance or IP?",
+with a single query driven by the (instance, target group) or (IP address, target group) index.
+
+Targets are a plain membership table, like the target group's load balancers, so changes to them aren't
+change-logged; they do invalidate the target group's cached data.
+"""
+
+import netaddr
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+
+from .caching import bump_versions
+from .models import AWSEC2Instance, AWSTarget, AWSTargetGroup
+from .signals import get_cache_scopes
+
+# Targets accepted in one request
+MAX_TARGETS = 10000
+
+# Targets per INSERT or DELETE, to keep statements a sensible size
+BATCH_SIZE = 5000
+
+TARGET_TYPE_INSTANCE = "instance"
+TARGET_TYPE_IP = "ip"
+
+
+def get_default_port(target_group):
+    """Return the port of the target group's service, if it has exactly one."""
+    service = target_group.service
+    if service is not None and len(service.ports) == 1:
+        return service.ports[0]
+    return None
+
+
+def _normalize_ip(value):
+    return str(netaddr.IPAddress(str(value).strip()))
+
+
+def parse_targets(target_group, specs, user=None):
+    """
+    Resolve target specifications to a set of (instance pk, IP address, port) keys for `target_group`. Each is a dict
+    of one of "instance" (an AWSEC2Instance ID), "instance_id" (an AWS instance ID) or "ip", and a "port" (default:
+    the target group's service port). Instances must be in the target group's VPC, and visible to `user` if given.
+    Returns (keys, errors), where errors describes each invalid specification.
+    """
+    default_port = get_default_port(target_group)
+    parsed, errors = [], []
+    pks, instance_ids = set(), set()
+    for index, spec in enumerate(specs):
+        if not isinstance(spec, dict):
+            errors.append(f"{index}: Must be an object.")
+            continue
+        given = [key for key in ("instance", "instance_id", "ip") if spec.get(key) not in (None, "")]
+        if len(given) != 1:
+            errors.append(f"{index}: Specify exactly one of instance, instance_id or ip.")
+            continue
+        kind = given[0]
+        value = spec[kind]
+
+        port = spec.get("port", default_port)
+        if port is None:
+            errors.append(f"{index}: A port is required; the target group's service doesn't have a single port.")
+            continue
+        try:
+            port = int(port)
+        except (TypeError, ValueError):
+            port = 0
+        if not 1 <= port <= 65535:
+            errors.append(f"{index}: Invalid port {spec.get('port')}.")
+            continue
+
+        target_type = TARGET_TYPE_IP if kind == "ip" else TARGET_TYPE_INSTANCE
+        if target_group.target_type != target_type:
+            errors.append(f"{index}: This target group takes targets of type {target_group.target_type}.")
+            continue
+        try:
+            if kind == "ip":
+                value = _normalize_ip(value)
+            elif kind == "instance":
+                value = int(value)
+                pks.add(value)
+            else:
+                value = str(value)
+                instance_ids.add(value)
+        except (netaddr.AddrFormatError, TypeError, ValueError):
+            errors.append(f"{index}: Invalid {kind} {value}.")
+            continue
+        parsed.append((index, kind, value, port))
+
+    instances = {}
+    if pks or instance_ids:
+        queryset = AWSEC2Instance.objects.filter(Q(pk__in=pks) | Q(instance_id__in=instance_ids))
+        if user is not None:
+            queryset = queryset.restrict(user, "view")
+        for pk, instance_id, vpc_id in queryset.values_list("pk", "instance_id", "vpc_id"):
+            instances[("instance", pk)] = instances[("instance_id", instance_id)] = (pk, vpc_id)
+
+    keys = set()
+    for index, kind, value, port in parsed:
+        if kind == "ip":
+            keys.add((None, value, port))
+            continue
+        found = instances.get((kind, value))
+        if found is None:
+            errors.append(f"{index}: Instance {value} not found.")
+        elif found[1] != target_group.vpc_id:
+            errors.append(f"{index}: Instance {value} isn't in the target group's VPC.")
+        else:
+            keys.add((found[0], None, port))
+    return keys, errors
+
+
+def _visible_targets(queryset, user):
+    """Leave out instance targets whose instance `user` may not view, if a user is given."""
+    if user is None:
+        return queryset
+    return queryset.filter(Q(instance__isnull=True) | Q(instance__in=AWSEC2Instance.objects.restrict(user, "view")))
+
+
+def get_target_keys(target_group, user=None):
+    """
+    Return {(instance pk, IP address, port): target pk} for a target group's current targets, leaving out instance
+    targets whose instance `user` may not view if given.
+    """
+    rows = _visible_targets(target_group.targets.all(), user).values_list("pk", "instance_id", "ip_address", "port")
+    return {
+        (instance_id, _normalize_ip(ip_address) if ip_address else None, port): pk
+        for pk, instance_id, ip_address, port in rows
+    }
+
+
+def _lock(target_group):
+    # Serialise membership changes to a target group, so concurrent batches each see the other's result
+    list(AWSTargetGroup.objects.select_for_update().filter(pk=target_group.pk).values_list("pk", flat=True))
+
+
+def _delete(pks):
+    for start in range(0, len(pks), BATCH_SIZE):
+        end = start + BATCH_SIZE
+        AWSTarget.objects.filter(pk__in=pks[start:end]).delete()
+
+
+def register_targets(target_group, keys, replace=False, user=None):
+    """
+    Register the targets with the given keys (see parse_targets()) which aren't already registered. With `replace`,
+    also deregister every other target, except instance targets whose instance `user` may not view if given. Returns
+    the number of targets "registered", "deregistered" and "unchanged".
+    """
+    with transaction.atomic():
+        _lock(target_group)
+        existing = get_target_keys(target_group, user)
+        added = keys - existing.keys()
+        removed = [pk for key, pk in existing.items() if key not in keys] if replace else []
+        AWSTarget.objects.bulk_create(
+            [
+                AWSTarget(target_group=target_group, instance_id=instance_id, ip_address=ip_address, port=port)
+                for instance_id, ip_address, port in added
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        _delete(removed)
+    if added or removed:
+        bump_versions(*get_cache_scopes(target_group))
+    return {"registered": len(added), "deregistered": len(removed), "unchanged": len(keys) - len(added)}
+
+
+def deregister_targets(target_group, keys):
+    """
+    Deregister the targets with the given keys (see parse_targets()). Returns the number of targets "deregistered"
+    and "not_registered".
+    """
+    with transaction.atomic():
+        _lock(target_group)
+        existing = get_target_keys(target_group)
+        removed = [existing[key] for key in keys if key in existing]
+        _delete(removed)
+    if removed:
+        bump_versions(*get_cache_scopes(target_group))
+    return {"deregistered": len(removed), "not_registered": len(keys) - len(removed)}
+
+
+def _describe(model_name, pk, **fields):
+    url = reverse(f"plugins:netbox_aws_resources_plugin:{model_name}", kwargs={"pk": pk})
+    return {"id": pk, **fields, "url": url}
+
+
+def get_target_rows(target_group, user=None):
+    """
+    Return a queryset of a target group's targets, with their instances, as values_list() rows for describe_targets().
+    If `user` is given, instance targets whose instance the user may not view are left out.
+    """
+    queryset = _visible_targets(target_group.targets.all(), user)
+    return queryset.order_by("instance__name", "ip_address", "port").values_list(
+        "pk", "instance_id", "instance__name", "instance__instance_id", "ip_address", "port"
+    )
+
+
+def describe_targets(rows):
+    return [
+        {
+            "id": pk,
+            "instance": (
+                _describe("awsec2instance", instance_pk, name=name, instance_id=instance_id) if instance_pk else None
+            ),
+            "ip_address": ip_address,
+            "port": port,
+        }
+        for pk, instance_pk, name, instance_id, ip_address, port in rows
+    ]
+
+
+def list_targets(target_group, limit=None, user=None):
+    """
+    Return a target group's targets (the first `limit`, if given), with their instances, from one query. If `user` is
+    given, instance targets whose instance the user may not view are left out.
+    """
+    return describe_targets(get_target_rows(target_group, user)[:limit])
+
+
+def get_routes(instance=None, ip_address=None, user=None):
+    """
+    Return the target groups an EC2 instance or IP address is registered with, limited to those `user` may view if
+    given, as a list of {"target_group", "port", "load_balancers"}. The targets, their target groups and the load
+    balancers in front of them are fetched with one query.
+    """
+    if instance is not None:
+        targets = AWSTarget.objects.filter(instance=instance)
+    else:
+        targets = AWSTarget.objects.filter(ip_address=_normalize_ip(ip_address))
+    if user is not None:
+        targets = targets.filter(target_group__in=AWSTargetGroup.objects.restrict(user, "view"))
+    rows = targets.order_by("target_group__name", "port", "target_group__load_balancers__name").values_list(
+        "port",
+        "target_group_id",
+        "target_group__name",
+        "target_group__arn",
+        "target_group__load_balancers__pk",
+        "target_group__load_balancers__name",
+        "target_group__load_balancers__arn",
+    )
+
+    routes = {}
+    for port, group_pk, group_name, group_arn, lb_pk, lb_name, lb_arn in rows:
+        route = routes.get((group_pk, port))
+        if route is None:
+            route = routes[(group_pk, port)] = {
+                "target_group": _describe("awstargetgroup", group_pk, name=group_name, arn=group_arn),
+                "port": port,
+                "load_balancers": [],
+            }
+        if lb_pk is not None:
+            route["load_balancers"].append(_describe("awsloadbalancer", lb_pk, name=lb_name, arn=lb_arn))
+    return list(routes.values())
@@ -0,0 +1,191 @@
+"""
+Node/edge topology graphs for an AWS account, VPC or region.
+
+A graph is built from a fixed set of flat `values()` queries (one per model plus one per many-to-many relation),
+regardless of how many objects it contains, and is cached until anything inside it changes.
+"""
+
+from collections import defaultdict
+
+from .caching import account_scope, get_or_build, region_scope, vpc_scope
+from .models import AWSVPC, AWSAccount, AWSEC2Instance, AWSLoadBalancer, AWSRDSInstance, AWSSubnet, AWSTargetGroup
+
+TOPOLOGY_MODELS = (AWSAccount, AWSVPC, AWSSubnet, AWSLoadBalancer, AWSTargetGroup, AWSEC2Instance, AWSRDSInstance)
+
+
+def node_id(model, pk):
+    return f"{model._meta.model_name}:{pk}"
+
+
+class TopologyBuilder:
+    """Accumulates the nodes and edges of a topology graph."""
+
+    def __init__(self):
+        self.nodes = {}
+        self.edges = []
+
+    def add_node(self, model, pk, label, **attrs):
+        nid = node_id(model, pk)
+        self.nodes[nid] = {"id": nid, "type": model._meta.model_name, "pk": pk, "label": label, **attrs}
+        return nid
+
+    def add_edge(self, source, target, relation):
+        if source in self.nodes and target in self.nodes:
+            self.edges.append({"source": source, "target": target, "relation": relation})
+
+    def as_dict(self):
+        return {"nodes": list(self.nodes.values()), "edges": self.edges}
+
+
+def _build(vpcs, accounts):
+    """
+    Build the graph for the given VPC and account querysets. Everything attached to the VPCs (subnets, load
+    balancers, target groups and instances) is pulled in.
+    """
+    graph = TopologyBuilder()
+
+    for pk, account_id, name in accounts.values_list("pk", "account_id", "name"):
+        graph.add_node(AWSAccount, pk, name or account_id, account_id=account_id)
+
+    vpc_pks = []
+    for pk, name, vpc_id, account_pk, region, state in vpcs.values_list(
+        "pk", "name", "vpc_id", "aws_account_id", "region", "state"
+    ):
+        vpc_pks.append(pk)
+        nid = graph.add_node(AWSVPC, pk, name or vpc_id, vpc_id=vpc_id, region=region, state=state)
+        graph.add_edge(node_id(AWSAccount, account_pk), nid, "contains")
+
+    for pk, name, subnet_id, vpc_pk, az, prefix, state in AWSSubnet.objects.filter(aws_vpc__in=vpc_pks).values_list(
+        "pk", "name", "subnet_id", "aws_vpc_id", "availability_zone", "cidr_block__prefix", "state"
+    ):
+        nid = graph.add_node(
+            AWSSubnet,
+            pk,
+            name or subnet_id,
+            subnet_id=subnet_id,
+            availability_zone=az,
+            cidr_block=str(prefix) if prefix else None,
+            state=state,
+        )
+        graph.add_edge(node_id(AWSVPC, vpc_pk), nid, "contains")
+
+    lb_pks = []
+    for pk, name, vpc_pk, lb_type, scheme, dns_name, state in AWSLoadBalancer.objects.filter(
+        vpc__in=vpc_pks
+    ).values_list("pk", "name", "vpc_id", "type", "scheme", "dns_name", "state"):
+        lb_pks.append(pk)
+        nid = graph.add_node(AWSLoadBalancer, pk, name, lb_type=lb_type, scheme=scheme, dns_name=dns_name, state=state)
+        graph.add_edge(node_id(AWSVPC, vpc_pk), nid, "contains")
+
+    for lb_pk, subnet_pk in AWSLoadBalancer.subnets.through.objects.filter(awsloadbalancer__in=lb_pks).values_list(
+        "awsloadbalancer_id", "awssubnet_id"
+    ):
+        graph.add_edge(node_id(AWSLoadBalancer, lb_pk), node_id(AWSSubnet, subnet_pk), "attached_to")
+
+    tg_pks = []
+    for pk, name, vpc_pk, target_type, state in AWSTargetGroup.objects.filter(vpc__in=vpc_pks).values_list(
+        "pk", "name", "vpc_id", "target_type", "state"
+    ):
+        tg_pks.append(pk)
+        nid = graph.add_node(AWSTargetGroup, pk, name, target_type=target_type, state=state)
+        graph.add_edge(node_id(AWSVPC, vpc_pk), nid, "contains")
+
+    for tg_pk, lb_pk in AWSTargetGroup.load_balancers.through.objects.filter(awstargetgroup__in=tg_pks).values_list(
+        "awstargetgroup_id", "awsloadbalancer_id"
+    ):
+        graph.add_edge(node_id(AWSLoadBalancer, lb_pk), node_id(AWSTargetGroup, tg_pk), "routes_to")
+
+    for model, type_field in ((AWSEC2Instance, "instance_type"), (AWSRDSInstance, "instance_class")):
+        for pk, name, instance_id, vpc_pk, subnet_pk, instance_type, state in model.objects.filter(
+            vpc__in=vpc_pks
+        ).values_list("pk", "name", "instance_id", "vpc_id", "subnet_id", type_field, "state"):
+            nid = graph.add_node(
+                model, pk, name or instance_id, instance_id=instance_id, instance_type=instance_type, state=state
+            )
+            if subnet_pk:
+                graph.add_edge(node_id(AWSSubnet, subnet_pk), nid, "contains")
+            else:
+                graph.add_edge(node_id(AWSVPC, vpc_pk), nid, "contains")
+
+    return graph.as_dict()
+
+
+def get_account_topology(account):
+    return get_or_build(
+        "topology",
+        [account_scope(account.pk)],
+        lambda: _build(
+            AWSVPC.objects.filter(aws_account=account),
+            AWSAccount.objects.filter(pk=account.pk),
+        ),
+    )
+
+
+def get_vpc_topology(vpc):
+    return get_or_build(
+        "topology",
+        [vpc_scope(vpc.pk)],
+        lambda: _build(
+            AWSVPC.objects.filter(pk=vpc.pk),
+            AWSAccount.objects.filter(pk=vpc.aws_account_id),
+        ),
+    )
+
+
+def get_region_topology(region):
+    return get_or_build(
+        "topology",
+        [region_scope(region)],
+        lambda: _build(
+            AWSVPC.objects.filter(region=region),
+            AWSAccount.objects.filter(vpcs__region=region).distinct(),
+        ),
+    )
+
+
+def restrict_topology(graph, user):
+    """
+    Drop the nodes (and their edges) which `user` isn't permitted to view. Cached graphs are built without
+    permission constraints, so this is applied on the way out; it costs at most one query per model.
+    """
+    if user.is_superuser:
+        return graph
+
+    visible = set()
+    for model in TOPOLOGY_MODELS:
+        model_name = model._meta.model_name
+        pks = [node["pk"] for node in graph["nodes"] if node["type"] == model_name]
+        if not pks:
+            continue
+        allowed = model.objects.restrict(user, "view").filter(pk__in=pks).values_list("pk", flat=True)
+        visible.update(node_id(model, pk) for pk in allowed)
+
+    return {
+        "nodes": [node for node in graph["nodes"] if node["id"] in visible],
+        "edges": [edge for edge in graph["edges"] if edge["source"] in visible and edge["target"] in visible],
+    }
+
+
+def get_tree_rows(graph):
+    """
+    Flatten a graph into depth-first rows following its "contains" edges, for rendering as an indented tree. Other
+    relations (e.g. a load balancer's subnets) are attached to the row of their source node.
+    """
+    nodes = {node["id"]: node for node in graph["nodes"]}
+    children = defaultdict(list)
+    related = defaultdict(list)
+    contained = set()
+    for edge in graph["edges"]:
+        if edge["relation"] == "contains":
+            children[edge["source"]].append(edge["target"])
+            contained.add(edge["target"])
+        else:
+            related[edge["source"]].append({"relation": edge["relation"], "node": nodes[edge["target"]]})
+
+    rows = []
+    stack = [(nid, 0) for nid in reversed(list(nodes)) if nid not in contained]
+    while stack:
+        nid, depth = stack.pop()
+        rows.append({**nodes[nid], "depth": depth, "related": related.get(nid, [])})
+        stack.extend((child, depth + 1) for child in reversed(children.get(nid, [])))
+    return rows
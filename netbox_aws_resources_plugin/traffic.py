@@ -0,0 +1,266 @@
+"""
+Traffic paths from load balancers to the targets behind them.
+
+resolve_paths() takes load balancer DNS names or ARNs and returns each load balancer's full chain: the target groups
+it routes to, the targets registered with them, and each target's subnet and VPC. The chains of any number of load
+balancers are built together from a fixed set of flat values() queries (load balancers, target group attachments,
+targets, subnets and VPCs), and each is cached under its load balancer's VPC scope. AWS keeps a load balancer's
+target groups, and their instance targets, in the load balancer's VPC, so any change along the chain bumps that
+scope (see signals.py and targets.py).
+
+Like topology graphs, cached chains are built without permission constraints and restricted to what the user may
+view on the way out, with at most one query per model. Account details are attached on the way out too, so renaming
+an account doesn't need to invalidate every chain in it.
+
+Instance targets are placed in their instance's subnet. IP targets are placed in the subnet of the target group's
+VPC whose CIDR block contains the address; addresses outside that VPC (in a peered VPC, or on premises) have none.
+"""
+
+import netaddr
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.urls import reverse
+
+from .caching import get_or_build_many, vpc_scope
+from .ip_lookup import PrefixIndex
+from .models import AWSVPC, AWSAccount, AWSEC2Instance, AWSLoadBalancer, AWSSubnet, AWSTarget, AWSTargetGroup
+
+# DNS names and ARNs accepted in one request
+MAX_PATHS = 1000
+
+RESTRICTED_MODELS = (AWSTargetGroup, AWSEC2Instance, AWSSubnet, AWSVPC)
+
+
+def normalize_dns_name(value):
+    """Lower-case a DNS name and drop any trailing dot and "dualstack." prefix, as AWS hands out both forms."""
+    return value.strip().lower().rstrip(".").removeprefix("dualstack.")
+
+
+def _is_arn(value):
+    return value.startswith("arn:")
+
+
+def find_load_balancers(values, user=None):
+    """
+    Match DNS names and ARNs to load balancers, limited to those `user` may view if given. Returns {value: (load
+    balancer pk, VPC pk)}, omitting values which match nothing.
+    """
+    arns = {value.strip() for value in values if _is_arn(value.strip())}
+    names = {normalize_dns_name(value) for value in values if not _is_arn(value.strip())}
+    queryset = AWSLoadBalancer.objects.annotate(dns_name_lower=Lower("dns_name")).filter(
+        Q(arn__in=arns) | Q(dns_name_lower__in=names)
+    )
+    if user is not None:
+        queryset = queryset.restrict(user, "view")
+
+    found = {}
+    for pk, arn, dns_name, vpc_pk in queryset.values_list("pk", "arn", "dns_name", "vpc_id"):
+        found[arn] = (pk, vpc_pk)
+        if dns_name:
+            found[normalize_dns_name(dns_name)] = (pk, vpc_pk)
+    matches = {}
+    for value in values:
+        key = value.strip() if _is_arn(value.strip()) else normalize_dns_name(value)
+        if key in found:
+            matches[value] = found[key]
+    return matches
+
+
+def _build_paths(lb_pks):
+    """Build the chains of the given load balancers, returning {load balancer pk: chain}."""
+    paths = {}
+    vpc_pks = set()
+    for pk, name, arn, dns_name, lb_type, scheme, state, vpc_pk in AWSLoadBalancer.objects.filter(
+        pk__in=lb_pks
+    ).values_list("pk", "name", "arn", "dns_name", "type", "scheme", "state", "vpc_id"):
+        paths[pk] = {
+            "id": pk,
+            "name": name,
+            "arn": arn,
+            "dns_name": dns_name,
+            "type": lb_type,
+            "scheme": scheme,
+            "state": state,
+            "vpc": vpc_pk,
+            "target_groups": [],
+        }
+        vpc_pks.add(vpc_pk)
+
+    target_groups, group_vpcs = {}, {}
+    attachments = AWSTargetGroup.load_balancers.through.objects.filter(awsloadbalancer__in=lb_pks)
+    for lb_pk, pk, name, arn, target_type, vpc_pk in attachments.order_by("awstargetgroup__name").values_list(
+        "awsloadbalancer_id",
+        "awstargetgroup_id",
+        "awstargetgroup__name",
+        "awstargetgroup__arn",
+        "awstargetgroup__target_type",
+        "awstargetgroup__vpc_id",
+    ):
+        if pk not in target_groups:
+            target_groups[pk] = {"id": pk, "name": name, "arn": arn, "target_type": target_type, "targets": []}
+            group_vpcs[pk] = vpc_pk
+        paths[lb_pk]["target_groups"].append(target_groups[pk])
+
+    subnet_pks, ip_targets = set(), []
+    targets = AWSTarget.objects.filter(target_group__in=list(target_groups)).order_by(
+        "instance__name", "ip_address", "port"
+    )
+    for group_pk, instance_pk, name, instance_id, state, vpc_pk, subnet_pk, ip_address, port in targets.values_list(
+        "target_group_id",
+        "instance_id",
+        "instance__name",
+        "instance__instance_id",
+        "instance__state",
+        "instance__vpc_id",
+        "instance__subnet_id",
+        "ip_address",
+        "port",
+    ):
+        target = {"instance": None, "ip_address": ip_address, "port": port, "subnet": subnet_pk, "vpc": vpc_pk}
+        if instance_pk:
+            target["instance"] = {"id": instance_pk, "name": name, "instance_id": instance_id, "state": state}
+            if subnet_pk:
+                subnet_pks.add(subnet_pk)
+        else:
+            target["vpc"] = group_vpcs[group_pk]
+            ip_targets.append(target)
+        target_groups[group_pk]["targets"].append(target)
+
+    # IP targets are matched against the subnets of their target group's VPC
+    ip_vpcs = {target["vpc"] for target in ip_targets}
+    subnets, indexes = {}, {}
+    for pk, name, subnet_id, vpc_pk, zone, prefix in AWSSubnet.objects.filter(
+        Q(pk__in=subnet_pks) | Q(aws_vpc__in=ip_vpcs)
+    ).values_list("pk", "name", "subnet_id", "aws_vpc_id", "availability_zone", "cidr_block__prefix"):
+        subnets[pk] = {
+            "id": pk,
+            "name": name,
+            "subnet_id": subnet_id,
+            "availability_zone": zone,
+            "cidr_block": str(prefix) if prefix else None,
+        }
+        if prefix and vpc_pk in ip_vpcs:
+            indexes.setdefault(vpc_pk, PrefixIndex()).add(pk, netaddr.IPNetwork(prefix))
+    for target in ip_targets:
+        index = indexes.get(target["vpc"])
+        matched = index.match(netaddr.IPAddress(target["ip_address"])) if index else []
+        target["subnet"] = matched[0] if matched else None
+
+    all_targets = [target for group in target_groups.values() for target in group["targets"]]
+    vpc_pks.update(target["vpc"] for target in all_targets)
+    vpcs = {}
+    for pk, name, vpc_id, region, prefix, account_pk in AWSVPC.objects.filter(pk__in=vpc_pks).values_list(
+        "pk", "name", "vpc_id", "region", "cidr_block__prefix", "aws_account_id"
+    ):
+        vpcs[pk] = {
+            "id": pk,
+            "name": name,
+            "vpc_id": vpc_id,
+            "region": region,
+            "cidr_block": str(prefix) if prefix else None,
+            "aws_account": account_pk,
+        }
+    for target in all_targets:
+        target["subnet"] = subnets.get(target["subnet"])
+        target["vpc"] = vpcs.get(target["vpc"])
+    for path in paths.values():
+        path["vpc"] = vpcs.get(path["vpc"])
+    return paths
+
+
+def _url(model, pk):
+    return reverse(f"plugins:netbox_aws_resources_plugin:{model._meta.model_name}", kwargs={"pk": pk})
+
+
+def _finish(paths, user=None):
+    """
+    Return copies of cached chains with URLs and account details attached, and without the objects `user` may not
+    view. Targets whose instance or target groups the user may not view are dropped; a subnet or VPC the user may
+    not view is replaced by None.
+    """
+    pks = {model: set() for model in RESTRICTED_MODELS}
+    account_pks = set()
+    for path in paths:
+        vpcs = [path["vpc"]]
+        for group in path["target_groups"]:
+            pks[AWSTargetGroup].add(group["id"])
+            for target in group["targets"]:
+                if target["instance"]:
+                    pks[AWSEC2Instance].add(target["instance"]["id"])
+                if target["subnet"]:
+                    pks[AWSSubnet].add(target["subnet"]["id"])
+                vpcs.append(target["vpc"])
+        for vpc in filter(None, vpcs):
+            pks[AWSVPC].add(vpc["id"])
+            account_pks.add(vpc["aws_account"])
+
+    if user is not None and not user.is_superuser:
+        for model, model_pks in pks.items():
+            if model_pks:
+                allowed = model.objects.restrict(user, "view").filter(pk__in=model_pks).values_list("pk", flat=True)
+                pks[model] = set(allowed)
+    accounts = AWSAccount.objects.filter(pk__in=account_pks)
+    if user is not None:
+        accounts = accounts.restrict(user, "view")
+    accounts = {
+        pk: {"id": pk, "name": name, "account_id": account_id, "url": _url(AWSAccount, pk)}
+        for pk, name, account_id in accounts.values_list("pk", "name", "account_id")
+    }
+
+    def visible(model, obj):
+        if obj is None or obj["id"] not in pks[model]:
+            return None
+        return {**obj, "url": _url(model, obj["id"])}
+
+    def finish_vpc(vpc):
+        vpc = visible(AWSVPC, vpc)
+        if vpc is not None:
+            vpc["aws_account"] = accounts.get(vpc["aws_account"])
+        return vpc
+
+    def finish_target(target):
+        return {
+            **target,
+            "instance": visible(AWSEC2Instance, target["instance"]),
+            "subnet": visible(AWSSubnet, target["subnet"]),
+            "vpc": finish_vpc(target["vpc"]),
+        }
+
+    return [
+        {
+            **path,
+            "url": _url(AWSLoadBalancer, path["id"]),
+            "vpc": finish_vpc(path["vpc"]),
+            "target_groups": [
+                {
+                    **group,
+                    "url": _url(AWSTargetGroup, group["id"]),
+                    "targets": [
+                        finish_target(target)
+                        for target in group["targets"]
+                        if target["instance"] is None or target["instance"]["id"] in pks[AWSEC2Instance]
+                    ],
+                }
+                for group in path["target_groups"]
+                if group["id"] in pks[AWSTargetGroup]
+            ],
+        }
+        for path in paths
+    ]
+
+
+def resolve_paths(values, user=None):
+    """
+    Resolve load balancer DNS names or ARNs to their traffic paths, limited to the objects `user` may view if given.
+    Returns a list of {"query", "load_balancer"} in the order given, where load_balancer holds the load balancer's
+    chain (its VPC and target groups, and the targets of each with their subnet and VPC), or None if nothing matched.
+    """
+    matches = find_load_balancers(values, user)
+    scopes = {pk: [vpc_scope(vpc_pk)] for pk, vpc_pk in matches.values()}
+    paths = get_or_build_many("traffic-path", scopes, _build_paths)
+    lb_pks = list(paths)
+    finished = dict(zip(lb_pks, _finish([paths[pk] for pk in lb_pks], user)))
+    return [
+        {"query": value, "load_balancer": finished.get(matches[value][0]) if value in matches else None}
+        for value in values
+    ]
@@ -16,11 +16,16 @@ urlpatterns = [
         name="awsaccount_changelog",
         kwargs={"model": models.AWSAccount},
     ),
+    path("aws-accounts/<int:pk>/topology/", views.AWSAccountTopologyView.as_view(), name="awsaccount_topology"),
+    path(
+        "aws-accounts/<int:pk>/decommission/",
+        views.AWSAccountDecommissionView.as_view(),
+        name="awsaccount_decommission",
+    ),
     # AWS Accounts - Bulk Operations
     path("aws-accounts/edit/", views.AWSAccountBulkEditView.as_view(), name="awsaccount_bulk_edit"),
     path("aws-accounts/delete/", views.AWSAccountBulkDeleteView.as_view(), name="awsaccount_bulk_delete"),
-    # If you add bulk import later:
-    # path('aws-accounts/import/', views.AWSAccountBulkImportView.as_view(), name='awsaccount_import'),
+    path("aws-accounts/import/", views.AWSAccountBulkImportView.as_view(), name="awsaccount_import"),
     # AWS VPCs - List, Add, Individual View, Edit, Delete
     path("aws-vpcs/", views.AWSVPCListView.as_view(), name="awsvpc_list"),
     path("aws-vpcs/add/", views.AWSVPCEditView.as_view(), name="awsvpc_add"),
@@ -33,11 +38,12 @@ urlpatterns = [
         name="awsvpc_changelog",
         kwargs={"model": models.AWSVPC},
     ),
+    path("aws-vpcs/<int:pk>/topology/", views.AWSVPCTopologyView.as_view(), name="awsvpc_topology"),
+    path("aws-vpcs/<int:pk>/decommission/", views.AWSVPCDecommissionView.as_view(), name="awsvpc_decommission"),
     # AWS VPCs - Bulk Operations
     path("aws-vpcs/edit/", views.AWSVPCBulkEditView.as_view(), name="awsvpc_bulk_edit"),
     path("aws-vpcs/delete/", views.AWSVPCBulkDeleteView.as_view(), name="awsvpc_bulk_delete"),
-    # If you add bulk import later for VPCs:
-    # path('aws-vpcs/import/', views.AWSVPCBulkImportView.as_view(), name='awsvpc_import'),
+    path("aws-vpcs/import/", views.AWSVPCBulkImportView.as_view(), name="awsvpc_import"),
     # AWS Subnets - List, Add, Individual View, Edit, Delete
     path("aws-subnets/", views.AWSSubnetListView.as_view(), name="awssubnet_list"),
     path("aws-subnets/add/", views.AWSSubnetEditView.as_view(), name="awssubnet_add"),
@@ -53,8 +59,7 @@ urlpatterns = [
     # AWS Subnets - Bulk Operations
     path("aws-subnets/edit/", views.AWSSubnetBulkEditView.as_view(), name="awssubnet_bulk_edit"),
     path("aws-subnets/delete/", views.AWSSubnetBulkDeleteView.as_view(), name="awssubnet_bulk_delete"),
-    # If you add bulk import later for Subnets:
-    # path('aws-subnets/import/', views.AWSSubnetBulkImportView.as_view(), name='awssubnet_import'),
+    path("aws-subnets/import/", views.AWSSubnetBulkImportView.as_view(), name="awssubnet_import"),
     # AWS Load Balancers - List, Add, Individual View, Edit, Delete
     path("aws-load-balancers/", views.AWSLoadBalancerListView.as_view(), name="awsloadbalancer_list"),
     path("aws-load-balancers/add/", views.AWSLoadBalancerEditView.as_view(), name="awsloadbalancer_add"),
@@ -74,8 +79,7 @@ urlpatterns = [
     path(
         "aws-load-balancers/delete/", views.AWSLoadBalancerBulkDeleteView.as_view(), name="awsloadbalancer_bulk_delete"
     ),
-    # If you add bulk import later for Load Balancers:
-    # path('aws-load-balancers/import/', views.AWSLoadBalancerBulkImportView.as_view(), name='awsloadbalancer_import'),
+    path("aws-load-balancers/import/", views.AWSLoadBalancerBulkImportView.as_view(), name="awsloadbalancer_import"),
     # AWS Target Groups - List, Add, Individual View, Edit, Delete
     path("aws-target-groups/", views.AWSTargetGroupListView.as_view(), name="awstargetgroup_list"),
     path("aws-target-groups/add/", views.AWSTargetGroupEditView.as_view(), name="awstargetgroup_add"),
@@ -91,8 +95,7 @@ urlpatterns = [
     # AWS Target Groups - Bulk Operations
     path("aws-target-groups/edit/", views.AWSTargetGroupBulkEditView.as_view(), name="awstargetgroup_bulk_edit"),
     path("aws-target-groups/delete/", views.AWSTargetGroupBulkDeleteView.as_view(), name="awstargetgroup_bulk_delete"),
-    # If you add bulk import later for Target Groups:
-    # path('aws-target-groups/import/', views.AWSTargetGroupBulkImportView.as_view(), name='awstargetgroup_import'),
+    path("aws-target-groups/import/", views.AWSTargetGroupBulkImportView.as_view(), name="awstargetgroup_import"),
     # AWS EC2 Instances - List, Add, Individual View, Edit, Delete
     path("aws-ec2-instances/", views.AWSEC2InstanceListView.as_view(), name="awsec2instance_list"),
     path("aws-ec2-instances/add/", views.AWSEC2InstanceEditView.as_view(), name="awsec2instance_add"),
@@ -108,6 +111,7 @@ urlpatterns = [
     # AWS EC2 Instances - Bulk Operations
     path("aws-ec2-instances/edit/", views.AWSEC2InstanceBulkEditView.as_view(), name="awsec2instance_bulk_edit"),
     path("aws-ec2-instances/delete/", views.AWSEC2InstanceBulkDeleteView.as_view(), name="awsec2instance_bulk_delete"),
+    path("aws-ec2-instances/import/", views.AWSEC2InstanceBulkImportView.as_view(), name="awsec2instance_import"),
     # AWS RDS Instances - List, Add, Individual View, Edit, Delete
     path("aws-rds-instances/", views.AWSRDSInstanceListView.as_view(), name="awsrdsinstance_list"),
     path("aws-rds-instances/add/", views.AWSRDSInstanceEditView.as_view(), name="awsrdsinstance_add"),
@@ -123,4 +127,10 @@ urlpatterns = [
     # AWS RDS Instances - Bulk Operations
     path("aws-rds-instances/edit/", views.AWSRDSInstanceBulkEditView.as_view(), name="awsrdsinstance_bulk_edit"),
     path("aws-rds-instances/delete/", views.AWSRDSInstanceBulkDeleteView.as_view(), name="awsrdsinstance_bulk_delete"),
+    path("aws-rds-instances/import/", views.AWSRDSInstanceBulkImportView.as_view(), name="awsrdsinstance_import"),
+    # Background jobs
+    path("background-jobs/", views.AWSBackgroundJobsView.as_view(), name="background_jobs"),
+    path("integrity-audit/", views.AWSIntegrityAuditView.as_view(), name="integrity_audit"),
+    path("ip-lookup/", views.AWSIPLookupView.as_view(), name="ip_lookup"),
+    path("rightsizing/", views.AWSRightsizingView.as_view(), name="rightsizing"),
 ]
@@ -1,44 +1,177 @@
+from abc import ABC, abstractmethod
+
+from core.models import Job
+from django.contrib import messages
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect, render
+from django.views.generic import View
 from netbox.views import generic
+from utilities.views import ContentTypePermissionRequiredMixin, ViewTab, register_model_view
 from ipam.tables import IPAddressTable  # noqa # type: ignore
 from ipam.models import IPAddress  # noqa # type: ignore
 
-from . import filtersets, forms, models, tables
+from . import (
+    audit,
+    bulk_edit,
+    decommission,
+    filtersets,
+    forms,
+    ip_lookup,
+    jobs,
+    models,
+    rightsizing,
+    summaries,
+    tables,
+    targets,
+    topology,
+)
+from .forms.fields import prefetch_natural_keys
 
+# Targets listed on a target group's page; the API pages through them all
+TARGETS_SHOWN = 100
 
-class AWSAccountView(generic.ObjectView):
-    queryset = models.AWSAccount.objects.prefetch_related("tags", "child_accounts")
+
+class AWSTopologyView(generic.ObjectView, ABC):
+    """Base view rendering an object's topology graph as an indented tree."""
+
+    template_name = "netbox_aws_resources_plugin/topology.html"
+
+    @abstractmethod
+    def get_topology(self, instance):
+        """Return the object's topology graph, built without permission constraints (see topology.py)."""
+
+    def get_extra_context(self, request, instance):
+        graph = topology.restrict_topology(self.get_topology(instance), request.user)
+        return {
+            "topology_rows": topology.get_tree_rows(graph),
+            "node_count": len(graph["nodes"]),
+            "edge_count": len(graph["edges"]),
+        }
+
+
+class AWSDecommissionView(generic.ObjectView):
+    """
+    Preview what decommissioning an account or VPC would delete (GET), and queue the job which deletes it, or a dry
+    run of it (POST).
+    """
+
+    template_name = "netbox_aws_resources_plugin/decommission.html"
 
     def get_extra_context(self, request, instance):
-        # Child Accounts Table
-        child_accounts = instance.child_accounts.all()
-        child_accounts_table = tables.AWSAccountTable(child_accounts, user=request.user, exclude=("parent_account",))
-        child_accounts_table.configure(request)
-
-        # Related VPCs Table
-        vpcs = instance.vpcs.all().select_related("aws_account", "region", "cidr_block")
-        aws_vpc_table = tables.AWSVPCTable(vpcs, user=request.user, exclude=("aws_account",))
-        aws_vpc_table.configure(request)
-
-        # Related Load Balancers Table (assuming related_name='load_balancers' on AWSLoadBalancer model for AWSAccount)
-        # If the related_name is different, this line will need adjustment.
-        # For example, if AWSLoadBalancer.aws_account has related_name="account_load_balancers"
-        load_balancers = models.AWSLoadBalancer.objects.filter(aws_account=instance).select_related(
-            "aws_account", "region", "vpc"
+        undeletable = decommission.get_undeletable(decommission.get_subtree(instance), request.user)
+        return {
+            "plan": decommission.get_plan(instance, release_prefixes=True),
+            "undeletable": undeletable,
+            "can_decommission": request.user.has_perms(decommission.get_required_permissions()) and not undeletable,
+        }
+
+    def post(self, request, **kwargs):
+        instance = get_object_or_404(self.queryset.restrict(request.user, "delete"), **kwargs)
+        release_prefixes = request.POST.get("release_prefixes") == "on"
+        if not request.user.has_perms(decommission.get_required_permissions(release_prefixes)) or (
+            decommission.get_undeletable(decommission.get_subtree(instance), request.user, release_prefixes)
+        ):
+            messages.error(request, f"You don't have permission to decommission {instance}.")
+            return redirect(request.path)
+
+        dry_run = "_dry_run" in request.POST
+        job = jobs.DecommissionJob.enqueue(
+            user=request.user,
+            model_name=instance._meta.model_name,
+            pk=instance.pk,
+            dry_run=dry_run,
+            release_prefixes=release_prefixes,
         )
-        aws_load_balancer_table = tables.AWSLoadBalancerTable(
-            load_balancers, user=request.user, exclude=("aws_account",)
+        messages.success(request, f"Queued {'a dry run of ' if dry_run else ''}decommissioning {instance}.")
+        return redirect(job.get_absolute_url())
+
+
+class NaturalKeyBulkImportView(generic.BulkImportView):
+    """
+    BulkImportView which resolves parent references (account ID, VPC ID, subnet ID, ARN, prefix) for the whole
+    import up front, so the number of lookup queries doesn't grow with the number of rows.
+    """
+
+    def create_and_update_objects(self, form, request):
+        with prefetch_natural_keys(self.model_form, form.cleaned_data["data"]):
+            return super().create_and_update_objects(form, request)
+
+
+class InstanceBulkEditView(generic.BulkEditView):
+    """
+    BulkEditView for EC2/RDS instances which writes only the changed fields, a batch at a time, and only re-enriches
+    instances when their type/class changed (see bulk_edit.py), instead of saving each instance.
+    """
+
+    def _update_objects(self, form, request):
+        model = self.queryset.model
+        custom_fields = getattr(form, "custom_fields", {})
+        nullified_fields = request.POST.getlist("_nullify")
+
+        changes = {}
+        for name in form.fields:
+            if name in ("pk", "add_tags", "remove_tags") or name in custom_fields:
+                continue
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                # Form fields such as changelog_message modify the edit rather than setting a field
+                continue
+            if name in form.nullable_fields and name in nullified_fields:
+                changes[name] = None if field.null else ""
+            elif name in form.changed_data:
+                changes[name] = form.cleaned_data[name]
+
+        custom_field_changes = {}
+        for name, custom_field in custom_fields.items():
+            if name in form.nullable_fields and name in nullified_fields:
+                custom_field_changes[name[3:]] = None
+            elif name in form.changed_data:
+                custom_field_changes[name[3:]] = custom_field.serialize(form.cleaned_data[name])
+
+        return bulk_edit.bulk_edit_instances(
+            self.queryset,
+            list(form.cleaned_data["pk"].values_list("pk", flat=True)),
+            changes,
+            custom_field_changes,
+            add_tags=form.cleaned_data.get("add_tags"),
+            remove_tags=form.cleaned_data.get("remove_tags"),
+            request=request,
+            changelog_message=form.cleaned_data.get("changelog_message"),
         )
-        aws_load_balancer_table.configure(request)
 
+
+class AWSAccountView(generic.ObjectView):
+    queryset = models.AWSAccount.objects.select_related("tenant", "parent_account").prefetch_related("tags")
+
+    def get_extra_context(self, request, instance):
+        # Related objects are rendered as paginated tables loaded over HTMX (see awsaccount.html), so the page itself
+        # only needs the cached summary counts. The tables aren't cached: each is one page of a list view, filtered,
+        # sorted and restricted for the user viewing it.
         return {
-            "child_accounts_table": child_accounts_table,
-            "aws_vpc_table": aws_vpc_table,
-            "aws_load_balancer_table": aws_load_balancer_table,
+            "summary": summaries.get_account_summary(instance),
         }
 
 
-class AWSAccountListView(generic.ObjectListView):
+@register_model_view(models.AWSAccount, "topology")
+class AWSAccountTopologyView(AWSTopologyView):
     queryset = models.AWSAccount.objects.all()
+    tab = ViewTab(label="Topology", permission="netbox_aws_resources_plugin.view_awsaccount", weight=1100)
+
+    def get_topology(self, instance):
+        return topology.get_account_topology(instance)
+
+
+@register_model_view(models.AWSAccount, "decommission")
+class AWSAccountDecommissionView(AWSDecommissionView):
+    queryset = models.AWSAccount.objects.all()
+    tab = ViewTab(label="Decommission", permission="netbox_aws_resources_plugin.delete_awsaccount", weight=1200)
+
+
+class AWSAccountListView(generic.ObjectListView):
+    queryset = models.AWSAccount.objects.select_related("tenant", "parent_account")
     table = tables.AWSAccountTable
     filterset = filtersets.AWSAccountFilterSet
     filterset_form = forms.AWSAccountFilterForm
@@ -66,6 +199,11 @@ class AWSAccountBulkDeleteView(generic.BulkDeleteView):
     table = tables.AWSAccountTable
 
 
+class AWSAccountBulkImportView(NaturalKeyBulkImportView):
+    queryset = models.AWSAccount.objects.all()
+    model_form = forms.AWSAccountImportForm
+
+
 # Views for AWSVPC
 
 
@@ -92,9 +230,25 @@ class AWSVPCView(generic.ObjectView):
         return {
             "awssubnet_table": awssubnet_table,
             "awsloadbalancer_table": load_balancers_table,
+            "summary": summaries.get_vpc_summary(instance),
         }
 
 
+@register_model_view(models.AWSVPC, "topology")
+class AWSVPCTopologyView(AWSTopologyView):
+    queryset = models.AWSVPC.objects.all()
+    tab = ViewTab(label="Topology", permission="netbox_aws_resources_plugin.view_awsvpc", weight=1100)
+
+    def get_topology(self, instance):
+        return topology.get_vpc_topology(instance)
+
+
+@register_model_view(models.AWSVPC, "decommission")
+class AWSVPCDecommissionView(AWSDecommissionView):
+    queryset = models.AWSVPC.objects.all()
+    tab = ViewTab(label="Decommission", permission="netbox_aws_resources_plugin.delete_awsvpc", weight=1200)
+
+
 class AWSVPCListView(generic.ObjectListView):
     queryset = models.AWSVPC.objects.select_related("aws_account", "cidr_block")
     table = tables.AWSVPCTable
@@ -114,7 +268,7 @@ class AWSVPCDeleteView(generic.ObjectDeleteView):
 
 
 class AWSVPCBulkEditView(generic.BulkEditView):
-    queryset = models.AWSVPC.objects.select_related("aws_account", "region", "cidr_block")
+    queryset = models.AWSVPC.objects.select_related("aws_account", "cidr_block")
     filterset = filtersets.AWSVPCFilterSet
     table = tables.AWSVPCTable
     form = forms.AWSVPCBulkEditForm
@@ -125,6 +279,11 @@ class AWSVPCBulkDeleteView(generic.BulkDeleteView):
     table = tables.AWSVPCTable
 
 
+class AWSVPCBulkImportView(NaturalKeyBulkImportView):
+    queryset = models.AWSVPC.objects.all()
+    model_form = forms.AWSVPCImportForm
+
+
 #
 # Views for AWSEC2Instance
 #
@@ -136,6 +295,7 @@ class AWSEC2InstanceView(generic.ObjectView):
     def get_extra_context(self, request, instance):
         return {
             "virtual_machine": instance.virtual_machine,
+            "routes": targets.get_routes(instance=instance, user=request.user),
         }
 
 
@@ -155,7 +315,7 @@ class AWSEC2InstanceDeleteView(generic.ObjectDeleteView):
     queryset = models.AWSEC2Instance.objects.all()
 
 
-class AWSEC2InstanceBulkEditView(generic.BulkEditView):
+class AWSEC2InstanceBulkEditView(InstanceBulkEditView):
     queryset = models.AWSEC2Instance.objects.select_related("aws_account", "vpc")
     filterset = filtersets.AWSEC2InstanceFilterSet
     table = tables.AWSEC2InstanceTable
@@ -167,6 +327,11 @@ class AWSEC2InstanceBulkDeleteView(generic.BulkDeleteView):
     table = tables.AWSEC2InstanceTable
 
 
+class AWSEC2InstanceBulkImportView(NaturalKeyBulkImportView):
+    queryset = models.AWSEC2Instance.objects.all()
+    model_form = forms.AWSEC2InstanceImportForm
+
+
 #
 # Views for AWSRDSInstance
 #
@@ -197,7 +362,7 @@ class AWSRDSInstanceDeleteView(generic.ObjectDeleteView):
     queryset = models.AWSRDSInstance.objects.all()
 
 
-class AWSRDSInstanceBulkEditView(generic.BulkEditView):
+class AWSRDSInstanceBulkEditView(InstanceBulkEditView):
     queryset = models.AWSRDSInstance.objects.select_related("aws_account", "vpc")
     filterset = filtersets.AWSRDSInstanceFilterSet
     table = tables.AWSRDSInstanceTable
@@ -209,6 +374,11 @@ class AWSRDSInstanceBulkDeleteView(generic.BulkDeleteView):
     table = tables.AWSRDSInstanceTable
 
 
+class AWSRDSInstanceBulkImportView(NaturalKeyBulkImportView):
+    queryset = models.AWSRDSInstance.objects.all()
+    model_form = forms.AWSRDSInstanceImportForm
+
+
 # Views for AWSSubnet
 
 
@@ -268,6 +438,11 @@ class AWSSubnetBulkDeleteView(generic.BulkDeleteView):
     table = tables.AWSSubnetTable
 
 
+class AWSSubnetBulkImportView(NaturalKeyBulkImportView):
+    queryset = models.AWSSubnet.objects.all()
+    model_form = forms.AWSSubnetImportForm
+
+
 # Views for AWSLoadBalancer
 
 
@@ -287,7 +462,7 @@ class AWSLoadBalancerView(generic.ObjectView):
 
 
 class AWSLoadBalancerListView(generic.ObjectListView):
-    queryset = models.AWSLoadBalancer.objects.all()
+    queryset = models.AWSLoadBalancer.objects.select_related("aws_account", "vpc")
     table = tables.AWSLoadBalancerTable
     filterset = filtersets.AWSLoadBalancerFilterSet
     filterset_form = forms.AWSLoadBalancerFilterForm
@@ -305,7 +480,7 @@ class AWSLoadBalancerDeleteView(generic.ObjectDeleteView):
 
 
 class AWSLoadBalancerBulkEditView(generic.BulkEditView):
-    queryset = models.AWSLoadBalancer.objects.select_related("aws_account", "vpc", "region")  # Optimize query
+    queryset = models.AWSLoadBalancer.objects.select_related("aws_account", "vpc")
     filterset = filtersets.AWSLoadBalancerFilterSet
     table = tables.AWSLoadBalancerTable
     form = forms.AWSLoadBalancerBulkEditForm
@@ -316,6 +491,11 @@ class AWSLoadBalancerBulkDeleteView(generic.BulkDeleteView):
     table = tables.AWSLoadBalancerTable
 
 
+class AWSLoadBalancerBulkImportView(NaturalKeyBulkImportView):
+    queryset = models.AWSLoadBalancer.objects.all()
+    model_form = forms.AWSLoadBalancerImportForm
+
+
 # Views for AWSTargetGroup
 
 
@@ -331,12 +511,17 @@ class AWSTargetGroupView(generic.ObjectView):
 
         return {
             "load_balancers_table": load_balancers_table,
+            "targets": targets.list_targets(instance, limit=TARGETS_SHOWN, user=request.user),
+            "target_count": targets.get_target_rows(instance, request.user).count(),
         }
 
 
 class AWSTargetGroupListView(generic.ObjectListView):
-    queryset = models.AWSTargetGroup.objects.select_related("aws_account", "vpc").prefetch_related(
-        "load_balancers", "tags"
+    # The table shows only the number of load balancers, so count them in SQL rather than prefetching them
+    queryset = (
+        models.AWSTargetGroup.objects.select_related("aws_account", "vpc")
+        .prefetch_related("tags")
+        .annotate(load_balancer_count=Count("load_balancers", distinct=True))
     )
     table = tables.AWSTargetGroupTable
     filterset = filtersets.AWSTargetGroupFilterSet
@@ -353,8 +538,10 @@ class AWSTargetGroupDeleteView(generic.ObjectDeleteView):
 
 
 class AWSTargetGroupBulkEditView(generic.BulkEditView):
-    queryset = models.AWSTargetGroup.objects.select_related("aws_account", "vpc").prefetch_related(
-        "load_balancers", "tags"
+    queryset = (
+        models.AWSTargetGroup.objects.select_related("aws_account", "vpc")
+        .prefetch_related("tags")
+        .annotate(load_balancer_count=Count("load_balancers", distinct=True))
     )
     filterset = filtersets.AWSTargetGroupFilterSet
     table = tables.AWSTargetGroupTable
@@ -364,3 +551,107 @@ class AWSTargetGroupBulkEditView(generic.BulkEditView):
 class AWSTargetGroupBulkDeleteView(generic.BulkDeleteView):
     queryset = models.AWSTargetGroup.objects.all()
     table = tables.AWSTargetGroupTable
+
+
+class AWSTargetGroupBulkImportView(NaturalKeyBulkImportView):
+    queryset = models.AWSTargetGroup.objects.all()
+    model_form = forms.AWSTargetGroupImportForm
+
+
+# Background jobs
+
+
+class AWSBackgroundJobsView(ContentTypePermissionRequiredMixin, View):
+    """List the plugin's background jobs with their progress and the queue status, and start new jobs."""
+
+    template_name = "netbox_aws_resources_plugin/background_jobs.html"
+
+    def get_required_permission(self):
+        return "core.view_job"
+
+    def get(self, request):
+        recent_jobs = Job.objects.filter(name__in=jobs.get_job_names()).select_related("user").order_by("-created")
+        return render(
+            request,
+            self.template_name,
+            {
+                "job_types": [
+                    {"key": key, "name": job_class.name, "description": job_class.__doc__}
+                    for key, job_class in jobs.JOB_CLASSES.items()
+                ],
+                "recent_jobs": recent_jobs[:25],
+                "shard_jobs": recent_jobs.filter(name=jobs.ReconcileShardJob.name)[:50],
+                "queue": jobs.get_queue_status(),
+            },
+        )
+
+    def post(self, request):
+        job_class = jobs.JOB_CLASSES.get(request.POST.get("job"))
+        if job_class is None:
+            raise Http404
+        if not request.user.has_perms(job_class.permissions):
+            messages.error(request, f"You don't have permission to run {job_class.name}.")
+            return redirect("plugins:netbox_aws_resources_plugin:background_jobs")
+
+        # Never run the work inline; the request only queues the job
+        job = job_class.enqueue(user=request.user)
+        messages.success(request, f"Queued {job_class.name}.")
+        return redirect(job.get_absolute_url())
+
+
+class AWSIntegrityAuditView(ContentTypePermissionRequiredMixin, View):
+    """Report every inconsistency the integrity audit finds across the inventory."""
+
+    template_name = "netbox_aws_resources_plugin/integrity_audit.html"
+    additional_permissions = audit.REQUIRED_PERMISSIONS[1:]
+
+    def get_required_permission(self):
+        return audit.REQUIRED_PERMISSIONS[0]
+
+    def get(self, request):
+        report = audit.run_audit(user=request.user)
+        # Each check reports different details; lay them out as columns after the object's name
+        for check in report["checks"]:
+            columns = [key for key in (check["issues"][0] if check["issues"] else {}) if key not in audit.ISSUE_KEYS]
+            check["columns"] = [column.replace("_", " ").capitalize() for column in columns]
+            check["rows"] = [(issue, [issue[column] for column in columns]) for issue in check["issues"]]
+        return render(request, self.template_name, {"report": report, "limit": audit.DEFAULT_LIMIT})
+
+
+class AWSIPLookupView(ContentTypePermissionRequiredMixin, View):
+    """Find the subnets, VPCs, accounts and instances owning one or more IP addresses."""
+
+    template_name = "netbox_aws_resources_plugin/ip_lookup.html"
+
+    def get_required_permission(self):
+        return "netbox_aws_resources_plugin.view_awssubnet"
+
+    def get(self, request):
+        query = request.GET.get("q", "")
+        values = query.replace(",", " ").split()
+        results, invalid = [], []
+        if len(values) > ip_lookup.MAX_LOOKUP_IPS:
+            messages.error(request, f"At most {ip_lookup.MAX_LOOKUP_IPS} IP addresses can be looked up at once.")
+        elif values:
+            addresses, invalid = ip_lookup.parse_ips(values)
+            results = ip_lookup.lookup_ips(addresses, request.user)
+        return render(request, self.template_name, {"query": query, "results": results, "invalid": invalid})
+
+
+class AWSRightsizingView(ContentTypePermissionRequiredMixin, View):
+    """Per-account savings from rightsizing EC2 and RDS instances, and one account's instances to rightsize."""
+
+    template_name = "netbox_aws_resources_plugin/rightsizing.html"
+
+    def get_required_permission(self):
+        return "netbox_aws_resources_plugin.view_awsaccount"
+
+    def get(self, request):
+        same_family = request.GET.get("same_family") == "on"
+        aws_account = None
+        account_id = request.GET.get("aws_account_id", "")
+        if account_id.isdigit():
+            aws_account = models.AWSAccount.objects.restrict(request.user, "view").filter(pk=account_id).first()
+        report = rightsizing.get_report(request.user, same_family, aws_account)
+        context = {"report": report, "aws_account": aws_account, "same_family": same_family}
+        return render(request, self.template_name, context)
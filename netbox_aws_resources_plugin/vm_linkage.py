@@ -0,0 +1,212 @@
+"""
+Bulk linking of EC2 and RDS instances to NetBox VirtualMachines.
+
+Candidate VMs are loaded once into a dict keyed on the match value (VM name, tag name or custom field value), so
+matching an instance is a hash lookup rather than a query. Links, new VMs and vCPU/memory updates are then written
+with bulk_update()/bulk_create() a batch at a time, each batch in its own transaction with its change log entries.
+
+Given a user, only the instances and VMs the user's object permissions allow them to change are linked or updated.
+"""
+
+from collections import Counter
+
+from core.choices import ObjectChangeActionChoices
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from extras.models import TaggedItem
+from virtualization.choices import VirtualMachineStatusChoices
+from virtualization.models import VirtualMachine
+
+from .catalog import get_specs
+from .changelog import log_changes, prepare_update
+from .enrichment import enrich, get_vm_changes
+from .models import AWSEC2Instance, AWSRDSInstance
+
+INSTANCE_MODELS = (AWSEC2Instance, AWSRDSInstance)
+DEFAULT_BATCH_SIZE = 1000
+
+MATCH_NAME = "name"
+MATCH_TAG = "tag"
+MATCH_CUSTOM_FIELD = "custom-field"
+MATCH_STRATEGIES = (MATCH_NAME, MATCH_TAG, MATCH_CUSTOM_FIELD)
+
+# Status given to VMs created for instances in each AWS state
+VM_STATUS_MAP = {
+    "running": VirtualMachineStatusChoices.STATUS_ACTIVE,
+    "available": VirtualMachineStatusChoices.STATUS_ACTIVE,
+    "pending": VirtualMachineStatusChoices.STATUS_STAGED,
+    "creating": VirtualMachineStatusChoices.STATUS_STAGED,
+    "starting": VirtualMachineStatusChoices.STATUS_STAGED,
+    "stopping": VirtualMachineStatusChoices.STATUS_OFFLINE,
+    "stopped": VirtualMachineStatusChoices.STATUS_OFFLINE,
+    "shutting-down": VirtualMachineStatusChoices.STATUS_DECOMMISSIONING,
+    "terminated": VirtualMachineStatusChoices.STATUS_DECOMMISSIONING,
+    "deleting": VirtualMachineStatusChoices.STATUS_DECOMMISSIONING,
+    "failed": VirtualMachineStatusChoices.STATUS_FAILED,
+}
+
+
+def _unique_index(pairs):
+    """Build a {key: pk} dict from (pk, key) pairs, leaving out keys shared by more than one VM."""
+    pairs = [(pk, str(key)) for pk, key in pairs if key not in (None, "")]
+    counts = Counter(key for _, key in pairs)
+    return {key: pk for pk, key in pairs if counts[key] == 1}, {key for key, count in counts.items() if count > 1}
+
+
+def _restrict(queryset, user):
+    return queryset.restrict(user, "change") if user is not None else queryset
+
+
+def build_vm_index(strategy, custom_field=None, user=None):
+    """
+    Return ({match value: VM ID}, ambiguous values) over all VMs (or those `user` may change), for the given strategy:
+
+      name: the VM's name
+      tag: the name of each tag assigned to the VM (e.g. the instance ID)
+      custom-field: the value of the given custom field on the VM
+    """
+    vms = _restrict(VirtualMachine.objects.all(), user)
+    if strategy == MATCH_NAME:
+        pairs = vms.values_list("pk", "name")
+    elif strategy == MATCH_TAG:
+        content_type = ContentType.objects.get_for_model(VirtualMachine)
+        tagged = TaggedItem.objects.filter(content_type=content_type)
+        if user is not None:
+            tagged = tagged.filter(object_id__in=vms.values("pk"))
+        pairs = tagged.values_list("object_id", "tag__name")
+    elif strategy == MATCH_CUSTOM_FIELD:
+        if not custom_field:
+            raise ValueError("A custom field name is required to match on a custom field.")
+        lookup = f"custom_field_data__{custom_field}"
+        pairs = vms.filter(**{f"{lookup}__isnull": False}).values_list("pk", lookup)
+    else:
+        raise ValueError(f"Unknown match strategy: {strategy}")
+    return _unique_index(pairs.iterator())
+
+
+def get_match_value(instance, strategy):
+    """Instances match VMs on their name, or on their instance ID for tags and custom fields."""
+    return instance.name if strategy == MATCH_NAME else instance.instance_id
+
+
+def get_linked_vm_ids():
+    linked = set()
+    for model in INSTANCE_MODELS:
+        linked.update(model.objects.filter(virtual_machine__isnull=False).values_list("virtual_machine_id", flat=True))
+    return linked
+
+
+def sync_vm_specs(model, pks, request=None):
+    """Update the vCPU count and memory of the VMs linked to the given instances in one batch. Returns the count."""
+    instances = model.objects.filter(pk__in=pks, virtual_machine__isnull=False).select_related("virtual_machine")
+    if request is not None:
+        # The change log entries include the VMs' tags
+        instances = instances.prefetch_related("virtual_machine__tags")
+    plan = enrich(list(instances), request, costs=False)
+    return len(plan.vm_changes)
+
+
+def link_virtual_machines(
+    model,
+    request,
+    strategy=MATCH_NAME,
+    custom_field=None,
+    create_missing=False,
+    cluster=None,
+    sync_specs=True,
+    dry_run=False,
+    batch_size=DEFAULT_BATCH_SIZE,
+    user=None,
+):
+    """
+    Link unlinked instances of `model` to matching VMs, optionally creating VMs (in `cluster`) for instances with no
+    match, then sync the specs of every linked VM. With `user`, only instances and VMs they may change are touched.
+    Returns a dict of counts.
+    """
+    if create_missing and cluster is None:
+        raise ValueError("A cluster is required to create virtual machines.")
+
+    index, ambiguous = build_vm_index(strategy, custom_field, user)
+    instances = _restrict(model.objects.all(), user)
+    linked_vm_ids = get_linked_vm_ids()
+    # VM names must be unique within a cluster and tenant; don't create VMs whose name is already taken
+    taken_names = {name.lower() for name in VirtualMachine.objects.values_list("name", flat=True).iterator()}
+    stats = Counter()
+
+    pks = list(instances.filter(virtual_machine__isnull=True).order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(pks), batch_size):
+        end = start + batch_size
+        batch = model.objects.filter(pk__in=pks[start:end]).select_related("aws_account").prefetch_related("tags")
+        to_link, to_create = [], []
+        for instance in batch:
+            value = get_match_value(instance, strategy)
+            vm_id = index.get(str(value)) if value else None
+            if vm_id is not None:
+                if vm_id in linked_vm_ids:
+                    stats["vm_already_linked"] += 1
+                    continue
+                linked_vm_ids.add(vm_id)
+                to_link.append((instance, vm_id))
+            elif value in ambiguous:
+                stats["ambiguous"] += 1
+            elif create_missing:
+                name = instance.name or instance.instance_id
+                if name.lower() in taken_names:
+                    stats["name_conflicts"] += 1
+                    continue
+                taken_names.add(name.lower())
+                to_create.append(instance)
+            else:
+                stats["unmatched"] += 1
+
+        new_vms = []
+        for instance in to_create:
+            specs = get_specs(model.catalog_kind, getattr(instance, model.catalog_type_field)) or {}
+            vm = VirtualMachine(
+                name=instance.name or instance.instance_id,
+                cluster=cluster,
+                status=VM_STATUS_MAP.get(instance.state, VirtualMachineStatusChoices.STATUS_ACTIVE),
+                tenant_id=instance.aws_account.tenant_id,
+            )
+            for field, value in get_vm_changes(vm, specs).items():
+                setattr(vm, field, value)
+            # bulk_create() skips validation. Names were already checked against every VM, so skip the per-VM
+            # uniqueness queries.
+            try:
+                vm.full_clean(validate_unique=False, validate_constraints=False)
+            except ValidationError:
+                stats["invalid"] += 1
+                continue
+            new_vms.append((instance, vm))
+
+        stats["matched"] += len(to_link)
+        stats["created"] += len(new_vms)
+        if dry_run:
+            continue
+
+        with transaction.atomic():
+            VirtualMachine.objects.bulk_create([vm for _, vm in new_vms])
+            if new_vms:
+                created = VirtualMachine.objects.filter(pk__in=[vm.pk for _, vm in new_vms]).prefetch_related("tags")
+                log_changes(created, ObjectChangeActionChoices.ACTION_CREATE, request)
+            to_link += [(instance, vm.pk) for instance, vm in new_vms]
+
+            linked = [instance for instance, _ in to_link]
+            prepare_update(linked)
+            for instance, vm_id in to_link:
+                instance.virtual_machine_id = vm_id
+            model.objects.bulk_update(linked, ["virtual_machine", "last_updated"])
+            log_changes(linked, ObjectChangeActionChoices.ACTION_UPDATE, request)
+
+    if sync_specs and not dry_run:
+        with_vm = instances.filter(virtual_machine__isnull=False)
+        if user is not None:
+            with_vm = with_vm.filter(virtual_machine__in=_restrict(VirtualMachine.objects.all(), user))
+        pks = list(with_vm.order_by("pk").values_list("pk", flat=True))
+        for start in range(0, len(pks), batch_size):
+            end = start + batch_size
+            with transaction.atomic():
+                stats["specs_updated"] += sync_vm_specs(model, pks[start:end], request)
+
+    return dict(stats)
@@ -0,0 +1,49 @@
+"""
+Shared pytest configuration.
+
+The tests run inside a NetBox installation with this plugin enabled, using pytest-django with NetBox's settings:
+
+    PYTHONPATH=/opt/netbox/netbox pytest --ds=netbox.settings
+
+Tests marked "performance" (the suite in tests/performance, and the benchmarks alongside the unit tests) are skipped
+unless --performance is given.
+"""
+
+import pytest
+
+PERFORMANCE_SIZES = {"1k": 1000, "10k": 10000, "100k": 100000}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("performance", "Plugin performance suite")
+    group.addoption("--performance", action="store_true", help="Run the performance regression suite")
+    group.addoption(
+        "--perf-size",
+        choices=PERFORMANCE_SIZES,
+        default="1k",
+        help="Objects of each model to seed for the performance suite (default 1k)",
+    )
+    group.addoption(
+        "--perf-update-baselines",
+        action="store_true",
+        help="Record the measured latencies as the new baselines instead of comparing against them",
+    )
+    group.addoption(
+        "--perf-tolerance",
+        type=float,
+        default=2.0,
+        help="Fail when an endpoint's median latency exceeds its baseline by more than this factor (default 2.0)",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "performance: query budget and latency tests (run with --performance)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--performance"):
+        return
+    skip = pytest.mark.skip(reason="performance suite; run with --performance")
+    for item in items:
+        if "performance" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1 @@
+"""Performance regression suite: query budgets and latency baselines for the plugin's views and API."""
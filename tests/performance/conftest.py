@@ -0,0 +1,121 @@
+import json
+import statistics
+import time
+from pathlib import Path
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from netbox_aws_resources_plugin.synthetic import InventoryGenerator, uniform_counts
+from tests.conftest import PERFORMANCE_SIZES
+
+BASELINES_DIR = Path(__file__).parent / "baselines"
+# Timed runs per endpoint, after one untimed warm-up run
+LATENCY_RUNS = 5
+
+# Where the session's recorder keeps its results for the terminal summary
+RESULTS_KEY = pytest.StashKey[dict]()
+
+# Keep the suite off the network: NetBox's Redis cache is swapped for a local-memory one
+LOCAL_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@pytest.fixture(scope="session")
+def perf_size(request):
+    return request.config.getoption("--perf-size")
+
+
+@pytest.fixture(scope="session")
+def local_cache():
+    override = override_settings(CACHES=LOCAL_CACHES)
+    override.enable()
+    yield
+    override.disable()
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker, local_cache, perf_size):
+    """Seed the test database once per session with PERFORMANCE_SIZES[--perf-size] objects of every model."""
+    with django_db_blocker.unblock():
+        InventoryGenerator(**uniform_counts(PERFORMANCE_SIZES[perf_size])).generate()
+
+
+class PerformanceRecorder:
+    """Measures endpoints' query counts and latencies and compares latencies with the recorded baselines."""
+
+    def __init__(self, path, update, tolerance):
+        self.path = path
+        self.update = update
+        self.tolerance = tolerance
+        self.baselines = json.loads(path.read_text()) if path.exists() else {}
+        self.results = {}
+
+    def count_queries(self, func):
+        with CaptureQueriesContext(connection) as context:
+            response = func()
+        return response, context.captured_queries
+
+    def measure(self, name, func, budget, max_seconds=None):
+        """
+        Call `func` (which makes a request) and assert that it ran at most `budget` queries, then time it over
+        LATENCY_RUNS runs and compare the median with the baseline and, if given, the fixed limit `max_seconds`.
+        """
+        response, queries = self.count_queries(func)
+        assert response.status_code == 200, f"{name} returned {response.status_code}"
+        assert len(queries) <= budget, self._budget_message(name, queries, budget)
+
+        timings = []
+        for _ in range(LATENCY_RUNS):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        median = statistics.median(timings)
+        self.results[name] = {"queries": len(queries), "median_seconds": round(median, 4)}
+        if max_seconds is not None:
+            assert median <= max_seconds, f"{name}: median {median:.3f}s exceeds the limit of {max_seconds}s"
+
+        baseline = self.baselines.get(name)
+        if baseline and not self.update:
+            limit = baseline["median_seconds"] * self.tolerance
+            message = f"exceeds {self.tolerance}x the baseline of {baseline['median_seconds']}s"
+            assert median <= limit, f"{name}: median {median:.3f}s {message}"
+
+    @staticmethod
+    def _budget_message(name, queries, budget):
+        counts = {}
+        for query in queries:
+            counts[query["sql"]] = counts.get(query["sql"], 0) + 1
+        repeated = sorted(((count, sql) for sql, count in counts.items() if count > 1), reverse=True)[:3]
+        lines = [f"{name} ran {len(queries)} queries (budget {budget})"]
+        lines += [f"  {count}x {sql[:200]}" for count, sql in repeated]
+        return "\n".join(lines)
+
+    def save(self):
+        if self.update and self.results:
+            self.path.parent.mkdir(exist_ok=True)
+            self.path.write_text(json.dumps({**self.baselines, **self.results}, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.fixture(scope="session")
+def perf_recorder(request, perf_size):
+    recorder = PerformanceRecorder(
+        BASELINES_DIR / f"{connection.vendor}-{perf_size}.json",
+        update=request.config.getoption("--perf-update-baselines"),
+        tolerance=request.config.getoption("--perf-tolerance"),
+    )
+    request.config.stash[RESULTS_KEY] = recorder.results
+    yield recorder
+    recorder.save()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config.stash.get(RESULTS_KEY, None)
+    if not results:
+        return
+    terminalreporter.section("performance")
+    for name, result in sorted(results.items()):
+        terminalreporter.write_line(
+            f"{name:60} {result['queries']:4} queries {result['median_seconds'] * 1000:9.1f} ms"
+        )
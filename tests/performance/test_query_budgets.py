@@ -0,0 +1,213 @@
+"""
+Query budgets and latency baselines for every plugin list, detail and bulk edit view and API endpoint.
+
+Each endpoint must stay within a fixed number of queries however large the seeded inventory, and a list's query count
+must not grow with the page size; either failing means a relation is being loaded per row. The budgets are ceilings
+with some headroom: lower them as views get cheaper, and never raise one without knowing why it was exceeded.
+"""
+
+import time
+
+import pytest
+from django.urls import reverse
+from ipam.models import Prefix
+
+from netbox_aws_resources_plugin.caching import bump_versions, vpc_scope
+from netbox_aws_resources_plugin.models import (
+    AWSVPC,
+    AWSAccount,
+    AWSEC2Instance,
+    AWSLoadBalancer,
+    AWSRDSInstance,
+    AWSSubnet,
+    AWSTargetGroup,
+)
+
+pytestmark = [pytest.mark.performance, pytest.mark.django_db]
+
+UI_MODELS = (AWSAccount, AWSVPC, AWSSubnet, AWSLoadBalancer, AWSTargetGroup, AWSEC2Instance, AWSRDSInstance)
+API_MODELS = (AWSAccount, AWSVPC, AWSSubnet, AWSLoadBalancer, AWSTargetGroup)
+UI_NAMESPACE = "plugins:netbox_aws_resources_plugin"
+API_NAMESPACE = "plugins-api:netbox_aws_resources_plugin-api"
+
+LIST_BUDGET = 30
+DETAIL_BUDGET = 35
+BULK_EDIT_BUDGET = 35
+TOPOLOGY_BUDGET = 30
+API_LIST_BUDGET = 15
+API_DETAIL_BUDGET = 12
+API_TOPOLOGY_BUDGET = 15
+API_CHANGES_BUDGET = 15
+API_TARGETS_BUDGET = 12
+API_TRAFFIC_PATHS_BUDGET = 20
+# Load balancers resolved in one traffic path request
+TRAFFIC_PATH_NAMES = 50
+# Objects selected for a bulk edit form
+BULK_EDIT_OBJECTS = 50
+# A VPC's topology must be returned within TOPOLOGY_LATENCY seconds with this many instances, cached or not
+DENSE_VPC_INSTANCES = 2000
+DENSE_VPC_SUBNETS = 8
+TOPOLOGY_LATENCY = 0.5
+
+
+def model_id(model):
+    return model._meta.model_name
+
+
+def count_queries(perf_recorder, client, url, **params):
+    response, queries = perf_recorder.count_queries(lambda: client.get(url, params))
+    assert response.status_code == 200
+    return len(queries)
+
+
+@pytest.mark.parametrize("model", UI_MODELS, ids=model_id)
+def test_list_view(admin_client, perf_recorder, model):
+    url = reverse(f"{UI_NAMESPACE}:{model_id(model)}_list")
+    perf_recorder.measure(f"ui:{model_id(model)}_list", lambda: admin_client.get(url, {"per_page": 100}), LIST_BUDGET)
+
+
+@pytest.mark.parametrize("model", UI_MODELS, ids=model_id)
+def test_list_view_does_not_scale_with_page_size(admin_client, perf_recorder, model):
+    url = reverse(f"{UI_NAMESPACE}:{model_id(model)}_list")
+    small = count_queries(perf_recorder, admin_client, url, per_page=10)
+    large = count_queries(perf_recorder, admin_client, url, per_page=100)
+    assert small == large, f"{model_id(model)} list ran {small} queries for 10 rows but {large} for 100"
+
+
+@pytest.mark.parametrize("model", UI_MODELS, ids=model_id)
+def test_detail_view(admin_client, perf_recorder, model):
+    instance = model.objects.order_by("pk").last()
+    url = reverse(f"{UI_NAMESPACE}:{model_id(model)}", kwargs={"pk": instance.pk})
+    perf_recorder.measure(f"ui:{model_id(model)}", lambda: admin_client.get(url), DETAIL_BUDGET)
+
+
+@pytest.mark.parametrize("model", UI_MODELS, ids=model_id)
+def test_bulk_edit_form(admin_client, perf_recorder, model):
+    url = reverse(f"{UI_NAMESPACE}:{model_id(model)}_bulk_edit")
+    pks = list(model.objects.order_by("pk").values_list("pk", flat=True)[:BULK_EDIT_OBJECTS])
+    # Posting a selection without "_apply" renders the bulk edit form for it
+    perf_recorder.measure(
+        f"ui:{model_id(model)}_bulk_edit", lambda: admin_client.post(url, {"pk": pks}), BULK_EDIT_BUDGET
+    )
+
+
+@pytest.mark.parametrize("model", (AWSAccount, AWSVPC), ids=model_id)
+def test_topology_view(admin_client, perf_recorder, model):
+    instance = model.objects.order_by("pk").first()
+    url = reverse(f"{UI_NAMESPACE}:{model_id(model)}_topology", kwargs={"pk": instance.pk})
+    perf_recorder.measure(f"ui:{model_id(model)}_topology", lambda: admin_client.get(url), TOPOLOGY_BUDGET)
+
+
+@pytest.mark.parametrize("model", API_MODELS, ids=model_id)
+def test_api_list(admin_client, perf_recorder, model):
+    url = reverse(f"{API_NAMESPACE}:{model_id(model)}-list")
+    perf_recorder.measure(f"api:{model_id(model)}-list", lambda: admin_client.get(url, {"limit": 100}), API_LIST_BUDGET)
+
+
+@pytest.mark.parametrize("model", API_MODELS, ids=model_id)
+def test_api_list_does_not_scale_with_page_size(admin_client, perf_recorder, model):
+    url = reverse(f"{API_NAMESPACE}:{model_id(model)}-list")
+    small = count_queries(perf_recorder, admin_client, url, limit=10)
+    large = count_queries(perf_recorder, admin_client, url, limit=100)
+    assert small == large, f"{model_id(model)} API list ran {small} queries for 10 rows but {large} for 100"
+
+
+@pytest.mark.parametrize("model", API_MODELS, ids=model_id)
+def test_api_detail(admin_client, perf_recorder, model):
+    instance = model.objects.order_by("pk").last()
+    url = reverse(f"{API_NAMESPACE}:{model_id(model)}-detail", kwargs={"pk": instance.pk})
+    perf_recorder.measure(f"api:{model_id(model)}-detail", lambda: admin_client.get(url), API_DETAIL_BUDGET)
+
+
+@pytest.mark.parametrize("param", ("aws_account_id", "vpc_id"))
+def test_api_topology(admin_client, perf_recorder, param):
+    model = AWSAccount if param == "aws_account_id" else AWSVPC
+    params = {param: model.objects.order_by("pk").first().pk}
+    url = reverse(f"{API_NAMESPACE}:topology")
+    perf_recorder.measure(f"api:topology:{param}", lambda: admin_client.get(url, params), API_TOPOLOGY_BUDGET)
+
+
+@pytest.fixture
+def dense_vpc():
+    """A VPC holding DENSE_VPC_INSTANCES EC2 instances, far more than any VPC of the seeded inventory."""
+    account = AWSAccount.objects.create(account_id="800000000000", name="dense-account")
+    vpc = AWSVPC.objects.create(
+        aws_account=account,
+        name="dense-vpc",
+        vpc_id="vpc-dense",
+        region="us-east-1",
+        cidr_block=Prefix.objects.create(prefix="172.16.0.0/16"),
+    )
+    subnets = [
+        AWSSubnet.objects.create(
+            aws_vpc=vpc,
+            name=f"dense-subnet-{i}",
+            subnet_id=f"subnet-dense-{i}",
+            cidr_block=Prefix.objects.create(prefix=f"172.16.{i * 32}.0/19"),
+        )
+        for i in range(DENSE_VPC_SUBNETS)
+    ]
+    AWSEC2Instance.objects.bulk_create(
+        [
+            AWSEC2Instance(
+                name=f"dense-i-{i:05d}",
+                instance_id=f"i-dense{i:05d}",
+                aws_account=account,
+                region=vpc.region,
+                vpc=vpc,
+                subnet=subnets[i % len(subnets)],
+                instance_type="m5.large",
+                state="running",
+            )
+            for i in range(DENSE_VPC_INSTANCES)
+        ],
+        batch_size=1000,
+    )
+    # bulk_create() skips the signals which invalidate the VPC's cached topology
+    bump_versions(vpc_scope(vpc.pk))
+    return vpc
+
+
+def test_api_topology_dense_vpc(admin_client, perf_recorder, dense_vpc):
+    url = reverse(f"{API_NAMESPACE}:topology")
+    params = {"vpc_id": dense_vpc.pk}
+
+    started = time.perf_counter()
+    response = admin_client.get(url, params)
+    cold = time.perf_counter() - started
+    assert response.status_code == 200
+    assert cold <= TOPOLOGY_LATENCY, f"uncached topology took {cold:.3f}s (limit {TOPOLOGY_LATENCY}s)"
+
+    perf_recorder.measure(
+        "api:topology:dense-vpc",
+        lambda: admin_client.get(url, params),
+        API_TOPOLOGY_BUDGET,
+        max_seconds=TOPOLOGY_LATENCY,
+    )
+
+
+def test_api_change_feed(admin_client, perf_recorder):
+    url = reverse(f"{API_NAMESPACE}:change-feed")
+    perf_recorder.measure("api:change-feed", lambda: admin_client.get(url), API_CHANGES_BUDGET)
+
+
+def test_api_target_group_targets(admin_client, perf_recorder):
+    target_group = AWSTargetGroup.objects.order_by("pk").first()
+    url = reverse(f"{API_NAMESPACE}:awstargetgroup-targets", kwargs={"pk": target_group.pk})
+    perf_recorder.measure("api:awstargetgroup-targets", lambda: admin_client.get(url), API_TARGETS_BUDGET)
+
+
+def test_api_target_routes(admin_client, perf_recorder):
+    params = {"instance": AWSEC2Instance.objects.order_by("pk").first().pk}
+    url = reverse(f"{API_NAMESPACE}:target-routes")
+    perf_recorder.measure("api:target-routes", lambda: admin_client.get(url, params), API_TARGETS_BUDGET)
+
+
+def test_api_traffic_paths(admin_client, perf_recorder):
+    names = list(AWSLoadBalancer.objects.order_by("pk").values_list("dns_name", flat=True)[:TRAFFIC_PATH_NAMES])
+    url = reverse(f"{API_NAMESPACE}:traffic-paths")
+    perf_recorder.measure(
+        "api:traffic-paths",
+        lambda: admin_client.post(url, {"names": names}, content_type="application/json"),
+        API_TRAFFIC_PATHS_BUDGET,
+    )
@@ -0,0 +1,272 @@
+"""Tests for the plugin's custom API endpoints."""
+
+import csv
+import io
+from datetime import timedelta
+
+import pytest
+from core.models import ObjectChange
+from django.urls import reverse
+from django.utils import timezone
+from ipam.models import Prefix
+
+from netbox_aws_resources_plugin.models import (
+    AWSVPC,
+    DELETION_ORDER,
+    AWSAccount,
+    AWSEC2Instance,
+    AWSSubnet,
+    AWSTarget,
+    AWSTargetGroup,
+)
+
+from .utils import grant
+
+API_NAMESPACE = "plugins-api:netbox_aws_resources_plugin-api"
+
+pytestmark = pytest.mark.django_db
+
+
+def test_inventory_export_csv(admin_client):
+    account = AWSAccount.objects.create(account_id="123456789012", name="Production")
+    url = reverse(f"{API_NAMESPACE}:inventory-export")
+
+    response = admin_client.get(url, {"export_format": "csv", "model": "awsaccount"})
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+    assert [(row["id"], row["account_id"], row["name"]) for row in rows] == [
+        (str(account.pk), "123456789012", "Production")
+    ]
+
+
+def test_inventory_export_rejects_unknown_format(admin_client):
+    url = reverse(f"{API_NAMESPACE}:inventory-export")
+
+    response = admin_client.get(url, {"export_format": "xml"})
+
+    assert response.status_code == 400
+    assert "export_format" in response.json()
+
+
+def test_decommission_rejects_non_boolean(admin_client):
+    account = AWSAccount.objects.create(account_id="123456789012", name="Production")
+    url = reverse(f"{API_NAMESPACE}:decommission")
+
+    response = admin_client.post(
+        url, {"aws_account_id": account.pk, "release_prefixes": "maybe"}, content_type="application/json"
+    )
+
+    assert response.status_code == 400
+    assert "release_prefixes" in response.json()
+
+
+def test_decommission_requires_delete_permission_on_whole_subtree(client, django_user_model):
+    account = AWSAccount.objects.create(account_id="123456789012", name="Production")
+    AWSVPC.objects.create(
+        aws_account=account, name="shared", region="us-east-1", cidr_block=Prefix.objects.create(prefix="10.0.0.0/16")
+    )
+    user = django_user_model.objects.create_user(username="operator")
+    grant(user, [model for model in DELETION_ORDER if model is not AWSVPC], ["view", "delete"])
+    # VPCs may be deleted too, but not this account's
+    grant(user, [AWSVPC], ["view", "delete"], constraints={"name": "other"})
+    client.force_login(user)
+
+    response = client.post(
+        reverse(f"{API_NAMESPACE}:decommission"), {"aws_account_id": account.pk}, content_type="application/json"
+    )
+
+    assert response.status_code == 403
+
+
+def test_vpc_summary_only_in_detail(admin_client):
+    account = AWSAccount.objects.create(account_id="123456789012", name="Production")
+    vpc = AWSVPC.objects.create(
+        aws_account=account, name="main", region="us-east-1", cidr_block=Prefix.objects.create(prefix="10.0.0.0/16")
+    )
+
+    response = admin_client.get(reverse(f"{API_NAMESPACE}:awsvpc-list"))
+    assert response.status_code == 200
+    assert "summary" not in response.json()["results"][0]
+
+    response = admin_client.get(reverse(f"{API_NAMESPACE}:awsvpc-detail", kwargs={"pk": vpc.pk}))
+    assert response.status_code == 200
+    assert "summary" in response.json()
+
+
+def test_seen_rejects_non_object_body(admin_client):
+    response = admin_client.post(reverse(f"{API_NAMESPACE}:seen"), ["123456789012"], content_type="application/json")
+
+    assert response.status_code == 400
+
+
+def test_seen_only_stamps_objects_user_may_change(client, django_user_model):
+    production = AWSAccount.objects.create(account_id="123456789012", name="Production")
+    staging = AWSAccount.objects.create(account_id="210987654321", name="Staging")
+    user = django_user_model.objects.create_user(username="sync")
+    grant(user, [AWSAccount], ["view", "change"], constraints={"name": "Production"})
+    client.force_login(user)
+
+    response = client.post(
+        reverse(f"{API_NAMESPACE}:seen"),
+        {"awsaccount": [production.account_id, staging.account_id]},
+        content_type="application/json",
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"awsaccount": 1}
+    production.refresh_from_db()
+    staging.refresh_from_db()
+    assert production.last_seen is not None
+    assert staging.last_seen is None
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"create_missing": True, "cluster": "first"},
+        {"create_missing": True, "cluster": 1.5},
+        {"cluster": 1},
+    ],
+)
+def test_vm_linkage_rejects_invalid_cluster(admin_client, data):
+    response = admin_client.post(reverse(f"{API_NAMESPACE}:vm-linkage"), data, content_type="application/json")
+
+    assert response.status_code == 400
+    assert "cluster" in response.json()
+
+
+def test_integrity_audit_rejects_negative_limit(admin_client):
+    response = admin_client.get(reverse(f"{API_NAMESPACE}:integrity-audit"), {"limit": -1})
+
+    assert response.status_code == 400
+    assert "limit" in response.json()
+
+
+@pytest.mark.parametrize("params", [{"same_family": "maybe"}, {"limit": -1}])
+def test_rightsizing_rejects_invalid_parameters(admin_client, params):
+    response = admin_client.get(reverse(f"{API_NAMESPACE}:rightsizing"), params)
+
+    assert response.status_code == 400
+    assert set(params) <= set(response.json())
+
+
+def test_decommission_rejects_non_integer_id(admin_client):
+    response = admin_client.post(
+        reverse(f"{API_NAMESPACE}:decommission"), {"vpc_id": "vpc-0123abcd"}, content_type="application/json"
+    )
+
+    assert response.status_code == 400
+    assert "vpc_id" in response.json()
+
+
+def test_replacing_targets_keeps_targets_user_may_not_view(client, django_user_model):
+    account = AWSAccount.objects.create(account_id="123456789012", name="Production")
+    vpc = AWSVPC.objects.create(
+        aws_account=account, name="main", region="us-east-1", cidr_block=Prefix.objects.create(prefix="10.0.0.0/16")
+    )
+    target_group = AWSTargetGroup.objects.create(
+        name="web", aws_account=account, region="us-east-1", vpc=vpc, target_type="instance"
+    )
+    for name in ("web-1", "web-2"):
+        instance = AWSEC2Instance.objects.create(name=name, aws_account=account, region="us-east-1", vpc=vpc)
+        AWSTarget.objects.create(target_group=target_group, instance=instance, port=80)
+    user = django_user_model.objects.create_user(username="deployer")
+    grant(user, [AWSTargetGroup], ["view", "change"])
+    grant(user, [AWSEC2Instance], ["view"], constraints={"name": "web-1"})
+    client.force_login(user)
+
+    response = client.post(
+        reverse(f"{API_NAMESPACE}:awstargetgroup-register-targets", kwargs={"pk": target_group.pk}),
+        {"targets": [], "replace": True},
+        content_type="application/json",
+    )
+
+    assert response.status_code == 200
+    assert response.json()["deregistered"] == 1
+    assert list(target_group.targets.values_list("instance__name", flat=True)) == ["web-2"]
+
+
+def test_ip_lookup_hides_vpc_and_account_user_may_not_view(client, django_user_model):
+    account = AWSAccount.objects.create(account_id="123456789012", name="Production")
+    vpc = AWSVPC.objects.create(
+        aws_account=account, name="main", region="us-east-1", cidr_block=Prefix.objects.create(prefix="10.0.0.0/16")
+    )
+    subnet = AWSSubnet.objects.create(aws_vpc=vpc, name="app", cidr_block=Prefix.objects.create(prefix="10.0.1.0/24"))
+    user = django_user_model.objects.create_user(username="oncall")
+    grant(user, [AWSSubnet], ["view"])
+    client.force_login(user)
+
+    response = client.get(reverse(f"{API_NAMESPACE}:ip-lookup"), {"ip": "10.0.1.5"})
+
+    assert response.status_code == 200
+    (match,) = response.json()["results"][0]["matches"]
+    assert match["subnet"]["id"] == subnet.pk
+    assert match["vpc"] is None
+    assert match["aws_account"] is None
+
+
+def test_list_keeps_limit_offset_pagination_by_default(admin_client):
+    AWSAccount.objects.create(account_id="123456789012", name="Production")
+
+    response = admin_client.get(reverse(f"{API_NAMESPACE}:awsaccount-list"))
+
+    assert response.status_code == 200
+    assert response.json()["count"] == 1
+
+
+def test_list_cursor_pagination_walks_every_page(admin_client):
+    accounts = [AWSAccount.objects.create(account_id=f"12345678901{i}", name=f"Account {i}") for i in range(3)]
+
+    response = admin_client.get(reverse(f"{API_NAMESPACE}:awsaccount-list"), {"pagination": "cursor", "limit": 2})
+    assert response.status_code == 200
+    first = response.json()
+    assert "count" not in first
+    assert first["previous"] is None
+
+    # Rows created mid-crawl must not shift the pages already seen
+    accounts.append(AWSAccount.objects.create(account_id="999999999999", name="Late"))
+    response = admin_client.get(first["next"])
+    assert response.status_code == 200
+    second = response.json()
+    assert second["next"] is None
+
+    seen = [row["id"] for row in first["results"] + second["results"]]
+    assert seen == [account.pk for account in accounts]
+
+
+def test_change_feed_pages_through_changes_and_tombstones(admin_client):
+    response = admin_client.post(
+        reverse(f"{API_NAMESPACE}:awsaccount-list"),
+        {"account_id": "123456789012", "name": "Production"},
+        content_type="application/json",
+    )
+    assert response.status_code == 201
+    admin_client.delete(reverse(f"{API_NAMESPACE}:awsaccount-detail", kwargs={"pk": response.json()["id"]}))
+    # Age the changes past change_feed_settle_seconds
+    ObjectChange.objects.update(time=timezone.now() - timedelta(hours=1))
+    url = reverse(f"{API_NAMESPACE}:change-feed")
+
+    first = admin_client.get(url, {"model": "awsaccount", "limit": 1}).json()
+    assert [change["action"] for change in first["results"]] == ["create"]
+    assert first["has_more"]
+
+    second = admin_client.get(url, {"model": "awsaccount", "cursor": first["cursor"]}).json()
+    (tombstone,) = second["results"]
+    assert tombstone["deleted"]
+    assert tombstone["data"]["name"] == "Production"
+    assert not second["has_more"]
+
+
+def test_change_feed_holds_back_unsettled_changes(admin_client):
+    admin_client.post(
+        reverse(f"{API_NAMESPACE}:awsaccount-list"),
+        {"account_id": "123456789012", "name": "Production"},
+        content_type="application/json",
+    )
+
+    response = admin_client.get(reverse(f"{API_NAMESPACE}:change-feed"), {"model": "awsaccount"})
+
+    assert response.status_code == 200
+    assert response.json()["results"] == []
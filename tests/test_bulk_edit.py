@@ -0,0 +1,40 @@
+"""Tests for the batched bulk edit of EC2 and RDS instances."""
+
+import pytest
+from core.choices import ObjectChangeActionChoices
+from core.models import ObjectChange
+from ipam.models import Prefix
+
+from netbox_aws_resources_plugin.bulk_edit import bulk_edit_instances
+from netbox_aws_resources_plugin.events import make_sync_request
+from netbox_aws_resources_plugin.models import AWSVPC, AWSAccount, AWSEC2Instance
+
+pytestmark = pytest.mark.django_db
+
+
+def test_edits_and_logs_changes_with_message(admin_user):
+    account = AWSAccount.objects.create(account_id="123456789012", name="Production")
+    vpc = AWSVPC.objects.create(
+        aws_account=account, name="main", region="us-east-1", cidr_block=Prefix.objects.create(prefix="10.0.0.0/16")
+    )
+    instances = [
+        AWSEC2Instance.objects.create(name=f"web-{index}", aws_account=account, region="us-east-1", vpc=vpc)
+        for index in range(3)
+    ]
+
+    updated = bulk_edit_instances(
+        AWSEC2Instance.objects.all(),
+        [instance.pk for instance in instances],
+        {"state": "stopped"},
+        request=make_sync_request(admin_user),
+        batch_size=2,
+        changelog_message="Stopped for maintenance",
+    )
+
+    assert len(updated) == 3
+    assert set(AWSEC2Instance.objects.values_list("state", flat=True)) == {"stopped"}
+    changes = ObjectChange.objects.filter(
+        action=ObjectChangeActionChoices.ACTION_UPDATE, changed_object_id__in=[instance.pk for instance in instances]
+    )
+    assert changes.count() == 3
+    assert set(changes.values_list("message", flat=True)) == {"Stopped for maintenance"}
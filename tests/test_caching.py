@@ -0,0 +1,21 @@
+"""Tests for the versioned cache invalidation of derived plugin data."""
+
+import pytest
+
+from netbox_aws_resources_plugin.caching import account_scope, get_versions
+from netbox_aws_resources_plugin.models import AWSAccount
+
+pytestmark = pytest.mark.django_db
+
+
+def test_saving_invalidates_once_committed(django_capture_on_commit_callbacks):
+    account = AWSAccount.objects.create(account_id="123456789012", name="Production")
+    scope = account_scope(account.pk)
+    versions = get_versions(scope)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        account.name = "Renamed"
+        account.save()
+        assert get_versions(scope) == versions
+
+    assert get_versions(scope) != versions
@@ -0,0 +1,56 @@
+"""Tests for selecting and deleting an account or VPC subtree."""
+
+import pytest
+from ipam.models import Prefix
+
+from netbox_aws_resources_plugin import decommission
+from netbox_aws_resources_plugin.models import AWSVPC, DELETION_ORDER, AWSAccount, AWSEC2Instance, AWSSubnet
+
+pytestmark = pytest.mark.django_db
+
+
+def create_vpc(account, name, prefix):
+    return AWSVPC.objects.create(
+        aws_account=account, name=name, region="us-east-1", cidr_block=Prefix.objects.create(prefix=prefix)
+    )
+
+
+@pytest.fixture
+def estate():
+    production = AWSAccount.objects.create(account_id="123456789012", name="Production")
+    shared = AWSAccount.objects.create(account_id="210987654321", name="Shared")
+    vpc = create_vpc(production, "production", "10.0.0.0/16")
+    shared_vpc = create_vpc(shared, "shared", "10.1.0.0/16")
+    subnet = AWSSubnet.objects.create(aws_vpc=vpc, name="app", cidr_block=Prefix.objects.create(prefix="10.0.1.0/24"))
+    return {
+        "production": production,
+        "vpc": vpc,
+        "subnet": subnet,
+        # Another account's instance in the production VPC, which must go with it
+        "guest": AWSEC2Instance.objects.create(name="guest", aws_account=shared, region="us-east-1", vpc=vpc),
+        "elsewhere": AWSEC2Instance.objects.create(
+            name="elsewhere", aws_account=shared, region="us-east-1", vpc=shared_vpc
+        ),
+    }
+
+
+def test_subtree_is_in_deletion_order(estate):
+    assert list(decommission.get_subtree(estate["production"])) == list(DELETION_ORDER)
+
+
+def test_account_subtree_includes_everything_in_its_vpcs(estate):
+    subtree = decommission.get_subtree(estate["production"])
+
+    assert list(subtree[AWSAccount]) == [estate["production"]]
+    assert list(subtree[AWSVPC]) == [estate["vpc"]]
+    assert list(subtree[AWSSubnet]) == [estate["subnet"]]
+    assert list(subtree[AWSEC2Instance]) == [estate["guest"]]
+
+
+def test_vpc_subtree_leaves_the_account(estate):
+    subtree = decommission.get_subtree(estate["vpc"])
+
+    assert not subtree[AWSAccount].exists()
+    assert list(subtree[AWSVPC]) == [estate["vpc"]]
+    assert list(subtree[AWSEC2Instance]) == [estate["guest"]]
+    assert decommission.get_plan(estate["vpc"], release_prefixes=True)[Prefix._meta.verbose_name_plural] == 2
@@ -0,0 +1,126 @@
+"""Tests and benchmarks for the EC2/RDS spec enrichment planner."""
+
+import time
+import unittest
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from netbox_aws_resources_plugin.enrichment import plan_enrichment
+
+CATALOG = {
+    "ec2": {
+        "t3.micro": {"vcpu": 2, "ram_gb": 1, "price_usd_hourly": 0.0104},
+        "m5.large": {"vcpu": 2, "ram_gb": 8, "price_usd_hourly": 0.096},
+    },
+    "rds": {
+        "db.t3.micro": {"vcpu": 2, "ram_gb": 1, "price_usd_hourly": 0.017},
+    },
+}
+
+
+class CountingCatalog(dict):
+    """Catalog which counts the lookups made into each section."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lookups = 0
+
+    def get(self, key, default=None):
+        self.lookups += 1
+        return super().get(key, default)
+
+
+def make_instance(instance_type, kind="ec2", cost=None, vm=None):
+    """Stand-in for an EC2/RDS instance carrying just the attributes the planner reads."""
+    return SimpleNamespace(
+        catalog_kind=kind,
+        catalog_type_field="instance_type",
+        instance_type=instance_type,
+        estimated_cost_usd_hourly=cost,
+        virtual_machine=vm,
+        virtual_machine_id=1 if vm else None,
+    )
+
+
+class PlanEnrichmentTestCase(unittest.TestCase):
+    def test_plans_cost_and_vm_changes(self):
+        vm = SimpleNamespace(vcpus=1, memory=512)
+        instance = make_instance("m5.large", vm=vm)
+
+        plan = plan_enrichment([instance], catalog=CATALOG)
+
+        self.assertEqual(plan.costs, [(instance, Decimal("0.09600"))])
+        self.assertEqual(plan.vm_changes, [(vm, {"vcpus": 2, "memory": 8192})])
+        # Planning doesn't modify anything
+        self.assertIsNone(instance.estimated_cost_usd_hourly)
+        self.assertEqual(vm.vcpus, 1)
+
+    def test_apply_in_memory(self):
+        vm = SimpleNamespace(vcpus=1, memory=512)
+        instance = make_instance("m5.large", vm=vm)
+
+        plan = plan_enrichment([instance], catalog=CATALOG)
+
+        self.assertEqual(plan.apply_costs(), [instance])
+        self.assertEqual(plan.apply_vm_changes(), [vm])
+        self.assertEqual(instance.estimated_cost_usd_hourly, Decimal("0.09600"))
+        self.assertEqual((vm.vcpus, vm.memory), (2, 8192))
+
+    def test_unchanged_and_unknown_instances_are_skipped(self):
+        vm = SimpleNamespace(vcpus=2, memory=1024)
+        current = make_instance("t3.micro", cost=Decimal("0.01040"), vm=vm)
+        unknown = make_instance("x99.huge")
+        untyped = make_instance("")
+
+        plan = plan_enrichment([current, unknown, untyped], catalog=CATALOG)
+
+        self.assertFalse(plan)
+
+    def test_rds_uses_rds_catalog(self):
+        instance = make_instance("db.t3.micro", kind="rds")
+
+        plan = plan_enrichment([instance], catalog=CATALOG)
+
+        self.assertEqual(plan.costs, [(instance, Decimal("0.01700"))])
+
+    def test_catalog_looked_up_once_per_type(self):
+        catalog = CountingCatalog(CATALOG)
+        instances = [make_instance("t3.micro") for _ in range(100)] + [make_instance("m5.large") for _ in range(100)]
+
+        plan_enrichment(instances, catalog=catalog)
+
+        self.assertEqual(catalog.lookups, 2)
+
+
+@pytest.mark.performance
+class PlanEnrichmentBenchmark(unittest.TestCase):
+    """Planning is pure Python over already-loaded objects, so it should handle a large inventory in well under a
+    second; the bounds here are loose enough for slow CI machines."""
+
+    INSTANCE_COUNT = 100_000
+
+    def _benchmark(self, instances, limit):
+        started = time.perf_counter()
+        plan = plan_enrichment(instances, catalog=CATALOG)
+        elapsed = time.perf_counter() - started
+        self.assertLess(elapsed, limit)
+        return plan
+
+    def test_benchmark_costs(self):
+        types = ["t3.micro", "m5.large", "x99.huge"]
+        instances = [make_instance(types[i % len(types)]) for i in range(self.INSTANCE_COUNT)]
+
+        plan = self._benchmark(instances, limit=5)
+
+        self.assertEqual(len(plan.costs), self.INSTANCE_COUNT * 2 // 3 + 1)
+
+    def test_benchmark_costs_and_vms(self):
+        instances = [
+            make_instance("m5.large", vm=SimpleNamespace(vcpus=1, memory=512)) for _ in range(self.INSTANCE_COUNT)
+        ]
+
+        plan = self._benchmark(instances, limit=5)
+
+        self.assertEqual(len(plan.vm_changes), self.INSTANCE_COUNT)
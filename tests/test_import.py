@@ -0,0 +1,55 @@
+"""Tests for bulk import with natural-key references."""
+
+import pytest
+from django.urls import reverse
+
+from netbox_aws_resources_plugin.forms import AWSAccountImportForm
+from netbox_aws_resources_plugin.forms.fields import prefetch_natural_keys
+from netbox_aws_resources_plugin.models import AWSAccount
+
+pytestmark = pytest.mark.django_db
+
+
+def test_prefetched_reference_resolves():
+    root = AWSAccount.objects.create(account_id="111111111111", name="Root")
+    record = {"account_id": "222222222222", "name": "Member", "parent_account": "111111111111"}
+
+    with prefetch_natural_keys(AWSAccountImportForm, [record]):
+        form = AWSAccountImportForm(data=record)
+        assert form.is_valid(), form.errors
+
+    assert form.cleaned_data["parent_account"] == root
+
+
+def test_reference_missing_from_prefetch_is_queried():
+    record = {"account_id": "222222222222", "name": "Member", "parent_account": "111111111111"}
+
+    with prefetch_natural_keys(AWSAccountImportForm, [record]):
+        # Created after the prefetch, as by an earlier row of the same import
+        root = AWSAccount.objects.create(account_id="111111111111", name="Root")
+        form = AWSAccountImportForm(data=record)
+        assert form.is_valid(), form.errors
+
+    assert form.cleaned_data["parent_account"] == root
+
+
+def test_unknown_reference_is_invalid():
+    record = {"account_id": "222222222222", "name": "Member", "parent_account": "111111111111"}
+
+    with prefetch_natural_keys(AWSAccountImportForm, [record]):
+        form = AWSAccountImportForm(data=record)
+        assert not form.is_valid()
+
+    assert "parent_account" in form.errors
+
+
+def test_import_root_and_member_accounts_together(admin_client):
+    data = "account_id,name,parent_account\n111111111111,Root,\n222222222222,Member,111111111111\n"
+
+    admin_client.post(
+        reverse("plugins:netbox_aws_resources_plugin:awsaccount_import"),
+        {"data": data, "format": "csv", "csv_delimiter": ","},
+    )
+
+    member = AWSAccount.objects.get(account_id="222222222222")
+    assert member.parent_account == AWSAccount.objects.get(account_id="111111111111")
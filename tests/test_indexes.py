@@ -0,0 +1,46 @@
+"""Tests for the list and filter indexes and the explain_aws_queries command."""
+
+import io
+
+import pytest
+from django.apps import apps
+from django.core.management import CommandError, call_command
+from django.db import connection
+from ipam.models import Prefix
+
+from netbox_aws_resources_plugin.models import AWSVPC, AWSAccount
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize(
+    "model",
+    [model for model in apps.get_app_config("netbox_aws_resources_plugin").get_models() if model._meta.indexes],
+    ids=lambda model: model._meta.model_name,
+)
+def test_model_indexes_exist_in_database(model):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+
+    for index in model._meta.indexes:
+        assert index.name in constraints
+        assert constraints[index.name]["columns"] == [model._meta.get_field(field).column for field in index.fields]
+
+
+def test_explain_aws_queries_requires_inventory():
+    with pytest.raises(CommandError):
+        call_command("explain_aws_queries", stdout=io.StringIO())
+
+
+def test_explain_aws_queries_explains_every_case():
+    account = AWSAccount.objects.create(account_id="123456789012", name="Production")
+    AWSVPC.objects.create(
+        aws_account=account, name="main", region="us-east-1", cidr_block=Prefix.objects.create(prefix="10.0.0.0/16")
+    )
+    stdout = io.StringIO()
+
+    call_command("explain_aws_queries", stdout=stdout)
+
+    output = stdout.getvalue()
+    assert "VPC by account + region" in output
+    assert "AWS EC2 Instance by region + state" in output
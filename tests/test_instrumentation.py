@@ -0,0 +1,77 @@
+"""Tests for the query and latency instrumentation of plugin requests."""
+
+import logging
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from netbox_aws_resources_plugin.instrumentation import PLUGIN_NAME, QueryCollector
+from netbox_aws_resources_plugin.models import AWSAccount
+
+API_NAMESPACE = "plugins-api:netbox_aws_resources_plugin-api"
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def plugin_config(settings):
+    def configure(**overrides):
+        settings.PLUGINS_CONFIG = {
+            **settings.PLUGINS_CONFIG,
+            PLUGIN_NAME: {**settings.PLUGINS_CONFIG[PLUGIN_NAME], **overrides},
+        }
+
+    return configure
+
+
+def test_collector_counts_repeated_statements():
+    account = AWSAccount.objects.create(account_id="123456789012", name="Production")
+    collector = QueryCollector()
+
+    with connection.execute_wrapper(collector):
+        for _ in range(3):
+            AWSAccount.objects.filter(pk=account.pk).exists()
+        AWSAccount.objects.count()
+
+    assert collector.count == 4
+    assert collector.duration > 0
+    ((sql, count),) = collector.get_repeated(3)
+    assert count == 3
+    assert "LIMIT 1" in sql
+
+
+def test_debug_headers_report_queries(admin_client, plugin_config):
+    plugin_config(query_debug_header=True)
+
+    response = admin_client.get(reverse(f"{API_NAMESPACE}:awsaccount-list"))
+
+    assert response.status_code == 200
+    assert int(response["X-Query-Count"]) > 0
+    assert response["Server-Timing"].startswith("db;dur=")
+
+
+@pytest.mark.parametrize(
+    "url_name, overrides",
+    [
+        ("api-status", {"query_debug_header": True}),
+        (f"{API_NAMESPACE}:awsaccount-list", {"query_debug_header": True, "query_instrumentation": False}),
+    ],
+)
+def test_requests_outside_instrumentation_are_not_measured(admin_client, plugin_config, url_name, overrides):
+    plugin_config(**overrides)
+
+    response = admin_client.get(reverse(url_name))
+
+    assert response.status_code == 200
+    assert "X-Query-Count" not in response
+
+
+def test_repeated_statements_are_logged(admin_client, plugin_config, caplog):
+    # Every statement counts as repeated at a threshold of 1
+    plugin_config(n_plus_one_threshold=1)
+
+    with caplog.at_level(logging.WARNING, logger="netbox_aws_resources_plugin.instrumentation"):
+        admin_client.get(reverse(f"{API_NAMESPACE}:awsaccount-list"))
+
+    assert any(record.getMessage().startswith("Possible N+1") for record in caplog.records)
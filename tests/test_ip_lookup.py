@@ -0,0 +1,105 @@
+"""Tests and benchmarks for the longest-prefix-match index behind IP lookups."""
+
+import time
+import unittest
+
+import netaddr
+import pytest
+
+from netbox_aws_resources_plugin.ip_lookup import PrefixIndex, parse_ips
+
+
+def make_index(networks):
+    index = PrefixIndex()
+    for key, network in networks.items():
+        index.add(key, netaddr.IPNetwork(network))
+    return index
+
+
+class PrefixIndexTestCase(unittest.TestCase):
+    def test_matches_most_specific_first(self):
+        index = make_index({"vpc": "10.0.0.0/16", "subnet": "10.0.1.0/24", "other": "10.1.0.0/24"})
+
+        self.assertEqual(index.match(netaddr.IPAddress("10.0.1.19")), ["subnet", "vpc"])
+        self.assertEqual(index.match(netaddr.IPAddress("10.0.2.19")), ["vpc"])
+        self.assertEqual(index.match(netaddr.IPAddress("192.168.0.1")), [])
+
+    def test_overlapping_networks_all_match(self):
+        # Private ranges are reused across accounts
+        index = make_index({1: "10.0.1.0/24", 2: "10.0.1.0/24", 3: "10.0.0.0/20"})
+
+        self.assertEqual(index.match(netaddr.IPAddress("10.0.1.1")), [1, 2, 3])
+
+    def test_network_and_broadcast_addresses(self):
+        index = make_index({1: "10.0.1.0/24"})
+
+        self.assertEqual(index.match(netaddr.IPAddress("10.0.1.0")), [1])
+        self.assertEqual(index.match(netaddr.IPAddress("10.0.1.255")), [1])
+        self.assertEqual(index.match(netaddr.IPAddress("10.0.2.0")), [])
+
+    def test_ipv6(self):
+        index = make_index({4: "10.0.0.0/8", 6: "2001:db8::/56"})
+
+        self.assertEqual(index.match(netaddr.IPAddress("2001:db8:0:ff::1")), [6])
+        self.assertEqual(index.match(netaddr.IPAddress("::ffff:10.0.0.1")), [])
+
+    def test_readding_a_key_replaces_its_network(self):
+        index = make_index({1: "10.0.1.0/24"})
+
+        index.add(1, netaddr.IPNetwork("10.0.2.0/23"))
+
+        self.assertEqual(index.match(netaddr.IPAddress("10.0.1.1")), [])
+        self.assertEqual(index.match(netaddr.IPAddress("10.0.2.1")), [1])
+        self.assertEqual(index.lengths[4], [23])
+        self.assertEqual(len(index), 1)
+
+    def test_remove(self):
+        index = make_index({1: "10.0.1.0/24", 2: "10.0.0.0/16"})
+
+        index.remove(1)
+        index.remove(99)
+
+        self.assertEqual(index.match(netaddr.IPAddress("10.0.1.1")), [2])
+        self.assertEqual(index.lengths[4], [16])
+        self.assertEqual(index.tables.keys(), {(4, 16)})
+
+
+class ParseIPsTestCase(unittest.TestCase):
+    def test_deduplicates_in_order(self):
+        addresses, invalid = parse_ips([" 10.0.0.2", "10.0.0.1", "10.0.0.2 "])
+
+        self.assertEqual(addresses, [netaddr.IPAddress("10.0.0.2"), netaddr.IPAddress("10.0.0.1")])
+        self.assertEqual(invalid, [])
+
+    def test_non_strings_are_invalid(self):
+        addresses, invalid = parse_ips(["10.0.0.1", 167772161, None, "10.0.0.300"])
+
+        self.assertEqual(addresses, [netaddr.IPAddress("10.0.0.1")])
+        self.assertEqual(invalid, [167772161, None, "10.0.0.300"])
+
+
+@pytest.mark.performance
+class PrefixIndexBenchmark(unittest.TestCase):
+    """Matching is a handful of dictionary probes per address, so a 10k-address batch against 100k subnets should
+    take milliseconds; the bound here is loose enough for slow CI machines."""
+
+    SUBNET_COUNT = 100_000
+    ADDRESS_COUNT = 10_000
+
+    def test_benchmark_match(self):
+        index = PrefixIndex()
+        root = netaddr.IPNetwork("10.0.0.0/8")
+        for i in range(self.SUBNET_COUNT):
+            # Consecutive /24s, plus a VPC-sized /16 around every 256 of them
+            index.add(i, netaddr.IPNetwork(f"{netaddr.IPAddress(root.first + i * 256)}/24"))
+        for i in range(0, self.SUBNET_COUNT, 256):
+            index.add(f"vpc-{i}", netaddr.IPNetwork(f"{netaddr.IPAddress(root.first + i * 256)}/16"))
+        addresses = [netaddr.IPAddress(root.first + i * 2503 % root.size) for i in range(self.ADDRESS_COUNT)]
+
+        started = time.perf_counter()
+        matches = [index.match(address) for address in addresses]
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 1)
+        # Every address is in one /24 and one /16
+        self.assertTrue(all(len(found) == 2 for found in matches))
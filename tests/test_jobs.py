@@ -0,0 +1,131 @@
+"""Tests for the chunked background job bases and the jobs built on them."""
+
+import uuid
+
+import pytest
+from core.models import Job
+from ipam.models import Prefix
+
+from netbox_aws_resources_plugin import jobs
+from netbox_aws_resources_plugin.caching import acquire_lease, holds_lease
+from netbox_aws_resources_plugin.jobs import ReconcileShardJob, ScopedChunkedJob, ValidateCIDRsJob, _scoped
+from netbox_aws_resources_plugin.models import AWSVPC, AWSAccount
+
+from .utils import grant
+
+pytestmark = pytest.mark.django_db
+
+
+class RenameAccountsJob(ScopedChunkedJob):
+    """Upper-cases account names, failing any chunk which contains an account named "broken"."""
+
+    class Meta:
+        name = "Rename AWS accounts"
+
+    def get_querysets(self, aws_account_id=None, region=None):
+        return [self.restrict(_scoped(AWSAccount.objects.all()), "change")]
+
+    def process_chunk(self, model, pks):
+        for account in model.objects.filter(pk__in=pks):
+            account.name = account.name.upper()
+            account.save()
+            if account.name == "BROKEN":
+                raise ValueError("broken account")
+
+
+def make_job(user=None):
+    return Job.objects.create(name="Test job", job_id=uuid.uuid4(), user=user)
+
+
+def create_accounts(*names):
+    return [AWSAccount.objects.create(account_id=f"{index:012d}", name=name) for index, name in enumerate(names, 1)]
+
+
+def test_records_progress():
+    create_accounts("one", "two", "three")
+    job = make_job()
+
+    RenameAccountsJob(job).run(chunk_size=2)
+
+    assert job.data["total"] == 3
+    assert job.data["processed"] == 3
+    assert job.data["failed"] == 0
+    assert sorted(AWSAccount.objects.values_list("name", flat=True)) == ["ONE", "THREE", "TWO"]
+
+
+def test_failed_chunk_is_rolled_back_and_reported():
+    accounts = create_accounts("one", "two", "broken", "four")
+    job = make_job()
+
+    with pytest.raises(RuntimeError):
+        RenameAccountsJob(job).run(chunk_size=2)
+
+    assert job.data["processed"] == 4
+    assert job.data["failed"] == 2
+    assert job.data["errors"] == [
+        {"model": "awsaccount", "pks": [accounts[2].pk, accounts[3].pk], "error": "ValueError('broken account')"}
+    ]
+    # The first chunk was kept
+    assert list(AWSAccount.objects.order_by("pk").values_list("name", flat=True)) == ["ONE", "TWO", "broken", "four"]
+
+
+def test_only_processes_objects_user_may_change(django_user_model):
+    create_accounts("one", "two")
+    user = django_user_model.objects.create_user(username="operator")
+    grant(user, [AWSAccount], ["view", "change"], constraints={"name": "one"})
+    job = make_job(user)
+
+    RenameAccountsJob(job).run()
+
+    assert job.data["total"] == 1
+    assert sorted(AWSAccount.objects.values_list("name", flat=True)) == ["ONE", "two"]
+
+
+def test_validate_cidrs_reports_subnet_outside_vpc():
+    (account,) = create_accounts("Production")
+    vpc = AWSVPC.objects.create(
+        aws_account=account, name="main", region="us-east-1", cidr_block=Prefix.objects.create(prefix="10.0.0.0/16")
+    )
+    vpc.subnets.create(name="stray", cidr_block=Prefix.objects.create(prefix="10.1.0.0/24"))
+    job = make_job()
+
+    ValidateCIDRsJob(job).run()
+
+    assert [issue["object"] for issue in job.data["results"]["cidr_issues"]] == ["stray"]
+
+
+@pytest.fixture
+def shard():
+    (account,) = create_accounts("Production")
+    # A region of its own, so the lease isn't shared with other tests
+    region = f"test-{uuid.uuid4().hex[:8]}"
+    lease = uuid.uuid4().hex
+    acquire_lease(jobs.shard_lease_name(account.pk, region), lease, 60)
+    return {"aws_account_id": account.pk, "region": region, "lease": lease}
+
+
+def test_shard_runs_every_step_and_releases_lease(shard):
+    job = make_job()
+
+    ReconcileShardJob(job).run(**shard)
+
+    assert list(job.data["timings"]) == [step.name for step in ReconcileShardJob.steps]
+    assert not holds_lease(jobs.shard_lease_name(shard["aws_account_id"], shard["region"]), shard["lease"])
+
+
+def test_shard_skipped_without_lease(shard):
+    job = make_job()
+
+    ReconcileShardJob(job).run(**{**shard, "lease": "someone else"})
+
+    assert job.data["skipped"] == "lease not held"
+
+
+def test_shard_stops_when_lease_lost(shard, monkeypatch):
+    monkeypatch.setattr(jobs, "renew_lease", lambda *args: False)
+    job = make_job()
+
+    ReconcileShardJob(job).run(**shard)
+
+    assert job.data["aborted"] == f"lease lost before {ReconcileShardJob.steps[0].name}"
+    assert job.data["timings"] == {}
@@ -0,0 +1,52 @@
+"""Tests for keeping the denormalized region of VPC dependents in step with their VPC."""
+
+import importlib
+
+import pytest
+from django.apps import apps
+from ipam.models import Prefix
+
+from netbox_aws_resources_plugin.models import AWSVPC, AWSAccount, AWSEC2Instance, AWSLoadBalancer
+
+pytestmark = pytest.mark.django_db
+
+migration = importlib.import_module("netbox_aws_resources_plugin.migrations.0016_sync_regions_from_vpcs")
+
+
+@pytest.fixture
+def vpc():
+    account = AWSAccount.objects.create(account_id="123456789012", name="Production")
+    return AWSVPC.objects.create(
+        aws_account=account, name="main", region="us-east-1", cidr_block=Prefix.objects.create(prefix="10.0.0.0/16")
+    )
+
+
+def test_dependents_take_region_from_vpc(vpc):
+    instance = AWSEC2Instance.objects.create(name="web-1", aws_account=vpc.aws_account, region="eu-west-1", vpc=vpc)
+
+    assert instance.region == "us-east-1"
+
+
+def test_changing_vpc_region_propagates(vpc):
+    instance = AWSEC2Instance.objects.create(name="web-1", aws_account=vpc.aws_account, region="us-east-1", vpc=vpc)
+    load_balancer = AWSLoadBalancer.objects.create(name="web", aws_account=vpc.aws_account, region="us-east-1", vpc=vpc)
+
+    vpc = AWSVPC.objects.get(pk=vpc.pk)
+    vpc.region = "eu-west-1"
+    vpc.save()
+
+    instance.refresh_from_db()
+    load_balancer.refresh_from_db()
+    assert instance.region == "eu-west-1"
+    assert load_balancer.region == "eu-west-1"
+
+
+def test_migration_repairs_drifted_regions(vpc):
+    instance = AWSEC2Instance.objects.create(name="web-1", aws_account=vpc.aws_account, region="us-east-1", vpc=vpc)
+    # Drifted, as only the ORM's save() keeps it in step
+    AWSEC2Instance.objects.filter(pk=instance.pk).update(region="eu-west-1")
+
+    migration.sync_regions(apps, None)
+
+    instance.refresh_from_db()
+    assert instance.region == "us-east-1"
@@ -0,0 +1,88 @@
+"""Tests and benchmarks for rightsizing recommendations over the instance catalog."""
+
+import random
+import time
+import unittest
+
+import pytest
+
+from netbox_aws_resources_plugin import rightsizing
+from netbox_aws_resources_plugin.catalog import load_instance_data
+from netbox_aws_resources_plugin.rightsizing import Catalog
+
+SPECS = {
+    "m5.large": {"vcpu": 2, "ram_gb": 8, "price_usd_hourly": 0.096},
+    "m5.xlarge": {"vcpu": 4, "ram_gb": 16, "price_usd_hourly": 0.192},
+    "m6g.xlarge": {"vcpu": 4, "ram_gb": 16, "price_usd_hourly": 0.154},
+    "c5.xlarge": {"vcpu": 4, "ram_gb": 8, "price_usd_hourly": 0.17},
+    "r5.xlarge": {"vcpu": 4, "ram_gb": 32, "price_usd_hourly": 0.252},
+    # Unpriced types are neither recommended nor given a recommendation
+    "x9.xlarge": {"vcpu": 64, "ram_gb": 512, "price_usd_hourly": 0.0},
+}
+
+
+def recommend(catalog, instance_type, same_family=False):
+    best, savings = catalog.evaluate([instance_type], same_family)
+    return (catalog.types[best[0]] if best[0] >= 0 else None), round(float(savings[0]), 4)
+
+
+class CatalogTestCase(unittest.TestCase):
+    def setUp(self):
+        self.catalog = Catalog("ec2", SPECS)
+
+    def test_cheapest_type_at_least_as_large(self):
+        self.assertEqual(recommend(self.catalog, "m5.xlarge"), ("m6g.xlarge", 0.038))
+        # c5.xlarge has less memory than r5.xlarge, so doesn't qualify
+        self.assertEqual(recommend(self.catalog, "r5.xlarge"), (None, 0.0))
+        self.assertEqual(recommend(self.catalog, "m5.large"), (None, 0.0))
+
+    def test_same_family(self):
+        self.assertEqual(recommend(self.catalog, "m5.xlarge", same_family=True), (None, 0.0))
+        self.assertEqual(rightsizing.get_family("rds", "db.r6g.large"), "r6g")
+
+    def test_unpriced_and_unknown_types(self):
+        self.assertEqual(recommend(self.catalog, "x9.xlarge"), (None, 0.0))
+        self.assertEqual(recommend(self.catalog, "z1.unknown"), (None, 0.0))
+        self.assertIsNone(self.catalog.get_price("x9.xlarge"))
+
+    def test_empty_catalog(self):
+        catalog = Catalog("ec2", {})
+
+        best, savings = catalog.evaluate(["m5.large", "m5.xlarge"])
+
+        self.assertEqual([int(position) for position in best], [-1, -1])
+        self.assertEqual([float(saving) for saving in savings], [0.0, 0.0])
+        if rightsizing.np is not None:
+            # get_instance_recommendations() sorts the savings as an array
+            self.assertEqual(rightsizing.np.argsort(-savings).tolist(), [0, 1])
+
+    def test_python_fallback_matches(self):
+        for kind in ("ec2", "rds"):
+            catalog = Catalog(kind, load_instance_data().get(kind, {}))
+            for same_family in (False, True):
+                families = catalog.families if same_family else None
+                best, savings = catalog.get_recommendations(same_family)
+                expected_best, expected_savings = rightsizing._recommend_python(
+                    catalog.vcpus, catalog.ram, catalog.prices, families
+                )
+                self.assertEqual([int(position) for position in best], expected_best)
+                for saving, expected in zip(savings, expected_savings):
+                    self.assertAlmostEqual(float(saving), expected)
+
+
+@pytest.mark.performance
+class RightsizingBenchmark(unittest.TestCase):
+    """Evaluating 100k instances against the full catalog should take well under a second."""
+
+    INSTANCE_COUNT = 100_000
+
+    def test_benchmark_evaluate(self):
+        catalog = Catalog("ec2", load_instance_data().get("ec2", {}))
+        instance_types = random.Random(0).choices(catalog.types, k=self.INSTANCE_COUNT)
+
+        started = time.perf_counter()
+        best, savings = catalog.evaluate(instance_types)
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 1)
+        self.assertEqual(len(best), self.INSTANCE_COUNT)
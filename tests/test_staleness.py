@@ -0,0 +1,49 @@
+"""Tests for the mark-and-sweep detection of resources which have disappeared from AWS."""
+
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from netbox_aws_resources_plugin import staleness
+from netbox_aws_resources_plugin.models import AWSAccount
+
+from .utils import grant
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def cutoff():
+    return timezone.now() - timedelta(days=1)
+
+
+def test_mark_tags_only_unseen_objects(cutoff):
+    gone = AWSAccount.objects.create(account_id="111111111111", name="Gone", last_seen=cutoff - timedelta(days=1))
+    AWSAccount.objects.create(account_id="222222222222", name="Current", last_seen=timezone.now())
+    AWSAccount.objects.create(account_id="333333333333", name="Never synced")
+
+    report = staleness.sweep(cutoff)
+
+    assert report["awsaccount"] == {"unseen": 1, "marked": 1}
+    stale = AWSAccount.objects.filter(tags__slug=staleness.STALE_TAG_SLUG)
+    assert list(stale) == [gone]
+
+    # Stamping an object again clears the tag
+    staleness.mark_seen_by_key(AWSAccount, [gone.account_id])
+    assert not AWSAccount.objects.filter(tags__slug=staleness.STALE_TAG_SLUG).exists()
+
+
+def test_delete_skips_objects_user_may_not_delete(cutoff, django_user_model):
+    last_seen = cutoff - timedelta(days=1)
+    AWSAccount.objects.create(account_id="111111111111", name="Sandbox", last_seen=last_seen)
+    AWSAccount.objects.create(account_id="222222222222", name="Production", last_seen=last_seen)
+    user = django_user_model.objects.create_user(username="janitor")
+    grant(user, [AWSAccount], ["view", "delete"], constraints={"name": "Sandbox"})
+
+    dry_run = staleness.sweep(cutoff, staleness.SWEEP_DELETE, dry_run=True, user=user)
+    report = staleness.sweep(cutoff, staleness.SWEEP_DELETE, user=user)
+
+    assert dry_run["awsaccount"] == {"unseen": 1, "deleted": 0, "deletable": 1}
+    assert report["awsaccount"] == {"unseen": 1, "deleted": 1}
+    assert list(AWSAccount.objects.values_list("name", flat=True)) == ["Production"]
@@ -0,0 +1,35 @@
+"""Tests for the synthetic inventory generator."""
+
+import pytest
+
+from netbox_aws_resources_plugin.models import DELETION_ORDER, AWSAccount, AWSEC2Instance, AWSSubnet
+from netbox_aws_resources_plugin.synthetic import InventoryGenerator, clear_inventory, get_synthetic
+
+pytestmark = pytest.mark.django_db
+
+COUNTS = {
+    "accounts": 2,
+    "vpcs": 3,
+    "subnets": 6,
+    "load_balancers": 2,
+    "target_groups": 2,
+    "ec2_instances": 5,
+    "rds_instances": 2,
+}
+
+
+def test_clear_only_removes_generated_objects():
+    # Named like a generated account, but created by hand
+    real = AWSAccount.objects.create(account_id="123456789012", name="synthetic-root")
+
+    InventoryGenerator(**COUNTS).generate()
+
+    assert get_synthetic(AWSAccount).count() == 2
+    assert get_synthetic(AWSSubnet).count() == 6
+    assert get_synthetic(AWSEC2Instance).count() == 5
+
+    clear_inventory()
+
+    for model in DELETION_ORDER:
+        assert not get_synthetic(model).exists()
+    assert list(AWSAccount.objects.all()) == [real]
@@ -0,0 +1,124 @@
+"""Tests for resolving load balancer DNS names and ARNs to their traffic paths."""
+
+import pytest
+from ipam.models import Prefix
+
+from netbox_aws_resources_plugin.models import (
+    AWSVPC,
+    AWSAccount,
+    AWSEC2Instance,
+    AWSLoadBalancer,
+    AWSSubnet,
+    AWSTarget,
+    AWSTargetGroup,
+)
+from netbox_aws_resources_plugin.traffic import resolve_paths
+
+from .utils import grant
+
+pytestmark = pytest.mark.django_db
+
+ARN = "arn:aws:elasticloadbalancing:us-east-1:123456789012:loadbalancer/app/web/50dc6c495c0c9188"
+DNS_NAME = "web-1234567890.us-east-1.elb.amazonaws.com"
+
+
+@pytest.fixture
+def load_balancer():
+    account = AWSAccount.objects.create(account_id="123456789012", name="Production")
+    vpc = AWSVPC.objects.create(
+        aws_account=account, name="main", region="us-east-1", cidr_block=Prefix.objects.create(prefix="10.0.0.0/16")
+    )
+    subnet = AWSSubnet.objects.create(aws_vpc=vpc, name="app", cidr_block=Prefix.objects.create(prefix="10.0.1.0/24"))
+    load_balancer = AWSLoadBalancer.objects.create(
+        name="web",
+        arn=ARN,
+        dns_name=DNS_NAME,
+        aws_account=account,
+        region="us-east-1",
+        vpc=vpc,
+        type="application",
+        scheme="internet-facing",
+        state="active",
+    )
+    instances = AWSTargetGroup.objects.create(
+        name="web-instances", aws_account=account, region="us-east-1", vpc=vpc, target_type="instance"
+    )
+    instance = AWSEC2Instance.objects.create(
+        name="web-1", aws_account=account, region="us-east-1", vpc=vpc, subnet=subnet
+    )
+    AWSTarget.objects.create(target_group=instances, instance=instance, port=80)
+    ips = AWSTargetGroup.objects.create(
+        name="web-ips", aws_account=account, region="us-east-1", vpc=vpc, target_type="ip"
+    )
+    AWSTarget.objects.create(target_group=ips, ip_address="10.0.1.20", port=80)
+    # On premises, outside the target group's VPC
+    AWSTarget.objects.create(target_group=ips, ip_address="192.168.0.5", port=80)
+    instances.load_balancers.add(load_balancer)
+    ips.load_balancers.add(load_balancer)
+    return load_balancer
+
+
+def target_subnets(path):
+    return {
+        group["name"]: [
+            (
+                target["instance"] and target["instance"]["name"],
+                target["ip_address"],
+                target["subnet"] and target["subnet"]["name"],
+            )
+            for target in group["targets"]
+        ]
+        for group in path["target_groups"]
+    }
+
+
+def test_resolves_dns_names_and_arns(load_balancer):
+    values = [f"dualstack.{DNS_NAME.upper()}.", ARN, "unknown.elb.amazonaws.com"]
+
+    results = resolve_paths(values)
+
+    assert [result["query"] for result in results] == values
+    assert results[0]["load_balancer"]["id"] == results[1]["load_balancer"]["id"] == load_balancer.pk
+    assert results[2]["load_balancer"] is None
+    path = results[0]["load_balancer"]
+    assert path["vpc"]["aws_account"]["name"] == "Production"
+    assert target_subnets(path) == {
+        "web-instances": [("web-1", None, "app")],
+        "web-ips": [(None, "10.0.1.20", "app"), (None, "192.168.0.5", None)],
+    }
+
+
+def test_omits_objects_user_may_not_view(load_balancer, django_user_model):
+    user = django_user_model.objects.create_user(username="oncall")
+    grant(user, [AWSLoadBalancer, AWSTargetGroup], ["view"])
+    grant(user, [AWSEC2Instance], ["view"], constraints={"name": "other"})
+
+    (result,) = resolve_paths([ARN], user)
+
+    path = result["load_balancer"]
+    assert path["vpc"] is None
+    assert target_subnets(path) == {
+        "web-instances": [],
+        "web-ips": [(None, "10.0.1.20", None), (None, "192.168.0.5", None)],
+    }
+
+
+def test_attaching_a_target_group_invalidates_cached_path(load_balancer, django_capture_on_commit_callbacks):
+    resolve_paths([ARN])
+    target_group = AWSTargetGroup.objects.create(
+        name="web-canary",
+        aws_account=load_balancer.aws_account,
+        region="us-east-1",
+        vpc=load_balancer.vpc,
+        target_type="instance",
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        target_group.load_balancers.add(load_balancer)
+
+    (result,) = resolve_paths([ARN])
+    assert [group["name"] for group in result["load_balancer"]["target_groups"]] == [
+        "web-canary",
+        "web-instances",
+        "web-ips",
+    ]
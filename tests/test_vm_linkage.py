@@ -0,0 +1,73 @@
+"""Tests for bulk linking of EC2 and RDS instances to virtual machines."""
+
+import pytest
+from ipam.models import Prefix
+from virtualization.models import VirtualMachine
+
+from netbox_aws_resources_plugin.events import make_sync_request
+from netbox_aws_resources_plugin.models import AWSVPC, AWSAccount, AWSEC2Instance
+from netbox_aws_resources_plugin.vm_linkage import link_virtual_machines
+
+from .utils import grant
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def instances():
+    account = AWSAccount.objects.create(account_id="123456789012", name="Production")
+    vpc = AWSVPC.objects.create(
+        aws_account=account, name="main", region="us-east-1", cidr_block=Prefix.objects.create(prefix="10.0.0.0/16")
+    )
+    return {
+        name: AWSEC2Instance.objects.create(
+            name=name, instance_id=f"i-{index:017x}", aws_account=account, region="us-east-1", vpc=vpc
+        )
+        for index, name in enumerate(("web-1", "db-1"))
+    }
+
+
+def link(user):
+    return link_virtual_machines(AWSEC2Instance, make_sync_request(user), sync_specs=False, user=user)
+
+
+def linked_names():
+    return list(AWSEC2Instance.objects.filter(virtual_machine__isnull=False).values_list("name", flat=True))
+
+
+def test_links_by_name(instances, admin_user):
+    vms = {name: VirtualMachine.objects.create(name=name) for name in instances}
+
+    stats = link(admin_user)
+
+    assert stats["matched"] == 2
+    for name, instance in instances.items():
+        instance.refresh_from_db()
+        assert instance.virtual_machine_id == vms[name].pk
+
+
+def test_only_links_instances_user_may_change(instances, django_user_model):
+    for name in instances:
+        VirtualMachine.objects.create(name=name)
+    user = django_user_model.objects.create_user(username="linker")
+    grant(user, [AWSEC2Instance], ["view", "change"], constraints={"name": "web-1"})
+    grant(user, [VirtualMachine], ["view", "change"])
+
+    stats = link(user)
+
+    assert stats["matched"] == 1
+    assert linked_names() == ["web-1"]
+
+
+def test_only_links_virtual_machines_user_may_change(instances, django_user_model):
+    for name in instances:
+        VirtualMachine.objects.create(name=name)
+    user = django_user_model.objects.create_user(username="linker")
+    grant(user, [AWSEC2Instance], ["view", "change"])
+    grant(user, [VirtualMachine], ["view", "change"], constraints={"name": "db-1"})
+
+    stats = link(user)
+
+    assert stats["matched"] == 1
+    assert stats["unmatched"] == 1
+    assert linked_names() == ["db-1"]
@@ -0,0 +1,13 @@
+"""Helpers shared by the DB-backed tests."""
+
+from core.models import ObjectType
+from users.models import ObjectPermission
+
+
+def grant(user, models, actions, constraints=None):
+    """Give `user` an object permission for `actions` on `models`, optionally limited by `constraints`."""
+    name = f"Test permission {ObjectPermission.objects.count() + 1}"
+    permission = ObjectPermission.objects.create(name=name, actions=actions, constraints=constraints)
+    permission.object_types.set([ObjectType.objects.get_for_model(model) for model in models])
+    permission.users.add(user)
+    return permission